@@ -0,0 +1,75 @@
+"""
+Per-call overhead of the configuration built by apply_filters and apply_sorting.
+
+Compares rebuilding the default configuration on every call (the behaviour before the
+configurations were memoized) with the memoized configuration.
+
+    PYTHONPATH=src python benchmarks/bench_configurations.py
+"""
+
+import timeit
+
+from sqlalchemy import column, select, table
+
+from query_builder.filtering import apply_filters, try_parse_dict
+from query_builder.filtering.configurations import (
+    cached_filters_config,
+    default_filters_config,
+)
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict as try_parse_sort
+from query_builder.sorting.configurations import cached_sort_config, default_sort_config
+
+NUMBER = 20_000
+
+entity = table("entity", *[column(f"column_{i}") for i in range(20)])
+fields_map = [FieldMap(name=c.name, database_column=c) for c in entity.columns]
+filters = try_parse_dict({"field": "column_0", "operator": "equal", "value": 1})
+sorting_rules = try_parse_sort([{"field": "column_1", "direction": "desc"}])
+query = select(entity)
+
+
+def report(name: str, before: float, after: float):
+    print(
+        f"{name:<24} before {before / NUMBER * 1e6:8.2f} us/call"
+        f"   after {after / NUMBER * 1e6:8.2f} us/call"
+    )
+
+
+def main():
+    report(
+        "filters config",
+        timeit.timeit(lambda: default_filters_config(fields_map), number=NUMBER),
+        timeit.timeit(lambda: cached_filters_config(fields_map), number=NUMBER),
+    )
+    report(
+        "sort config",
+        timeit.timeit(lambda: default_sort_config(fields_map), number=NUMBER),
+        timeit.timeit(lambda: cached_sort_config(fields_map), number=NUMBER),
+    )
+    report(
+        "apply_filters",
+        timeit.timeit(
+            lambda: apply_filters(
+                filters, fields_map, query, config=default_filters_config(fields_map)
+            ),
+            number=NUMBER,
+        ),
+        timeit.timeit(lambda: apply_filters(filters, fields_map, query), number=NUMBER),
+    )
+    report(
+        "apply_sorting",
+        timeit.timeit(
+            lambda: apply_sorting(
+                sorting_rules, fields_map, query, config=default_sort_config(fields_map)
+            ),
+            number=NUMBER,
+        ),
+        timeit.timeit(
+            lambda: apply_sorting(sorting_rules, fields_map, query), number=NUMBER
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+In-memory evaluation of filters and sort rules over Python objects.
+
+    PYTHONPATH=src python benchmarks/bench_evaluation.py -o bench_results.json
+"""
+
+from harness import benchmark, evaluation_data, main
+from query_builder.evaluation import build_predicate, filter_items, sort_items
+from query_builder.sorting import try_parse_dict as try_parse_sort
+
+ROWS = 100_000
+
+fields_map, rows, filters = evaluation_data(ROWS)
+
+
+@benchmark("evaluation[100k].build_predicate")
+def _():
+    return lambda: build_predicate(filters, fields_map)
+
+
+@benchmark("evaluation[100k].filter_items")
+def _():
+    return lambda: filter_items(filters, fields_map, rows)
+
+
+@benchmark("evaluation[100k].sort_items")
+def _():
+    sorting_rules = try_parse_sort(
+        [{"field": "score", "direction": "desc"}, {"field": "id"}]
+    )
+    return lambda: sort_items(sorting_rules, fields_map, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Parsing of large filter payloads: the try_parse_dict probing chain against the
+single-pass parse_dict parser.
+
+    PYTHONPATH=src python benchmarks/bench_parser.py -o bench_results.json
+"""
+
+from harness import benchmark, main
+from query_builder.filtering import parse_dict, try_parse_dict
+
+
+def tree_payload(nodes: int = 10_000, width: int = 10) -> dict:
+    rules = [
+        {"field": f"field_{i % 7}", "operator": "equal", "value": i}
+        for i in range(nodes)
+    ]
+    while len(rules) > 1:
+        rules = [
+            {"condition": ("and", "or")[i % 2], "rules": rules[i : i + width]}
+            for i in range(0, len(rules), width)
+        ]
+    return rules[0]
+
+
+def flat_payload(nodes: int = 10_000) -> dict:
+    return {
+        "condition": "and",
+        "rules": [
+            {"field": f"field_{i % 7}", "operator": "equal", "value": i}
+            for i in range(nodes)
+        ],
+    }
+
+
+for payload_name, payload_factory in {
+    "tree": tree_payload,
+    "flat": flat_payload,
+}.items():
+
+    @benchmark(f"parse[{payload_name}-10k].try_parse_dict")
+    def _(payload_factory=payload_factory):
+        payload = payload_factory()
+        return lambda: try_parse_dict(payload)
+
+    @benchmark(f"parse[{payload_name}-10k].parse_dict")
+    def _(payload_factory=payload_factory):
+        payload = payload_factory()
+        return lambda: parse_dict(payload)
+
+
+if __name__ == "__main__":
+    main()
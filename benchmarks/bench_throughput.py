@@ -0,0 +1,207 @@
+"""
+Parse, compile and render throughput for realistic filter and sort payloads.
+
+    PYTHONPATH=src python benchmarks/bench_throughput.py -o bench_results.json
+"""
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from harness import benchmark, main
+from query_builder import instrumentation
+from query_builder.filtering import (
+    apply_filters,
+    build_filters,
+    build_filters_many,
+    try_parse_dict,
+)
+from query_builder.shared.models import CompilationContext, FieldMap
+from query_builder.sorting import (
+    apply_sorting,
+    build_sorting,
+    try_parse_dict as try_parse_sort,
+)
+
+COLUMNS = 50
+
+entity = Table(
+    "entity",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    *[Column(f"number_{i}", Integer) for i in range(COLUMNS)],
+    *[Column(f"text_{i}", String) for i in range(COLUMNS)],
+)
+fields_map = [FieldMap(name=c.name, database_column=c) for c in entity.columns]
+dialects = {"sqlite": sqlite.dialect(), "postgresql": postgresql.dialect()}
+
+
+def deep_payload(depth: int = 64) -> dict:
+    payload = {"field": "id", "operator": "equal", "value": 0}
+    for i in range(depth):
+        payload = {
+            "condition": ("and", "or")[i % 2],
+            "rules": [
+                payload,
+                {
+                    "field": f"text_{i % COLUMNS}",
+                    "operator": "icontains",
+                    "value": f"v{i}",
+                },
+            ],
+        }
+    return payload
+
+
+def wide_payload(width: int = 500) -> dict:
+    return {
+        "condition": "and",
+        "rules": [
+            {
+                "field": f"number_{i % COLUMNS}",
+                "operator": ("equal", "greaterthan", "lessthanorequal", "notequal")[
+                    i % 4
+                ],
+                "value": i,
+            }
+            for i in range(width)
+        ],
+    }
+
+
+def in_payload(size: int = 10_000) -> dict:
+    return {"field": "id", "operator": "in", "value": list(range(size))}
+
+
+def sort_payload(size: int = COLUMNS) -> list[dict]:
+    return [
+        {"field": f"number_{i}", "direction": ("asc", "desc")[i % 2]}
+        for i in range(size)
+    ]
+
+
+payloads = {"deep": deep_payload, "wide": wide_payload, "in": in_payload}
+
+for payload_name, payload_factory in payloads.items():
+
+    @benchmark(f"filters[{payload_name}].parse")
+    def _(payload_factory=payload_factory):
+        payload = payload_factory()
+        return lambda: try_parse_dict(payload)
+
+    @benchmark(f"filters[{payload_name}].compile")
+    def _(payload_factory=payload_factory):
+        filters = try_parse_dict(payload_factory())
+        return lambda: build_filters(filters, fields_map, CompilationContext())
+
+    for dialect_name, dialect in dialects.items():
+
+        @benchmark(f"filters[{payload_name}].render[{dialect_name}]")
+        def _(payload_factory=payload_factory, dialect=dialect):
+            (query,) = apply_filters(
+                try_parse_dict(payload_factory()), fields_map, select(entity.c.id)
+            )
+            return lambda: str(query.compile(dialect=dialect))
+
+        @benchmark(f"filters[{payload_name}].end_to_end[{dialect_name}]")
+        def _(payload_factory=payload_factory, dialect=dialect):
+            payload = payload_factory()
+
+            def end_to_end():
+                (query,) = apply_filters(
+                    try_parse_dict(payload), fields_map, select(entity.c.id)
+                )
+                return str(query.compile(dialect=dialect))
+
+            return end_to_end
+
+
+@benchmark("filters[wide].compile[observed]")
+def _():
+    # Compare with filters[wide].compile: the cost of measuring the phase and its sizes.
+    filters = try_parse_dict(wide_payload())
+
+    def observed():
+        instrumentation.add_observer(_discard)
+        try:
+            return build_filters(filters, fields_map, CompilationContext())
+        finally:
+            instrumentation.remove_observer(_discard)
+
+    return observed
+
+
+def _discard(phase_event):
+    pass
+
+
+def scoped_payloads(scopes: int = 200) -> list[dict]:
+    # One filter per tenant and role: each one repeats the shared visibility rules.
+    shared = {
+        "condition": "or",
+        "rules": [
+            {"field": "number_0", "operator": "equal", "value": 0},
+            {"field": "text_0", "operator": "in", "value": ["public", "internal"]},
+        ],
+    }
+    return [
+        {
+            "condition": "and",
+            "rules": [
+                shared,
+                {"field": "number_1", "operator": "equal", "value": i % 20},
+                {"field": "number_2", "operator": "greaterthan", "value": i % 5},
+            ],
+        }
+        for i in range(scopes)
+    ]
+
+
+@benchmark("filters[scoped].compile")
+def _():
+    # Compare with filters[scoped].compile_many: each filters compiled on its own.
+    filters = [try_parse_dict(payload) for payload in scoped_payloads()]
+
+    def compile_each():
+        context = CompilationContext()
+        return [build_filters(rule, fields_map, context)[0] for rule in filters]
+
+    return compile_each
+
+
+@benchmark("filters[scoped].compile_many")
+def _():
+    filters = [try_parse_dict(payload) for payload in scoped_payloads()]
+    return lambda: build_filters_many(filters, fields_map, CompilationContext())
+
+
+@benchmark("sorting[many_columns].parse")
+def _():
+    payload = sort_payload()
+    return lambda: try_parse_sort([dict(rule) for rule in payload])
+
+
+@benchmark("sorting[many_columns].compile")
+def _():
+    sorting_rules = try_parse_sort(sort_payload())
+    return lambda: build_sorting(sorting_rules, fields_map, CompilationContext())
+
+
+for dialect_name, dialect in dialects.items():
+
+    @benchmark(f"sorting[many_columns].end_to_end[{dialect_name}]")
+    def _(dialect=dialect):
+        payload = sort_payload()
+
+        def end_to_end():
+            (query,) = apply_sorting(
+                try_parse_sort([dict(rule) for rule in payload]),
+                fields_map,
+                select(entity.c.id),
+            )
+            return str(query.compile(dialect=dialect))
+
+        return end_to_end
+
+
+if __name__ == "__main__":
+    main()
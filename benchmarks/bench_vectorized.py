@@ -0,0 +1,44 @@
+"""
+Vectorized evaluation of filters and sort rules on Arrow tables against the row-by-row evaluation.
+
+    PYTHONPATH=src python benchmarks/bench_vectorized.py -o bench_results.json
+"""
+
+import pyarrow as pa
+
+from harness import benchmark, evaluation_data, main
+from query_builder.evaluation import filter_items, sort_items
+from query_builder.sorting import try_parse_dict as try_parse_sort
+from query_builder.vectorized import filter_table, sort_table
+
+ROWS = 500_000
+
+fields_map, rows, filters = evaluation_data(ROWS)
+table = pa.Table.from_pylist(rows)
+sorting_rules = try_parse_sort(
+    [{"field": "score", "direction": "desc"}, {"field": "id"}]
+)
+
+
+@benchmark("filters[500k].row_by_row")
+def _():
+    return lambda: filter_items(filters, fields_map, rows)
+
+
+@benchmark("filters[500k].vectorized")
+def _():
+    return lambda: filter_table(filters, fields_map, table)
+
+
+@benchmark("sorting[500k].row_by_row")
+def _():
+    return lambda: sort_items(sorting_rules, fields_map, rows)
+
+
+@benchmark("sorting[500k].vectorized")
+def _():
+    return lambda: sort_table(sorting_rules, fields_map, table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Minimal benchmark harness: registers cases, times them with timeit and writes the
+results as JSON so that they can be compared between runs.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import timeit
+from typing import Callable
+
+import sqlalchemy
+from sqlalchemy import column
+
+from query_builder.filtering import parse_dict
+from query_builder.shared.models import FieldMap
+
+_benchmarks: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark. The decorated function performs the setup and returns
+    the callable to time.
+    """
+
+    def decorator(setup: Callable[[], Callable[[], object]]):
+        _benchmarks[name] = setup
+        return setup
+
+    return decorator
+
+
+def evaluation_data(count: int) -> tuple[list[FieldMap], list[dict], object]:
+    """
+    Build the fields, the rows and the filters shared by the evaluation benchmarks.
+    The rows are the same on every run.
+    """
+    fields_map = [
+        FieldMap(name=name, database_column=column(name))
+        for name in ("id", "username", "score")
+    ]
+    generator = random.Random(0)
+    rows = [
+        {
+            "id": i,
+            "username": f"user{generator.randrange(count)}",
+            "score": generator.choice([None, *range(100)]),
+        }
+        for i in range(count)
+    ]
+    filters = parse_dict(
+        {
+            "condition": "and",
+            "rules": [
+                {"field": "score", "operator": "between", "value": [10, 60]},
+                {
+                    "condition": "or",
+                    "rules": [
+                        {
+                            "field": "username",
+                            "operator": "istartswith",
+                            "value": "USER1",
+                        },
+                        {"field": "score", "operator": "in", "value": [11, 22, 33]},
+                    ],
+                },
+            ],
+        }
+    )
+    return fields_map, rows, filters
+
+
+def run(
+    selected: list[str] | None = None, repeat: int = 5, min_time: float = 0.2
+) -> dict:
+    results = {}
+    for name, setup in _benchmarks.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        timer = timeit.Timer(setup())
+        number, _ = timer.autorange()
+        number = max(1, int(number * min_time / 0.2))
+        timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+        results[name] = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "number": number,
+            "repeat": repeat,
+        }
+        print(
+            f"{name:<48} min {min(timings) * 1e6:12.2f} us"
+            f"   median {statistics.median(timings) * 1e6:12.2f} us"
+        )
+    return results
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as file:
+        baseline = json.load(file)["benchmarks"]
+    print(f"\nCompared with {baseline_path} (median):")
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result["median"] / baseline[name]["median"]
+            print(f"{name:<48} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-k", dest="selected", action="append", help="run only matching benchmarks"
+    )
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON file of a previous run to compare the results with"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per repetition"
+    )
+    args = parser.parse_args()
+
+    results = run(args.selected, args.repeat, args.min_time)
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "machine": {
+                        "python": platform.python_version(),
+                        "implementation": platform.python_implementation(),
+                        "platform": platform.platform(),
+                        "sqlalchemy": sqlalchemy.__version__,
+                    },
+                    "benchmarks": results,
+                },
+                file,
+                indent=2,
+            )
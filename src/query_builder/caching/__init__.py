@@ -0,0 +1,297 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Iterable
+
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models.conditions import Conditions
+from query_builder.filtering.models.operators import Operators
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.shared.encoding import json_default
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.models import AbstractSortRule
+from query_builder.sorting.models.rules import SortRule
+
+# The conditions and the operators whose operands can be reordered and deduplicated.
+_COMMUTATIVE_CONDITIONS = {Conditions.AND.value, Conditions.OR.value}
+_SET_OPERATORS = {Operators.IN.value, Operators.NOTIN.value}
+
+
+def fingerprint(
+    filters: AbstractFilterRule | None,
+    sorting_rules: list[AbstractSortRule] | None = None,
+    *extra: Any,
+) -> str:
+    """
+    Return a fingerprint of a request that is the same for equivalent filters: the order of
+    the rules of 'and' and 'or' conditions, and of the values of 'in' and 'not_in' operators,
+    doesn't change it, nor do duplicated rules or values. The order of the sort rules does.
+
+    :param filters: the filters of the request.
+    :param sorting_rules: the sort rules of the request.
+    :param extra: the other JSON-serializable parts of the request, e.g. the name of the query,
+        the page and its size.
+    :return: the fingerprint, a hexadecimal string.
+    """
+    canonical = [
+        _canonical_filters(filters),
+        [_canonical_sort_rule(rule) for rule in sorting_rules or []],
+        _canonical_value(list(extra)),
+    ]
+    data = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def table_tags(
+    fields_map: list[FieldMap],
+    filters: AbstractFilterRule | None = None,
+    sorting_rules: list[AbstractSortRule] | None = None,
+) -> list[str]:
+    """
+    Return the names of the tables behind the fields used by the filters and the sort rules,
+    including the tables joined to reach them: a change to one of these tables can change
+    the result of the request. The table of the query itself must be added by the caller.
+
+    :param fields_map: the fields of the request.
+    :param filters: the filters of the request.
+    :param sorting_rules: the sort rules of the request.
+    :return: the sorted names of the tables.
+    """
+    names = set()
+    if filters:
+        _filter_fields(filters, names)
+    names.update(rule.field for rule in sorting_rules or [] if hasattr(rule, "field"))
+    tables = set()
+    for field in fields_map:
+        if field.name in names:
+            for column in (field.database_column, *field.join_path):
+                tables.update(_tables(column))
+    return sorted(tables)
+
+
+class AbstractResultCache(ABC):
+    """
+    Cache of the results of the requests, keyed by their fingerprint and invalidated by tags,
+    e.g. the tables the results are read from.
+    """
+
+    hits: int
+    misses: int
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        :param key: the key of the result.
+        :return: whether the result is cached, and the result.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        """
+        :param key: the key of the result.
+        :param value: the result.
+        :param tags: the tags that invalidate the result.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def invalidate(self, *tags: str):
+        """
+        Remove the results with any of the tags.
+
+        :param tags: the tags, e.g. the names of the tables that changed.
+        """
+        raise NotImplementedError()
+
+    def get_or_compute(
+        self, key: str, tags: Iterable[str], compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached result, or compute and cache it.
+
+        :param key: the key of the result, see `fingerprint`.
+        :param tags: the tags that invalidate the result, see `table_tags`.
+        :param compute: the function that executes the request.
+        :return: the result.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.set(key, value, tags)
+        return value
+
+    async def get_or_compute_async(
+        self, key: str, tags: Iterable[str], compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Asynchronous version of `get_or_compute`, e.g. around `fetch_page`.
+
+        :param key: the key of the result, see `fingerprint`.
+        :param tags: the tags that invalidate the result, see `table_tags`.
+        :param compute: the coroutine function that executes the request.
+        :return: the result.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+        value = await compute()
+        self.set(key, value, tags)
+        return value
+
+
+class InMemoryResultCache(AbstractResultCache):
+    """
+    LRU cache of results in the memory of the process, with a time to live.
+    The results are shared, not copied: they must not be modified.
+    """
+
+    maxsize: int
+    ttl: float | None
+    hits: int
+    misses: int
+
+    _entries: OrderedDict[str, tuple[float | None, Any, frozenset[str]]]
+    _keys_by_tag: dict[str, set[str]]
+    _clock: Callable[[], float]
+    _lock: Lock
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float | None = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param maxsize: the maximum number of results.
+        :param ttl: the number of seconds a result stays valid, None to keep it until it's evicted.
+        :param clock: the function returning the current time in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._clock = clock
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        tags = frozenset(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self.hits = self.misses = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+
+def _canonical_filters(rule: AbstractFilterRule | None) -> Any:
+    if rule is None:
+        return None
+    if isinstance(rule, ComplexFilterRule):
+        rules = [_canonical_filters(child) for child in rule.rules if child]
+        if rule.condition in _COMMUTATIVE_CONDITIONS:
+            rules = _sorted_set(rules)
+        return {"condition": rule.condition, "rules": rules}
+    if isinstance(rule, SimpleFilterRule):
+        value = _canonical_value(rule.value)
+        if rule.operator in _SET_OPERATORS and isinstance(value, list):
+            value = _sorted_set(value)
+        return {"field": rule.field, "operator": rule.operator, "value": value}
+    # Unknown rules only match themselves.
+    return {"$rule": type(rule).__qualname__, "repr": repr(rule)}
+
+
+def _canonical_sort_rule(rule: AbstractSortRule) -> Any:
+    if isinstance(rule, SortRule):
+        return {"field": rule.field, "direction": rule.direction}
+    return {"$rule": type(rule).__qualname__, "repr": repr(rule)}
+
+
+def _canonical_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, AbstractFilterRule):
+        return _canonical_filters(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v) for k, v in value.items()}
+    # The type is kept: a date and its ISO string may not select the same rows.
+    return {"$type": type(value).__qualname__, "value": json_default(value)}
+
+
+def _sorted_set(values: list) -> list:
+    encoded = {
+        json.dumps(value, sort_keys=True, separators=(",", ":")): value
+        for value in values
+    }
+    return [encoded[key] for key in sorted(encoded)]
+
+
+def _filter_fields(rule: AbstractFilterRule, names: set[str]):
+    if isinstance(rule, ComplexFilterRule):
+        for child in rule.rules:
+            if child:
+                _filter_fields(child, names)
+    elif isinstance(rule, SimpleFilterRule):
+        names.add(rule.field)
+        if isinstance(rule.value, AbstractFilterRule):
+            _filter_fields(rule.value, names)
+
+
+def _tables(column: Any) -> list[str]:
+    # Relationship attributes read the table of their target, and their secondary table if any.
+    relationship = getattr(column, "property", None)
+    if hasattr(relationship, "mapper") and hasattr(relationship, "secondary"):
+        tables = [relationship.mapper.local_table]
+        if relationship.secondary is not None:
+            tables.append(relationship.secondary)
+    else:
+        tables = [getattr(getattr(column, "expression", column), "table", None)]
+    return [table.name for table in tables if getattr(table, "name", None)]
@@ -0,0 +1,75 @@
+from typing import Any, Callable, Iterable
+
+from query_builder.caching import AbstractResultCache
+from query_builder.shared.decoding import loads_json
+from query_builder.shared.encoding import dumps_json
+
+
+class RedisResultCache(AbstractResultCache):
+    """
+    Cache of results shared between processes, stored in Redis or any server with the same commands.
+    Each tag is a set of the keys of its results, so that invalidating a tag removes them.
+
+    The results are stored as JSON by default: the tuples come back as lists, and the dates,
+    decimals and UUIDs as strings. Other formats can be used with `dumps` and `loads`, but never
+    pickle unless the server is trusted as much as the application: anyone who can write to it
+    could then run code in the application.
+    """
+
+    client: Any
+    ttl: int | None
+    prefix: str
+    hits: int
+    misses: int
+
+    _dumps: Callable[[Any], bytes]
+    _loads: Callable[[bytes], Any]
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: int | None = 60,
+        prefix: str = "query_builder:",
+        dumps: Callable[[Any], bytes] = dumps_json,
+        loads: Callable[[bytes], Any] = loads_json,
+    ):
+        """
+        :param client: the synchronous client, e.g. a redis.Redis. It must support GET, SET with EX,
+            DELETE, SADD, SMEMBERS and EXPIRE.
+        :param ttl: the number of seconds a result stays valid, None to keep it until it's invalidated.
+        :param prefix: the prefix of the keys, to share the server with other data.
+        :param dumps: the function that serializes the results, to JSON by default.
+        :param loads: the function that deserializes the results, from JSON by default. It must not
+            run code from the data, like pickle.loads does, unless the server is trusted.
+        """
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._dumps = dumps
+        self._loads = loads
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        data = self.client.get(f"{self.prefix}result:{key}")
+        if data is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, self._loads(data)
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        result_key = f"{self.prefix}result:{key}"
+        self.client.set(result_key, self._dumps(value), ex=self.ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            self.client.sadd(tag_key, result_key)
+            # The set of a tag lives as long as its results.
+            if self.ttl is not None:
+                self.client.expire(tag_key, self.ttl)
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self.client.smembers(tag_key)
+            self.client.delete(*keys, tag_key)
@@ -0,0 +1,261 @@
+import json
+import re
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Select
+
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.shared.encoding import json_default
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.models import AbstractSortRule
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\S+)(.*)$")
+_SQLITE_SORT = re.compile(r"^USE TEMP B-TREE FOR .*ORDER BY")
+_POSTGRESQL_SORTS = {"Sort", "Incremental Sort"}
+
+
+class IssueKinds(Enum):
+    # The rows of a table are all read, no index narrows them.
+    SEQUENTIAL_SCAN = "sequential_scan"
+    # The rows are sorted after they are read, no index provides their order.
+    SORT = "sort"
+
+
+class PlanIssue:
+    """
+    A costly step of a query plan and the rules that cause it.
+    """
+
+    __slots__ = ("kind", "table", "detail", "rules", "fields")
+
+    kind: str
+    table: str | None
+    detail: str
+    rules: list
+    fields: list[FieldMap]
+
+    def __init__(
+        self,
+        kind: str,
+        table: str | None,
+        detail: str,
+        rules: list,
+        fields: list[FieldMap],
+    ):
+        self.kind = kind
+        self.table = table
+        self.detail = detail
+        self.rules = rules
+        self.fields = fields
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "table": self.table,
+            "detail": self.detail,
+            "rules": [_rule_dict(rule) for rule in self.rules],
+            "fields": [field.name for field in self.fields],
+        }
+
+    def __repr__(self) -> str:
+        return f"PlanIssue({self.kind!r}, table={self.table!r}, detail={self.detail!r})"
+
+
+class DiagnosticsReport:
+    """
+    The query plan of a statement and its issues.
+    """
+
+    __slots__ = ("dialect", "sql", "plan", "issues")
+
+    dialect: str
+    sql: str
+    plan: Any
+    issues: list[PlanIssue]
+
+    def __init__(self, dialect: str, sql: str, plan: Any, issues: list[PlanIssue]):
+        self.dialect = dialect
+        self.sql = sql
+        self.plan = plan
+        self.issues = issues
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: the report as a JSON-serializable dictionary, e.g. to log it.
+        """
+        return {
+            "dialect": self.dialect,
+            "sql": self.sql,
+            "plan": self.plan,
+            "issues": [issue.as_dict() for issue in self.issues],
+        }
+
+
+def explain(
+    connection: Any,
+    query: Select,
+    fields_map: list[FieldMap],
+    filters: AbstractFilterRule | None = None,
+    sorting_rules: list[AbstractSortRule] | None = None,
+) -> DiagnosticsReport | None:
+    """
+    Run EXPLAIN on a query built by `apply_filters` and `apply_sorting`, without executing it,
+    and map its sequential scans and its sorts back to the rules and the fields that cause them.
+    On an AsyncConnection, call it through `run_sync`.
+
+    :param connection: the SqlAlchemy Connection to use.
+    :param query: the query to explain.
+    :param fields_map: the fields of the filters and of the sort rules.
+    :param filters: the filters applied to the query.
+    :param sorting_rules: the sort rules applied to the query.
+    :return: the report, None if the dialect is not SQLite or PostgreSQL.
+    """
+    dialect = connection.dialect
+    if dialect.name not in ("sqlite", "postgresql"):
+        return None
+    compiled = query.compile(dialect=dialect)
+    # The expanding parameters, like the ones of 'in', are rendered as one parameter per value.
+    state = compiled.construct_expanded_state()
+    sql = state.statement
+    params = state.positional_parameters if compiled.positional else state.parameters
+    filter_rules = _simple_rules(filters, []) if filters else []
+    sort_rules = [rule for rule in sorting_rules or [] if hasattr(rule, "field")]
+    fields = {field.name: field for field in fields_map}
+
+    if dialect.name == "sqlite":
+        plan = [
+            row.detail
+            for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+        ]
+        issues = _sqlite_issues(plan, filter_rules, sort_rules, fields)
+    else:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {sql}", params
+        ).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        issues = []
+        _postgresql_issues(plan[0]["Plan"], filter_rules, sort_rules, fields, issues)
+    return DiagnosticsReport(dialect.name, sql, plan, issues)
+
+
+def _sqlite_issues(
+    plan: list[str],
+    filter_rules: list[SimpleFilterRule],
+    sort_rules: list[AbstractSortRule],
+    fields: dict[str, FieldMap],
+) -> list[PlanIssue]:
+    issues = []
+    for detail in plan:
+        scan = _SQLITE_SCAN.match(detail)
+        # 'SCAN t USING INDEX' reads an index in order, without a table scan.
+        if scan and "INDEX" not in scan.group(2):
+            table = scan.group(1)
+            rules = [
+                rule for rule in filter_rules if _table(fields.get(rule.field)) == table
+            ]
+            issues.append(
+                _issue(IssueKinds.SEQUENTIAL_SCAN, table, detail, rules, fields)
+            )
+        elif _SQLITE_SORT.match(detail):
+            issues.append(_issue(IssueKinds.SORT, None, detail, sort_rules, fields))
+    return issues
+
+
+def _postgresql_issues(
+    node: dict,
+    filter_rules: list[SimpleFilterRule],
+    sort_rules: list[AbstractSortRule],
+    fields: dict[str, FieldMap],
+    issues: list[PlanIssue],
+):
+    node_type = node.get("Node Type")
+    if node_type == "Seq Scan":
+        tables = {node.get("Relation Name"), node.get("Alias")}
+        rules = [
+            rule for rule in filter_rules if _table(fields.get(rule.field)) in tables
+        ]
+        # The rules of the filter of the scan, if their columns can be found in it.
+        condition = node.get("Filter", "")
+        rules = [
+            rule for rule in rules if _mentions(condition, fields.get(rule.field))
+        ] or rules
+        detail = f"Seq Scan on {node.get('Relation Name')}"
+        if condition:
+            detail += f" Filter: {condition}"
+        issues.append(
+            _issue(
+                IssueKinds.SEQUENTIAL_SCAN,
+                node.get("Alias") or node.get("Relation Name"),
+                detail,
+                rules,
+                fields,
+            )
+        )
+    elif node_type in _POSTGRESQL_SORTS:
+        keys = " ".join(node.get("Sort Key", []))
+        rules = [
+            rule for rule in sort_rules if _mentions(keys, fields.get(rule.field))
+        ] or sort_rules
+        issues.append(
+            _issue(IssueKinds.SORT, None, f"{node_type} Key: {keys}", rules, fields)
+        )
+    for child in node.get("Plans", []):
+        _postgresql_issues(child, filter_rules, sort_rules, fields, issues)
+
+
+def _issue(
+    kind: IssueKinds,
+    table: str | None,
+    detail: str,
+    rules: list,
+    fields: dict[str, FieldMap],
+) -> PlanIssue:
+    issue_fields = []
+    for rule in rules:
+        field = fields.get(rule.field)
+        if field is not None and field not in issue_fields:
+            issue_fields.append(field)
+    return PlanIssue(kind.value, table, detail, rules, issue_fields)
+
+
+def _simple_rules(
+    rule: AbstractFilterRule, rules: list[SimpleFilterRule]
+) -> list[SimpleFilterRule]:
+    if isinstance(rule, ComplexFilterRule):
+        for child in rule.rules:
+            if child:
+                _simple_rules(child, rules)
+    elif isinstance(rule, SimpleFilterRule):
+        rules.append(rule)
+        if isinstance(rule.value, AbstractFilterRule):
+            _simple_rules(rule.value, rules)
+    return rules
+
+
+def _table(field: FieldMap | None) -> str | None:
+    if field is None:
+        return None
+    column = field.database_column
+    table = getattr(getattr(column, "expression", column), "table", None)
+    return getattr(table, "name", None)
+
+
+def _mentions(text: str, field: FieldMap | None) -> bool:
+    column = field and field.database_column
+    name = getattr(getattr(column, "expression", column), "name", None)
+    return bool(name) and re.search(rf"\b{re.escape(name)}\b", text) is not None
+
+
+def _rule_dict(rule: Any) -> dict[str, Any]:
+    if isinstance(rule, SimpleFilterRule):
+        value = rule.value
+        if isinstance(value, AbstractFilterRule):
+            # The rules of the criterion are reported on their own.
+            value = f"<{type(value).__name__}>"
+        # The values are logged as they are encoded in JSON, e.g. dates in ISO format.
+        value = json.loads(json.dumps(value, default=json_default))
+        return {"field": rule.field, "operator": rule.operator, "value": value}
+    return {"field": rule.field, "direction": getattr(rule, "direction", None)}
@@ -0,0 +1,121 @@
+from typing import Any, Callable, Iterable, Mapping
+
+from query_builder.filtering.configurations import cached_filters_config
+from query_builder.filtering.cost import enforce_cost
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models import CompilationConfig as FiltersConfig
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.configurations import cached_sort_config
+from query_builder.sorting.errors import QueryBuilderSortSyntaxError
+from query_builder.sorting.models import AbstractSortRule
+from query_builder.sorting.models import CompilationConfig as SortConfig
+
+
+def get_value(item: Any, name: str) -> Any:
+    """
+    Read a field from a mapping, by key, or from any other object, by attribute.
+    Missing fields read as None.
+
+    :param item: the object.
+    :param name: the name of the field.
+    :return: the value of the field.
+    """
+    if item.__class__ is dict or isinstance(item, Mapping):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def build_predicate(
+    filters: AbstractFilterRule | None,
+    fields_map: list[FieldMap],
+    config: FiltersConfig = None,
+    getter: Callable[[Any, str], Any] = get_value,
+) -> Callable[[Any], bool]:
+    """
+    Build a function that tells whether a Python object matches the filters, with the same semantics
+    as the WHERE statement built by `build_filters`: NULL comparisons are unknown and the rows where
+    the statement is unknown don't match.
+
+    :param filters: the filters to evaluate.
+    :param fields_map: the fields of the filters. The values are read using the name of the fields.
+    :param config: configuration to use to parse the filters.
+    :param getter: the function that reads the value of a field from an object.
+    :return: the predicate.
+    """
+    if not filters:
+        return lambda item: True
+    config = config or cached_filters_config(fields_map)
+    predicate = enforce_cost(filters, config).predicate(config, getter)
+    return lambda item: predicate(item) is True
+
+
+def filter_items(
+    filters: AbstractFilterRule | None,
+    fields_map: list[FieldMap],
+    items: Iterable,
+    config: FiltersConfig = None,
+    getter: Callable[[Any, str], Any] = get_value,
+) -> list:
+    """
+    Return the Python objects that match the filters.
+
+    :param filters: the filters to evaluate.
+    :param fields_map: the fields of the filters. The values are read using the name of the fields.
+    :param items: the objects to filter.
+    :param config: configuration to use to parse the filters.
+    :param getter: the function that reads the value of a field from an object.
+    :return: the matching objects, in their original order.
+    """
+    return list(filter(build_predicate(filters, fields_map, config, getter), items))
+
+
+def build_sort_key(
+    sorting_rules: list[AbstractSortRule] | None,
+    fields_map: list[FieldMap],
+    config: SortConfig = None,
+    getter: Callable[[Any, str], Any] = get_value,
+    nulls_largest: bool = False,
+) -> Callable[[Any], tuple]:
+    """
+    Build the key function that orders Python objects like the ORDER BY statement built by `build_sorting`.
+
+    :param sorting_rules: the sort rules to evaluate.
+    :param fields_map: the fields of the rules. The values are read using the name of the fields.
+    :param config: the configuration to use to parse the rules.
+    :param getter: the function that reads the value of a field from an object.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle,
+        instead of before, like in SQLite, MySQL and SQL Server.
+    :return: the key function.
+    """
+    if sorting_rules and not isinstance(sorting_rules, list):
+        raise QueryBuilderSortSyntaxError("Sort rules must be a list")
+    config = config or cached_sort_config(fields_map)
+    keys = [
+        rule.sort_key(config, getter, nulls_largest) for rule in sorting_rules or []
+    ]
+    return lambda item: tuple([key(item) for key in keys])
+
+
+def sort_items(
+    sorting_rules: list[AbstractSortRule] | None,
+    fields_map: list[FieldMap],
+    items: Iterable,
+    config: SortConfig = None,
+    getter: Callable[[Any, str], Any] = get_value,
+    nulls_largest: bool = False,
+) -> list:
+    """
+    Return the Python objects sorted by the sort rules. The sort is stable.
+
+    :param sorting_rules: the sort rules to evaluate.
+    :param fields_map: the fields of the rules. The values are read using the name of the fields.
+    :param items: the objects to sort.
+    :param config: the configuration to use to parse the rules.
+    :param getter: the function that reads the value of a field from an object.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle.
+    :return: the sorted objects.
+    """
+    return sorted(
+        items,
+        key=build_sort_key(sorting_rules, fields_map, config, getter, nulls_largest),
+    )
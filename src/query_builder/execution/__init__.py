@@ -0,0 +1,152 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_TOTAL_COLUMN = "_query_builder_total"
+
+
+class Page:
+    """
+    A page of rows and the total number of rows matching the query.
+
+    When the exact count was skipped `exact` is False and `total` is an estimate,
+    or the count threshold if no estimate is available.
+    """
+
+    __slots__ = ("rows", "total", "exact")
+
+    rows: list
+    total: int
+    exact: bool
+
+    def __init__(self, rows: list, total: int, exact: bool = True):
+        self.rows = rows
+        self.total = total
+        self.exact = exact
+
+    def __repr__(self) -> str:
+        return f"Page(rows={len(self.rows)}, total={self.total}, exact={self.exact})"
+
+
+async def fetch_page(
+    sessions: AsyncSession | Callable[[], AsyncSession],
+    data_query: Select,
+    count_query: Select = None,
+    *,
+    count_threshold: int = None,
+    estimate_count: Callable[[AsyncSession, Select], Awaitable[int | None]] = None,
+) -> Page:
+    """
+    Execute the data query and the count query of a page.
+
+    The queries are typically the ones returned by `apply_filters` and `apply_sorting`.
+    Given a session factory, like an `async_sessionmaker`, the two queries run concurrently
+    on two sessions; given a single session, they run one after the other.
+
+    :param sessions: the session to use or the factory of the sessions to use.
+    :param data_query: the query selecting the rows of the page.
+    :param count_query: the query counting the rows. If None, it is derived from the data query.
+    :param count_threshold: if provided, at most count_threshold + 1 rows are counted, with a count
+        query derived from the data query; above the threshold the total is estimated.
+    :param estimate_count: the coroutine estimating the rows of the data query above the
+        threshold. Defaults to `planner_estimate`.
+    :return: the page.
+    """
+    if count_threshold is not None or count_query is None:
+        count_query = limited_count_query(data_query, count_threshold)
+
+    if isinstance(sessions, AsyncSession):
+        rows = await _all(sessions, data_query)
+        total = await _scalar(sessions, count_query)
+    else:
+        rows, total = await asyncio.gather(
+            _run(sessions, _all, data_query), _run(sessions, _scalar, count_query)
+        )
+
+    if count_threshold is None or total <= count_threshold:
+        return Page(rows, total)
+    estimate = await _run(sessions, estimate_count or planner_estimate, data_query)
+    return Page(rows, count_threshold if estimate is None else estimate, exact=False)
+
+
+async def fetch_page_fused(session: AsyncSession, data_query: Select) -> Page:
+    """
+    Execute the data query and count its rows in a single round trip,
+    adding a 'count(*) OVER ()' column to the query.
+
+    The count is the one of the whole result, before LIMIT and OFFSET. When the page is empty
+    the window has no row to report it on, so a count query is executed instead.
+
+    :param session: the session to use.
+    :param data_query: the query selecting the rows of the page.
+    :return: the page. Its rows don't include the count column.
+    """
+    query = data_query.add_columns(func.count().over().label(_TOTAL_COLUMN))
+    result = (await session.execute(query)).freeze()
+    # The rows are read twice from the frozen result: without the count column, like the rows of
+    # `fetch_page`, and for the count.
+    rows = result().columns(*range(len(data_query.selected_columns))).all()
+    if rows:
+        return Page(rows, result().first()[-1])
+    return Page([], await _scalar(session, limited_count_query(data_query)))
+
+
+def limited_count_query(data_query: Select, threshold: int = None) -> Select:
+    """
+    Build the query counting the rows of the data query, ignoring its ordering and its page.
+
+    :param data_query: the query selecting the rows of the page.
+    :param threshold: if provided, the count stops at threshold + 1 rows.
+    :return: the count query.
+    """
+    query = data_query.order_by(None).limit(None).offset(None)
+    if threshold is not None:
+        query = query.limit(threshold + 1)
+    return select(func.count()).select_from(query.subquery())
+
+
+async def planner_estimate(session: AsyncSession, query: Select) -> int | None:
+    """
+    Return the number of rows of the query estimated by the query planner, without executing it.
+
+    :param session: the session to use.
+    :param query: the query to estimate.
+    :return: the estimated rows, None if the dialect has no supported planner estimate.
+    """
+    connection = await session.connection()
+    dialect = connection.dialect
+    if dialect.name != "postgresql":
+        return None
+    compiled = query.order_by(None).limit(None).offset(None).compile(dialect=dialect)
+    # The expanding parameters, like the ones of 'in', are rendered as one parameter per value.
+    state = compiled.construct_expanded_state()
+    params = state.positional_parameters if compiled.positional else state.parameters
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {state.statement}", params
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _run(
+    sessions: AsyncSession | Callable[[], AsyncSession],
+    function: Callable[[AsyncSession, Select], Awaitable[Any]],
+    query: Select,
+) -> Any:
+    if isinstance(sessions, AsyncSession):
+        return await function(sessions, query)
+    async with sessions() as session:
+        return await function(session, query)
+
+
+async def _all(session: AsyncSession, query: Select) -> list:
+    return (await session.execute(query)).all()
+
+
+async def _scalar(session: AsyncSession, query: Select) -> Any:
+    return (await session.execute(query)).scalar_one()
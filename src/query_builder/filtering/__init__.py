@@ -1,14 +1,24 @@
 from typing import Any
 
+from query_builder import instrumentation
+from query_builder.filtering import parser
+from query_builder.filtering.cache import CompiledFiltersCache
 from query_builder.filtering.configurations import (
+    cached_filters_config,
     default_filters_config,
 )
+from query_builder.filtering.cost import enforce_cost
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
 from query_builder.filtering.models import (
     AbstractFilterRule,
     CompilationConfig,
 )
 from query_builder.filtering.models.conditions import Conditions
 from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.filtering.optimizer import rule_key
+from query_builder.instrumentation import Phases
+from query_builder.shared.decoding import loads_json
+from query_builder.shared.joins import apply_joins, required_joins
 from query_builder.shared.models import FieldMap, CompilationContext
 
 
@@ -18,6 +28,7 @@ def apply_filters(
     *queries,
     config: CompilationConfig = None,
     statement: Any | None = None,
+    cache: CompiledFiltersCache | None = None,
 ) -> tuple:
     """
     Parse the filters and build the SQL where statement to append
@@ -28,15 +39,39 @@ def apply_filters(
     :param queries: the queries to process.
     :param config: configuration to use to parse the filters.
     :param statement: WHERE statement to use instead of parsing the filters.
+    :param cache: cache of the compiled statements to use.
     :return: the queries with the filters applied.
     """
     if not filters:
         return tuple(queries)
 
     context = CompilationContext()
-    if not statement:
-        statement, _ = build_filters(filters, fields_map, context, config)
-    return tuple([query.where(statement).params(context.params) for query in queries])
+    if statement is None:
+        statement, _ = build_filters(filters, fields_map, context, config, cache)
+        joins = required_joins(fields_map, context.included_fields)
+    elif any(field.join_path for field in fields_map):
+        # The rules give the fields of the statement, and so its joins.
+        included_fields = set()
+        _add_included_fields(filters, included_fields)
+        joins = required_joins(fields_map, included_fields)
+    else:
+        joins = []
+    return tuple(
+        [
+            apply_joins(query, joins).where(statement).params(context.params)
+            for query in queries
+        ]
+    )
+
+
+def _add_included_fields(rule: AbstractFilterRule, included_fields: set[str]):
+    # The fields of the criteria of 'any' and 'all' are queried in their subquery: they need no join.
+    if isinstance(rule, ComplexFilterRule):
+        for child in rule.rules:
+            if child:
+                _add_included_fields(child, included_fields)
+    elif isinstance(rule, SimpleFilterRule):
+        included_fields.add(rule.field)
 
 
 def build_filters(
@@ -44,6 +79,7 @@ def build_filters(
     fields_map: list[FieldMap],
     context: CompilationContext,
     config: CompilationConfig = None,
+    cache: CompiledFiltersCache | None = None,
 ) -> tuple[Any, CompilationContext]:
     """
     Parse the filters and build the corresponding SQL where statement.
@@ -53,13 +89,90 @@ def build_filters(
     :param fields_map: the mapping between the 'field' inside the filter and the SqlAlchemy Column.
     :param context: the compilation context to use. Contains parameters and internals of the compilation.
     :param config: configuration to use to parse the filters.
+    :param cache: cache of the compiled statements to use.
     :return: the WHERE statement and the set of included fields.
+    :raise QueryBuilderFiltersSyntaxError: if the filters exceed the cost model of the configuration.
     """
-    config = config or default_filters_config(fields_map)
-    statement = filters.compile(config, context)
+    start_time = instrumentation.start()
+    config = config or cached_filters_config(fields_map)
+    filters = enforce_cost(filters, config)
+    if cache is not None:
+        statement = cache.compile(filters, fields_map, context, config)
+    else:
+        statement = filters.compile(config, context)
+    if start_time is not None:
+        instrumentation.record(
+            Phases.COMPILE, "filters", start_time, rules=filters, context=context
+        )
     return statement, context
 
 
+def build_filters_many(
+    filters: list[AbstractFilterRule | None],
+    fields_map: list[FieldMap],
+    context: CompilationContext,
+    config: CompilationConfig = None,
+) -> tuple[list[Any], CompilationContext]:
+    """
+    Build the WHERE statements of many filters in a single pass, with the same configuration and context.
+    The subtrees that appear several times, in the same filters or in different ones, are compiled once:
+    their statement and their parameters are shared by all the occurrences.
+
+    :param filters: the filters to build, e.g. one per permission scope.
+    :param fields_map: the mapping between the 'field' inside the filter and the SqlAlchemy Column.
+    :param context: the compilation context to use. Contains parameters and internals of the compilation.
+    :param config: configuration to use to parse the filters.
+    :return: the WHERE statement of each filters, None for the empty ones, and the context.
+    :raise QueryBuilderFiltersSyntaxError: if filters exceed the cost model of the configuration.
+    """
+    start_time = instrumentation.start()
+    config = config or cached_filters_config(fields_map)
+    compiled: dict[Any, Any] = {}
+    statements = [
+        (
+            _compile_shared(enforce_cost(rule, config), config, context, compiled)[0]
+            if rule
+            else None
+        )
+        for rule in filters
+    ]
+    if start_time is not None:
+        instrumentation.record(
+            Phases.COMPILE,
+            "filters",
+            start_time,
+            # Each filters applies on its own: they are alternatives, not conjuncts.
+            rules=join_filters(*filters, condition=Conditions.OR.value),
+            context=context,
+        )
+    return statements, context
+
+
+def _compile_shared(
+    rule: AbstractFilterRule,
+    config: CompilationConfig,
+    context: CompilationContext,
+    compiled: dict[Any, Any],
+) -> tuple[Any, Any]:
+    # The keys of the complex rules are built from the ones of their children, in a single pass.
+    if isinstance(rule, ComplexFilterRule):
+        children = [
+            _compile_shared(child, config, context, compiled)
+            for child in rule.rules
+            if child
+        ]
+        key = rule.condition, tuple([child_key for _, child_key in children])
+        if key not in compiled:
+            compiled[key] = config.get_condition(rule.condition).join(
+                [statement for statement, _ in children]
+            )
+        return compiled[key], key
+    key = rule_key(rule)
+    if key not in compiled:
+        compiled[key] = rule.compile(config, context)
+    return compiled[key], key
+
+
 def try_parse_dict(
     filters: dict, *, syntax_types: list[type[AbstractFilterRule]] = None
 ) -> AbstractFilterRule:
@@ -70,13 +183,50 @@ def try_parse_dict(
     :param syntax_types: the syntax types to use to parse the filters.
     :return: the AbstractFilterRule object parsed from the input.
     """
+    start_time = instrumentation.start()
     syntax_types = syntax_types or [ComplexFilterRule, SimpleFilterRule]
     for syntax_type in syntax_types:
         rule = syntax_type.try_parse_dict(filters)
         if rule:
+            if start_time is not None:
+                instrumentation.record(Phases.PARSE, "filters", start_time, rules=rule)
             return rule
 
 
+def parse_dict(filters: dict) -> AbstractFilterRule:
+    """
+    Parse and validate the filters in a single pass.
+
+    :param filters: the filters to parse.
+    :return: the AbstractFilterRule object parsed from the input.
+    :raise QueryBuilderFiltersSyntaxError: if the filters are not valid. The message contains the path of the invalid node.
+    """
+    start_time = instrumentation.start()
+    rule = parser.parse_dict(filters)
+    if start_time is not None:
+        instrumentation.record(Phases.PARSE, "filters", start_time, rules=rule)
+    return rule
+
+
+def parse_filters_json(data: bytes | str) -> AbstractFilterRule:
+    """
+    Decode and parse the filters from a JSON document.
+
+    :param data: the JSON document of the filters.
+    :return: the AbstractFilterRule object parsed from the input.
+    :raise QueryBuilderFiltersSyntaxError: if the document is not valid JSON or the filters are not valid.
+    """
+    start_time = instrumentation.start()
+    try:
+        filters = loads_json(data)
+    except ValueError as error:
+        raise QueryBuilderFiltersSyntaxError(f"Invalid JSON: {error}") from None
+    rule = parser.parse_dict(filters)
+    if start_time is not None:
+        instrumentation.record(Phases.PARSE, "filters", start_time, rules=rule)
+    return rule
+
+
 def join_filters(
     *filters: AbstractFilterRule, condition: str = Conditions.AND.value
 ) -> AbstractFilterRule | None:
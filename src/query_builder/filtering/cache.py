@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+from query_builder.filtering.configurations import cached_filters_config
+from query_builder.filtering.models import AbstractFilterRule, CompilationConfig
+from query_builder.shared.models import FieldMap, CompilationContext
+
+
+class CompiledFiltersCache:
+    """
+    LRU cache of compiled WHERE statements, keyed on the shape of the filters.
+
+    Two filters have the same shape when they only differ in the values of their parameters:
+    on a hit the cached statement is reused and only the parameters are registered in the context.
+    """
+
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    _entries: OrderedDict[Hashable, tuple[Any, CompilationConfig]]
+    _lock: Lock
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def compile(
+        self,
+        filters: AbstractFilterRule,
+        fields_map: list[FieldMap],
+        context: CompilationContext,
+        config: CompilationConfig = None,
+    ) -> Any:
+        """
+        Build the WHERE statement of the filters, reusing a cached statement with the same shape.
+
+        :param filters: the filters to build.
+        :param fields_map: the mapping between the 'field' inside the filter and the SqlAlchemy Column.
+        :param context: the compilation context to use. Receives the parameters of the filters.
+        :param config: configuration to use to parse the filters.
+        :return: the WHERE statement.
+        """
+        params = dict(context.params)
+        param_counters = dict(context.param_counters)
+        param_names = dict(context.param_names)
+        param_references = list(context.param_references)
+        included_fields = set(context.included_fields)
+
+        config = config or cached_filters_config(fields_map)
+        shape = filters.bind(config, context)
+        # The parameters referenced by the rules are part of the key, in order: the cached statement
+        # references them, and the same shape can share a parameter between rules or not.
+        key = (
+            id(config),
+            shape,
+            tuple(context.param_references[len(param_references) :]),
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        context.params = params
+        context.param_counters = param_counters
+        context.param_names = param_names
+        context.param_references = param_references
+        context.included_fields = included_fields
+        statement = filters.compile(config, context)
+        with self._lock:
+            # The config is kept alive so that its id can't be reused.
+            self._entries[key] = (statement, config)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return statement
@@ -1,4 +1,5 @@
-from typing import Callable
+from functools import lru_cache
+from typing import Any
 
 from query_builder.filtering.models import CompilationConfig
 from query_builder.filtering.models.conditions import (
@@ -9,6 +10,7 @@ from query_builder.filtering.models.conditions import (
 from query_builder.filtering.models.operators import (
     AllOperator,
     AnyOperator,
+    BetweenOperator,
     CaseInsensitiveContainsOperator,
     CaseInsensitiveEndsWithOperator,
     CaseInsensitiveEqualsOperator,
@@ -30,13 +32,16 @@ from query_builder.filtering.models.operators import (
     LikeOperator,
     NotEqualsOperator,
     NotInOperator,
+    PhraseOperator,
+    SearchOperator,
     StartsWithOperator,
 )
 from query_builder.filtering.models.rules import (
     ComplexFilterRule,
     SimpleFilterRule,
 )
-from query_builder.shared.models import FieldMap
+from query_builder.shared.cost import CostModel
+from query_builder.shared.models import FieldMap, FieldMapsKey
 
 default_all_operators = [
     EqualsOperator(),
@@ -63,6 +68,9 @@ default_all_operators = [
     CaseInsensitiveEndsWithOperator(),
     AnyOperator(),
     AllOperator(),
+    BetweenOperator(),
+    SearchOperator(),
+    PhraseOperator(),
 ]
 
 default_all_conditions = [
@@ -72,10 +80,49 @@ default_all_conditions = [
 ]
 
 
-def default_filters_config(fields_mapping: list[FieldMap]) -> CompilationConfig:
+def default_filters_config(
+    fields_mapping: list[FieldMap],
+    cost_model: CostModel = None,
+    dialect: Any = None,
+) -> CompilationConfig:
     return CompilationConfig(
         fields_mapping=fields_mapping,
         conditions=default_all_conditions,
         operators=default_all_operators,
         syntax_types=[ComplexFilterRule, SimpleFilterRule],
+        cost_model=cost_model,
+        dialect=dialect,
     )
+
+
+def cached_filters_config(
+    fields_mapping: list[FieldMap], dialect: Any = None
+) -> CompilationConfig:
+    """
+    Return the default configuration for the given fields.
+    The configuration is built once per set of FieldMaps and dialect and shared between calls.
+    FieldMaps built per request share the configuration of the equal FieldMaps, see FieldMapsKey:
+    their columns and their functions must be the same objects, e.g. module-level ones.
+    At most 256 configurations are kept, the least recently used are dropped.
+
+    :param fields_mapping: the fields of the configuration.
+    :param dialect: the SqlAlchemy Dialect, or the name of the dialect, the statements are built for.
+    """
+    return _identical_filters_config(
+        tuple(fields_mapping), getattr(dialect, "name", dialect)
+    )
+
+
+@lru_cache(maxsize=256)
+def _identical_filters_config(
+    fields_mapping: tuple[FieldMap, ...], dialect: str | None
+) -> CompilationConfig:
+    # FieldMaps hash by identity: the same FieldMaps hit here without building their key.
+    return _cached_filters_config(FieldMapsKey(fields_mapping), dialect)
+
+
+@lru_cache(maxsize=256)
+def _cached_filters_config(
+    fields_key: FieldMapsKey, dialect: str | None
+) -> CompilationConfig:
+    return default_filters_config(list(fields_key.fields_mapping), dialect=dialect)
@@ -0,0 +1,176 @@
+from typing import Any
+
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.filtering.models import AbstractFilterRule, CompilationConfig
+from query_builder.filtering.models.operators import Operators
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+
+# Pattern matching with a leading wildcard can't use a B-tree index, subqueries scan the related rows.
+default_operator_weights = {
+    Operators.CONTAINS.value: 10,
+    Operators.ICONTAINS.value: 10,
+    Operators.ENDSWITH.value: 10,
+    Operators.IENDSWITH.value: 10,
+    Operators.LIKE.value: 10,
+    Operators.ILIKE.value: 10,
+    Operators.ANY.value: 5,
+    Operators.ALL.value: 5,
+}
+
+default_downgrades = {
+    Operators.CONTAINS.value: Operators.STARTSWITH.value,
+    Operators.ICONTAINS.value: Operators.ISTARTSWITH.value,
+}
+
+_LIST_OPERATORS = {Operators.IN.value, Operators.NOTIN.value}
+
+
+def enforce_cost(
+    filters: AbstractFilterRule | None, config: CompilationConfig
+) -> AbstractFilterRule | None:
+    """
+    Check the filters against the cost model of the configuration before they are compiled.
+    If the filters are too expensive, the operators with a downgrade are replaced by their cheaper
+    operator, the most expensive rules first, until the cost is within the budget.
+
+    :param filters: the filters to check.
+    :param config: the configuration the filters will be compiled with.
+    :return: the filters, or a copy with the downgraded operators.
+    :raise QueryBuilderFiltersSyntaxError: if the filters exceed a limit of the cost model.
+    """
+    cost_model = config.cost_model
+    if cost_model is None or filters is None:
+        return filters
+
+    leaves: list[SimpleFilterRule] = []
+    # The leaves of the criteria that arrive as dictionaries: they count, but can't be downgraded.
+    fixed: set[int] = set()
+    rule_count, depth = _walk(filters, leaves, config, fixed)
+    if cost_model.max_depth is not None and depth > cost_model.max_depth:
+        raise QueryBuilderFiltersSyntaxError(
+            f"Filters are too deep: depth {depth}, maximum {cost_model.max_depth}"
+        )
+    if cost_model.max_rules is not None and rule_count > cost_model.max_rules:
+        raise QueryBuilderFiltersSyntaxError(
+            f"Too many filter rules: {rule_count}, maximum {cost_model.max_rules}"
+        )
+    for rule in leaves:
+        if (
+            cost_model.max_in_size is not None
+            and _value_count(rule) > cost_model.max_in_size
+        ):
+            raise QueryBuilderFiltersSyntaxError(
+                f"Too many values for operator {rule.operator} on field {rule.field}: "
+                f"{_value_count(rule)}, maximum {cost_model.max_in_size}"
+            )
+    if cost_model.max_cost is None:
+        return filters
+
+    cost = sum(_cost(config, rule) for rule in leaves)
+    downgrades = {}
+    for rule, downgraded in sorted(
+        _downgrades(config, [rule for rule in leaves if id(rule) not in fixed]),
+        key=lambda pair: _cost(config, pair[1]) - _cost(config, pair[0]),
+    ):
+        if cost <= cost_model.max_cost:
+            break
+        if _cost(config, downgraded) >= _cost(config, rule):
+            continue
+        cost += _cost(config, downgraded) - _cost(config, rule)
+        downgrades[id(rule)] = downgraded
+    if cost > cost_model.max_cost:
+        raise QueryBuilderFiltersSyntaxError(
+            f"Filters are too expensive: cost {cost:g}, maximum {cost_model.max_cost:g}"
+        )
+    return _replace(filters, downgrades) if downgrades else filters
+
+
+def _walk(
+    rule: AbstractFilterRule,
+    leaves: list[SimpleFilterRule],
+    config: CompilationConfig,
+    fixed: set[int],
+    is_fixed: bool = False,
+) -> tuple[int, int]:
+    if isinstance(rule, ComplexFilterRule):
+        count = depth = 0
+        for child in rule.rules:
+            if child:
+                child_count, child_depth = _walk(child, leaves, config, fixed, is_fixed)
+                count += child_count
+                depth = max(depth, child_depth)
+        return count + 1, depth + 1
+    if isinstance(rule, SimpleFilterRule):
+        leaves.append(rule)
+        if is_fixed:
+            fixed.add(id(rule))
+        value = rule.value
+        if isinstance(value, dict):
+            # The criterion of 'any' and 'all' can arrive as a dictionary, that the transform
+            # function of the field parses when the rule is compiled.
+            value = _criterion(config, rule)
+            is_fixed = True
+        if isinstance(value, AbstractFilterRule):
+            count, depth = _walk(value, leaves, config, fixed, is_fixed)
+            return count + 1, depth + 1
+    return 1, 1
+
+
+def _criterion(config: CompilationConfig, rule: SimpleFilterRule) -> Any:
+    try:
+        value = config.get_field(rule.field).transform(rule.value)
+    except QueryBuilderFiltersSyntaxError:
+        # The unknown fields are reported by the compilation.
+        return None
+    if isinstance(value, dict):
+        for syntax_type in config.syntax_types:
+            parsed = syntax_type.try_parse_dict(value)
+            if parsed:
+                return parsed
+    return value
+
+
+def _value_count(rule: SimpleFilterRule) -> int:
+    if rule.operator in _LIST_OPERATORS and isinstance(rule.value, (list, tuple)):
+        return len(rule.value)
+    return 1
+
+
+def _cost(config: CompilationConfig, rule: SimpleFilterRule) -> float:
+    return config.cost_model.rule_cost(rule.field, rule.operator, _value_count(rule))
+
+
+def _downgrades(
+    config: CompilationConfig, leaves: list[SimpleFilterRule]
+) -> list[tuple[SimpleFilterRule, SimpleFilterRule]]:
+    downgrades = []
+    for rule in leaves:
+        operator = config.cost_model.downgrades.get(rule.operator)
+        if operator is None:
+            continue
+        try:
+            config.get_operator(operator, config.get_field(rule.field))
+        except QueryBuilderFiltersSyntaxError:
+            continue
+        downgrades.append((rule, SimpleFilterRule(rule.field, operator, rule.value)))
+    return downgrades
+
+
+def _replace(
+    rule: AbstractFilterRule, replacements: dict[int, SimpleFilterRule]
+) -> AbstractFilterRule:
+    if id(rule) in replacements:
+        return replacements[id(rule)]
+    if isinstance(rule, ComplexFilterRule):
+        rules = [
+            _replace(child, replacements) if child else child for child in rule.rules
+        ]
+        if any(new is not old for new, old in zip(rules, rule.rules)):
+            return ComplexFilterRule(rule.condition, rules)
+    elif isinstance(rule, SimpleFilterRule) and isinstance(
+        rule.value, AbstractFilterRule
+    ):
+        value = _replace(rule.value, replacements)
+        if value is not rule.value:
+            return SimpleFilterRule(rule.field, rule.operator, value)
+    return rule
@@ -1,16 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Mapping
 
 from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.shared.cost import CostModel
 from query_builder.shared.models import FieldMap, CompilationContext
 
 
 class CompilationConfig:
-    syntax_types: list[type["AbstractFilterRule"]]
-
-    _fields_mapping: dict[str, FieldMap]
-    _operators_map: dict[str, "AbstractOperator"]
-    _conditions_map: dict[str, "AbstractCondition"]
+    __slots__ = (
+        "syntax_types",
+        "cost_model",
+        "dialect",
+        "case_insensitive_collation",
+        "_fields_mapping",
+        "_operators_map",
+        "_conditions_map",
+    )
+
+    syntax_types: tuple[type["AbstractFilterRule"], ...]
+    cost_model: CostModel | None
+    dialect: str | None
+    case_insensitive_collation: str | None
+
+    _fields_mapping: Mapping[str, FieldMap]
+    _operators_map: Mapping[str, "AbstractOperator"]
+    _conditions_map: Mapping[str, "AbstractCondition"]
 
     def __init__(
         self,
@@ -18,11 +33,53 @@ class CompilationConfig:
         conditions: list["AbstractCondition"],
         operators: list["AbstractOperator"],
         syntax_types: list[type["AbstractFilterRule"]],
+        cost_model: CostModel = None,
+        dialect: Any = None,
+        case_insensitive_collation: str = None,
     ):
-        self._fields_mapping = {field.name: field for field in fields_mapping}
-        self._operators_map = {operator.code: operator for operator in operators}
-        self._conditions_map = {condition.name: condition for condition in conditions}
-        self.syntax_types = syntax_types
+        """
+        :param fields_mapping: the fields the filters can use.
+        :param conditions: the conditions the filters can use.
+        :param operators: the operators the filters can use.
+        :param syntax_types: the types of rule to try when parsing the filters.
+        :param cost_model: the cost model the filters are checked against before they are compiled.
+        :param dialect: the SqlAlchemy Dialect, or the name of the dialect, the statements are built for.
+            Operators then use the form that the planner of the database optimizes best.
+            If None, the statements use the generic forms that all the databases support.
+        :param case_insensitive_collation: the case-insensitive collation used by the case-insensitive
+            operators on MySQL and MariaDB, e.g. the collation of the columns, so that their indexes
+            are used. The collation decides what matches: the MySQL default, utf8mb4_0900_as_ci, only
+            folds the case, like lower(), while the accent-insensitive ones, like utf8mb4_0900_ai_ci or
+            the MariaDB default, utf8mb4_unicode_ci, also match 'résumé' with 'resume'.
+        """
+        # Configurations are frozen: they are memoized and shared between compilations.
+        object.__setattr__(
+            self,
+            "_fields_mapping",
+            MappingProxyType({field.name: field for field in fields_mapping}),
+        )
+        object.__setattr__(
+            self,
+            "_operators_map",
+            MappingProxyType({operator.code: operator for operator in operators}),
+        )
+        object.__setattr__(
+            self,
+            "_conditions_map",
+            MappingProxyType({condition.name: condition for condition in conditions}),
+        )
+        object.__setattr__(self, "syntax_types", tuple(syntax_types))
+        object.__setattr__(self, "cost_model", cost_model)
+        object.__setattr__(self, "dialect", getattr(dialect, "name", dialect))
+        object.__setattr__(
+            self, "case_insensitive_collation", case_insensitive_collation
+        )
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
     def get_operator(self, code: str, field: FieldMap) -> "AbstractOperator":
         try:
@@ -48,10 +105,33 @@ class CompilationConfig:
 
 
 class AbstractFilterRule(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def compile(self, config: CompilationConfig, context: CompilationContext):
         raise NotImplementedError()
 
+    def bind(self, config: CompilationConfig, context: CompilationContext) -> Hashable:
+        """
+        Register the parameters of the rule in the context without building the SQL statement.
+        Must register the same parameters, in the same order, as `compile`.
+
+        :return: the shape of the rule, a hashable key that identifies the compiled statement.
+        """
+        raise NotImplementedError()
+
+    def predicate(
+        self, config: CompilationConfig, getter: Callable[[Any, str], Any]
+    ) -> Callable[[Any], bool | None]:
+        """
+        Build a function that evaluates the rule on a Python object with the semantics of the SQL statement:
+        it returns None where the statement evaluates to NULL.
+
+        :param getter: the function that reads the value of a field from the object.
+        :return: the predicate.
+        """
+        raise NotImplementedError()
+
     @staticmethod
     @abstractmethod
     def try_parse_dict(dictionary: dict) -> "AbstractFilterRule":
@@ -68,6 +148,14 @@ class AbstractCondition(ABC):
     def join(self, compiled_rules: list):
         raise NotImplementedError()
 
+    def join_predicates(
+        self, predicates: list[Callable[[Any], bool | None]]
+    ) -> Callable[[Any], bool | None]:
+        """
+        Join the predicates of the rules with the three-valued logic of SQL.
+        """
+        raise NotImplementedError()
+
 
 class AbstractOperator(ABC):
     code: str
@@ -77,11 +165,53 @@ class AbstractOperator(ABC):
 
     @staticmethod
     def _add_param(context: CompilationContext, field: FieldMap, value: Any):
-        param_counter = context.param_counters.get(field.name, 0)
-        param_name = f"{field.name}_{param_counter}"
-        context.params |= {param_name: value}
-        context.param_counters |= {field.name: param_counter + 1}
-        return param_name
+        return context.add_param(field.name, value)
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return value
+
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        """
+        Register the parameters of the operator in the context without building the SQL statement.
+        Must register the same parameters, in the same order, as `apply`.
+
+        :return: the part of the value that changes the SQL statement, None if it only changes the parameters.
+        """
+        self._add_param(context, field, self._param_value(field, value))
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        """
+        Build a function that evaluates the operator on a Python object with the semantics of `apply`:
+        it returns None where the statement evaluates to NULL.
+
+        :param getter: the function that reads the value of a field from the object.
+        :return: the predicate.
+        """
+        raise NotImplementedError()
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        """
+        Evaluate the operator on a column of Arrow data with the semantics of `apply`:
+        the mask is NULL where the statement evaluates to NULL.
+
+        :param column: the pyarrow array of the field.
+        :return: the boolean mask.
+        """
+        raise NotImplementedError()
 
     @abstractmethod
     def apply(
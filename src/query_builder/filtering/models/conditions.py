@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Any, Callable
 
 from sqlalchemy import and_, not_, or_
 
@@ -21,6 +22,22 @@ class AndCondition(AbstractCondition):
             raise QueryBuilderFiltersSyntaxError("'and' condition requires at least one rule")
         return and_(*compiled_rules)
 
+    def join_predicates(self, predicates: list[Callable[[Any], bool | None]]):
+        if len(predicates) == 0:
+            raise QueryBuilderFiltersSyntaxError("'and' condition requires at least one rule")
+
+        def predicate(item: Any) -> bool | None:
+            result = True
+            for rule_predicate in predicates:
+                rule_result = rule_predicate(item)
+                if rule_result is False:
+                    return False
+                if rule_result is None:
+                    result = None
+            return result
+
+        return predicate
+
 
 class OrCondition(AbstractCondition):
     def __init__(self, name: str = Conditions.OR.value):
@@ -31,6 +48,22 @@ class OrCondition(AbstractCondition):
             raise QueryBuilderFiltersSyntaxError("'or' condition requires at least one rule")
         return or_(*compiled_rules)
 
+    def join_predicates(self, predicates: list[Callable[[Any], bool | None]]):
+        if len(predicates) == 0:
+            raise QueryBuilderFiltersSyntaxError("'or' condition requires at least one rule")
+
+        def predicate(item: Any) -> bool | None:
+            result = False
+            for rule_predicate in predicates:
+                rule_result = rule_predicate(item)
+                if rule_result is True:
+                    return True
+                if rule_result is None:
+                    result = None
+            return result
+
+        return predicate
+
 
 class NotCondition(AbstractCondition):
     def __init__(self, name: str = Conditions.NOT.value):
@@ -40,3 +73,14 @@ class NotCondition(AbstractCondition):
         if len(compiled_rules) != 1:
             raise QueryBuilderFiltersSyntaxError("'not' condition must have exactly one rule")
         return not_(compiled_rules[0])
+
+    def join_predicates(self, predicates: list[Callable[[Any], bool | None]]):
+        if len(predicates) != 1:
+            raise QueryBuilderFiltersSyntaxError("'not' condition must have exactly one rule")
+        (rule_predicate,) = predicates
+
+        def predicate(item: Any) -> bool | None:
+            result = rule_predicate(item)
+            return None if result is None else not result
+
+        return predicate
@@ -1,13 +1,35 @@
+import re
+import sys
 from enum import Enum
-from typing import Any
-
-from sqlalchemy import bindparam, func, not_, text
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import (
+    all_,
+    and_,
+    any_,
+    bindparam,
+    case,
+    collate,
+    func,
+    not_,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
 from query_builder.filtering.models import (
     AbstractOperator,
     CompilationConfig,
 )
-from query_builder.shared.models import FieldMap, CompilationContext
+from query_builder.shared.expressions import TextSearch
+from query_builder.shared.models import (
+    FieldMap,
+    CompilationContext,
+    IndexCapabilities,
+    SubqueryStrategies,
+)
 
 
 class Operators(Enum):
@@ -35,6 +57,376 @@ class Operators(Enum):
     IENDSWITH = "iendswith"
     ANY = "any"
     ALL = "all"
+    BETWEEN = "between"
+    SEARCH = "search"
+    PHRASE = "phrase"
+
+
+class CaseInsensitiveStrategies(Enum):
+    # Equality or LIKE on the normalized shadow column.
+    NORMALIZED = "normalized"
+    # Equality or LIKE on the column of a case-insensitive type, like PostgreSQL citext.
+    CITEXT = "citext"
+    # Equality or LIKE on lower(column).
+    LOWER = "lower"
+    # ILIKE on the column, which a trigram index serves.
+    ILIKE = "ilike"
+    # Equality or LIKE with the case-insensitive collation of the dialect.
+    COLLATION = "collation"
+
+
+_SEMI_JOIN_STRATEGIES = (SubqueryStrategies.IN.value, SubqueryStrategies.HAVING.value)
+_POSTGRESQL = "postgresql"
+_SQLITE = "sqlite"
+# The default case-insensitive collations. MySQL 8 has one that is accent-sensitive, like lower().
+# MariaDB has none before 10.10: it uses one that all its versions support, which ignores accents.
+_MYSQL_CASE_INSENSITIVE_COLLATIONS = {
+    "mysql": "utf8mb4_0900_as_ci",
+    "mariadb": "utf8mb4_unicode_ci",
+}
+_MYSQL_DIALECTS = tuple(_MYSQL_CASE_INSENSITIVE_COLLATIONS)
+_SQLITE_CASE_INSENSITIVE_COLLATION = "NOCASE"
+_LIKE_ESCAPE = "\\"
+
+
+def _expanding_value(value: Any, pad_to_power_of_two: bool) -> list:
+    """
+    Convert the value of an expanding parameter to a list. If requested, the list is padded
+    by repeating its last item up to the next power of two, so that the number of distinct
+    statements rendered by the database driver stays logarithmic in the size of the list.
+    """
+    values = list(value)
+    if pad_to_power_of_two and len(values) > 1:
+        values += values[-1:] * ((1 << (len(values) - 1).bit_length()) - len(values))
+    return values
+
+
+def _array_param(field: FieldMap, name: str) -> Any:
+    """
+    Bind the values of the 'in' operators as a single PostgreSQL array: the statement
+    is the same for any number of values and the planner sees a single parameter.
+    """
+    return bindparam(name, type_=ARRAY(field.database_column.type))
+
+
+def _relationship_keys(field: FieldMap) -> tuple[list, list] | None:
+    """
+    Return the local and the remote columns of the relationship of the field, if its strategy
+    is a semi-join and it joins on a plain foreign key. Relationships through a secondary table
+    or with a custom join condition return None: they use the EXISTS strategy.
+    """
+    if field.subquery_strategy not in _SEMI_JOIN_STRATEGIES:
+        return None
+    relationship = getattr(field.database_column, "property", None)
+    if getattr(relationship, "secondary", True) is not None:
+        return None
+    pairs = relationship.local_remote_pairs
+    join_condition = and_(*[local == remote for local, remote in pairs])
+    if not join_condition.compare(relationship.primaryjoin):
+        return None
+    return [local for local, _ in pairs], [remote for _, remote in pairs]
+
+
+def _related_keys_in(
+    field: FieldMap, keys: tuple[list, list], criterion: Any | None
+) -> Any:
+    """
+    Build the semi-join testing whether the row has a related row matching the criterion.
+    """
+    local, remote = keys
+    # The keys of the rows without a parent would make NOT IN unknown.
+    subquery = (
+        select(*remote)
+        .where(*[column.is_not(None) for column in remote])
+        .correlate(None)
+    )
+    if field.subquery_strategy == SubqueryStrategies.HAVING.value:
+        subquery = subquery.group_by(*remote)
+        if criterion is not None:
+            subquery = subquery.having(func.count(case((criterion, 1))) > 0)
+    elif criterion is not None:
+        subquery = subquery.where(criterion)
+    if len(local) == 1:
+        return local[0].in_(subquery)
+    return tuple_(*local).in_(subquery)
+
+
+def bounds(value: Any) -> tuple[Any, Any]:
+    """
+    Return the lower and the upper bound of the value of a 'between' rule.
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise QueryBuilderFiltersSyntaxError(
+            "'between' operator requires a list with the lower and the upper bound"
+        )
+    return value[0], value[1]
+
+
+def _kernels() -> Any:
+    # pyarrow is an optional dependency: the vectorized hooks import its kernels on first use.
+    from query_builder.vectorized import kernels
+
+    return kernels
+
+
+def _indexed_case_insensitive_strategy(
+    field: FieldMap,
+) -> CaseInsensitiveStrategies | None:
+    # The forms that the indexes of the field serve, whatever the dialect.
+    if field.normalized_column is not None:
+        return CaseInsensitiveStrategies.NORMALIZED
+    if IndexCapabilities.CITEXT.value in field.index_capabilities:
+        return CaseInsensitiveStrategies.CITEXT
+    if IndexCapabilities.LOWER.value in field.index_capabilities:
+        return CaseInsensitiveStrategies.LOWER
+    if IndexCapabilities.TRIGRAM.value in field.index_capabilities:
+        return CaseInsensitiveStrategies.ILIKE
+    return None
+
+
+def case_insensitive_strategy(
+    config: CompilationConfig, field: FieldMap, like: bool = False
+) -> CaseInsensitiveStrategies:
+    """
+    Pick how the case-insensitive operators compare the field, preferring the forms that its
+    indexes can serve: the normalized shadow column, then the case-insensitive column type,
+    the lower() functional index and the trigram index. Without any, the comparisons use the
+    case-insensitive collation of the dialect, if it has one its indexes can serve.
+
+    :param config: the configuration, with the dialect the statements are built for.
+    :param field: the field to compare.
+    :param like: whether the comparison is a LIKE, e.g. of 'istartswith', instead of an equality.
+    :return: the strategy of the comparison.
+    """
+    strategy = _indexed_case_insensitive_strategy(field)
+    if strategy is not None:
+        return strategy
+    if like:
+        # SQLite ignores the collations in LIKE: only MySQL compares the pattern with one.
+        if config.dialect in _MYSQL_DIALECTS:
+            return CaseInsensitiveStrategies.COLLATION
+        return CaseInsensitiveStrategies.ILIKE
+    if case_insensitive_collation(config) is not None:
+        return CaseInsensitiveStrategies.COLLATION
+    return CaseInsensitiveStrategies.LOWER
+
+
+def _case_insensitive_value(field: FieldMap, value: Any) -> Any:
+    # The equalities compare with ILIKE only for the trigram index, whatever the dialect.
+    strategy = _indexed_case_insensitive_strategy(field)
+    if strategy == CaseInsensitiveStrategies.NORMALIZED:
+        return field.normalize(value)
+    if strategy == CaseInsensitiveStrategies.ILIKE:
+        return _escape_like(value)
+    return value
+
+
+def case_insensitive_collation(config: CompilationConfig) -> str | None:
+    """
+    Return the collation that makes the comparisons of the dialect case-insensitive, None if
+    the dialect has none that its indexes can serve.
+
+    :param config: the configuration, with the dialect the statements are built for.
+    :return: the name of the collation.
+    """
+    if config.dialect in _MYSQL_DIALECTS:
+        return (
+            config.case_insensitive_collation
+            or _MYSQL_CASE_INSENSITIVE_COLLATIONS[config.dialect]
+        )
+    if config.dialect == _SQLITE:
+        return _SQLITE_CASE_INSENSITIVE_COLLATION
+    return None
+
+
+def _case_insensitive_equals(
+    config: CompilationConfig, field: FieldMap, param: Any
+) -> Any:
+    strategy = case_insensitive_strategy(config, field)
+    if strategy == CaseInsensitiveStrategies.NORMALIZED:
+        return field.normalized_column == param
+    if strategy == CaseInsensitiveStrategies.CITEXT:
+        return field.database_column == param
+    if strategy == CaseInsensitiveStrategies.ILIKE:
+        return field.database_column.ilike(param, escape=_LIKE_ESCAPE)
+    if strategy == CaseInsensitiveStrategies.COLLATION:
+        # The explicit collation of the parameter applies to the comparison: an index of the column
+        # with the same collation serves it, unlike lower(column).
+        return field.database_column == collate(
+            param, case_insensitive_collation(config)
+        )
+    return func.lower(field.database_column) == func.lower(param)
+
+
+def _case_insensitive_like(
+    config: CompilationConfig, field: FieldMap, param: Any, escape: str = None
+) -> Any:
+    strategy = case_insensitive_strategy(config, field, like=True)
+    if strategy == CaseInsensitiveStrategies.NORMALIZED:
+        return field.normalized_column.like(param, escape=escape)
+    if strategy == CaseInsensitiveStrategies.CITEXT:
+        return field.database_column.like(param, escape=escape)
+    if strategy == CaseInsensitiveStrategies.LOWER:
+        return func.lower(field.database_column).like(func.lower(param), escape=escape)
+    if strategy == CaseInsensitiveStrategies.COLLATION:
+        return field.database_column.like(
+            collate(param, case_insensitive_collation(config)), escape=escape
+        )
+    return field.database_column.ilike(param, escape=escape)
+
+
+def _uses_case_insensitive_prefix_range(field: FieldMap, value: Any) -> bool:
+    # The range must compare normalized values on both sides: a normalized column or a citext one.
+    return (
+        field.prefix_range
+        and isinstance(value, str)
+        and _indexed_case_insensitive_strategy(field)
+        in (CaseInsensitiveStrategies.NORMALIZED, CaseInsensitiveStrategies.CITEXT)
+    )
+
+
+def _prefix_successor(prefix: str) -> str | None:
+    """
+    Return the smallest string greater than all the strings starting with the prefix,
+    None if there is none.
+    """
+    while prefix:
+        code_point = ord(prefix[-1]) + 1
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+        if code_point <= sys.maxunicode:
+            return prefix[:-1] + chr(code_point)
+        prefix = prefix[:-1]
+    return None
+
+
+def _bind_prefix_range(
+    context: CompilationContext, field: FieldMap, prefix: str
+) -> Hashable:
+    successor = _prefix_successor(prefix)
+    AbstractOperator._add_param(context, field, prefix)
+    if successor is not None:
+        AbstractOperator._add_param(context, field, successor)
+    AbstractOperator._add_param(context, field, f"{_escape_like(prefix)}%")
+    return successor is None
+
+
+def _prefix_range(
+    column: Any, context: CompilationContext, field: FieldMap, prefix: str
+) -> Any:
+    """
+    Compile 'column starts with prefix' as 'column >= prefix AND column < successor', which
+    a B-tree index serves as a range scan, rechecked by the LIKE of the prefix.
+    The column must have a binary collation, like the C collation of PostgreSQL: a linguistic one,
+    like en_US, sorts 'ABCx' between 'abc' and 'abd', which the LIKE rejects, and ignores the
+    punctuation, which can place strings starting with the prefix outside of the range.
+    """
+    successor = _prefix_successor(prefix)
+    bounds = [column >= bindparam(AbstractOperator._add_param(context, field, prefix))]
+    if successor is not None:
+        bounds.append(
+            column < bindparam(AbstractOperator._add_param(context, field, successor))
+        )
+    like = column.like(
+        bindparam(
+            AbstractOperator._add_param(context, field, f"{_escape_like(prefix)}%")
+        ),
+        escape=_LIKE_ESCAPE,
+    )
+    return and_(*bounds, like)
+
+
+def _field_predicate(
+    field: FieldMap, getter: Callable[[Any, str], Any], test: Callable[[Any], bool]
+) -> Callable[[Any], bool | None]:
+    """
+    Build a predicate that reads the field from the object and tests it, or returns None,
+    like a SQL comparison, if the field is NULL.
+    The values that Python can't compare with the value of the rule, like a string and a number,
+    are unknown too: where SQL would reject or coerce them, the item never raises.
+    """
+    name = field.name
+
+    def predicate(item: Any) -> bool | None:
+        field_value = getter(item, name)
+        if field_value is None:
+            return None
+        try:
+            return test(field_value)
+        except TypeError:
+            return None
+
+    return predicate
+
+
+def _unknown(item: Any) -> None:
+    return None
+
+
+def _negate(
+    predicate: Callable[[Any], bool | None],
+) -> Callable[[Any], bool | None]:
+    def negated(item: Any) -> bool | None:
+        result = predicate(item)
+        return None if result is None else not result
+
+    return negated
+
+
+def _like_pattern(pattern: str) -> re.Pattern:
+    """
+    Translate a LIKE pattern without an ESCAPE clause to a regular expression.
+    """
+    return re.compile(
+        "".join(
+            ".*" if char == "%" else "." if char == "_" else re.escape(char)
+            for char in pattern
+        ),
+        re.DOTALL,
+    )
+
+
+def _in_test(value: Any) -> Callable[[Any], bool | None]:
+    values = list(value)
+    has_null = any(v is None for v in values)
+    members = [v for v in values if v is not None]
+    try:
+        members = frozenset(members)
+    except TypeError:
+        pass
+
+    def test(field_value: Any) -> bool | None:
+        if field_value in members:
+            return True
+        return None if has_null else False
+
+    return test
+
+
+def _text_search(field: FieldMap, param: Any, phrase: bool) -> TextSearch:
+    if field.search_column is not None:
+        return TextSearch(
+            field.search_column, param, True, phrase, field.search_configuration
+        )
+    return TextSearch(
+        field.database_column, param, False, phrase, field.search_configuration
+    )
+
+
+def _search_query(code: str, value: Any) -> str:
+    if not isinstance(value, str):
+        raise QueryBuilderFiltersSyntaxError(f"'{code}' operator requires a string")
+    return value
+
+
+def _escape_like(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", f"{_LIKE_ESCAPE}%")
+        .replace("_", f"{_LIKE_ESCAPE}_")
+    )
 
 
 class EqualsOperator(AbstractOperator):
@@ -52,11 +444,30 @@ class EqualsOperator(AbstractOperator):
             self._add_param(context, field, value)
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value == value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("equal", column, value)
+
 
 class CaseInsensitiveEqualsOperator(AbstractOperator):
     def __init__(self, code: str = Operators.IEQUAL.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _case_insensitive_value(field, value)
+
     def apply(
         self,
         config: CompilationConfig,
@@ -64,8 +475,31 @@ class CaseInsensitiveEqualsOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return func.lower(field.database_column) == func.lower(
-            bindparam(self._add_param(context, field, value))
+        return _case_insensitive_equals(
+            config,
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        value = field.normalize(value)
+        return _field_predicate(
+            field, getter, lambda field_value: field.normalize(field_value) == value
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare_lower(
+            "equal", column, None if value is None else field.normalize(value)
         )
 
 
@@ -84,11 +518,37 @@ class LikeOperator(AbstractOperator):
             bindparam(self._add_param(context, field, value))
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        pattern = _like_pattern(value)
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: pattern.fullmatch(field_value) is not None,
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().like(column, value, False)
+
 
 class CaseInsensitiveLikeOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ILIKE.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        if field.normalized_column is not None:
+            return field.normalize(value)
+        return value
+
     def apply(
         self,
         config: CompilationConfig,
@@ -96,10 +556,34 @@ class CaseInsensitiveLikeOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return field.database_column.ilike(
-            bindparam(self._add_param(context, field, value))
+        return _case_insensitive_like(
+            config,
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        pattern = _like_pattern(field.normalize(value))
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: pattern.fullmatch(field.normalize(field_value))
+            is not None,
         )
 
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().like(column, value, True)
+
 
 class NotEqualsOperator(AbstractOperator):
     def __init__(self, code: str = Operators.NOTEQUAL.value):
@@ -116,11 +600,30 @@ class NotEqualsOperator(AbstractOperator):
             self._add_param(context, field, value)
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value != value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("not_equal", column, value)
+
 
 class CaseInsensitiveNotEqualsOperator(AbstractOperator):
     def __init__(self, code: str = Operators.INOTEQUAL.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _case_insensitive_value(field, value)
+
     def apply(
         self,
         config: CompilationConfig,
@@ -128,8 +631,35 @@ class CaseInsensitiveNotEqualsOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return func.lower(field.database_column) != func.lower(
-            bindparam(self._add_param(context, field, value))
+        return not_(
+            _case_insensitive_equals(
+                config,
+                field,
+                bindparam(
+                    self._add_param(context, field, self._param_value(field, value))
+                ),
+            )
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        value = field.normalize(value)
+        return _field_predicate(
+            field, getter, lambda field_value: field.normalize(field_value) != value
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare_lower(
+            "not_equal", column, None if value is None else field.normalize(value)
         )
 
 
@@ -145,14 +675,39 @@ class ContainsOperator(AbstractOperator):
         value: Any,
     ):
         return field.database_column.like(
-            bindparam(self._add_param(context, field, f"%{value}%"))
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
         )
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return f"%{_escape_like(value)}%"
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: value in field_value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("match_substring", column, value)
+
 
 class CaseInsensitiveContainsOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ICONTAINS.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        if field.normalized_column is not None:
+            value = field.normalize(value)
+        return f"%{_escape_like(value)}%"
+
     def apply(
         self,
         config: CompilationConfig,
@@ -160,14 +715,44 @@ class CaseInsensitiveContainsOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return field.database_column.ilike(
-            bindparam(self._add_param(context, field, f"%{value}%"))
+        return _case_insensitive_like(
+            config,
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        value = field.normalize(value)
+        return _field_predicate(
+            field, getter, lambda field_value: value in field.normalize(field_value)
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("match_substring", column, value, ignore_case=True)
+
 
 class InOperator(AbstractOperator):
-    def __init__(self, code: str = Operators.IN.value):
+    pad_to_power_of_two: bool
+
+    def __init__(
+        self, code: str = Operators.IN.value, pad_to_power_of_two: bool = False
+    ):
         super().__init__(code)
+        self.pad_to_power_of_two = pad_to_power_of_two
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _expanding_value(value, self.pad_to_power_of_two)
 
     def apply(
         self,
@@ -176,12 +761,49 @@ class InOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return field.database_column.in_(tuple(value))
+        if config.dialect == _POSTGRESQL:
+            return field.database_column == any_(
+                _array_param(
+                    field,
+                    self._add_param(context, field, self._param_value(field, value)),
+                )
+            )
+        return field.database_column.in_(
+            bindparam(
+                self._add_param(context, field, self._param_value(field, value)),
+                expanding=True,
+            )
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        values = list(value)
+        if not values:
+            return lambda item: False
+        return _field_predicate(field, getter, _in_test(values))
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().is_in(column, value)
 
 
 class NotInOperator(AbstractOperator):
-    def __init__(self, code: str = Operators.NOTIN.value):
+    pad_to_power_of_two: bool
+
+    def __init__(
+        self, code: str = Operators.NOTIN.value, pad_to_power_of_two: bool = False
+    ):
         super().__init__(code)
+        self.pad_to_power_of_two = pad_to_power_of_two
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _expanding_value(value, self.pad_to_power_of_two)
 
     def apply(
         self,
@@ -190,7 +812,38 @@ class NotInOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return not_(field.database_column.in_(tuple(value)))
+        if config.dialect == _POSTGRESQL:
+            return field.database_column != all_(
+                _array_param(
+                    field,
+                    self._add_param(context, field, self._param_value(field, value)),
+                )
+            )
+        return not_(
+            field.database_column.in_(
+                bindparam(
+                    self._add_param(context, field, self._param_value(field, value)),
+                    expanding=True,
+                )
+            )
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        values = list(value)
+        if not values:
+            return lambda item: True
+        return _negate(_field_predicate(field, getter, _in_test(values)))
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().not_in(column, value)
 
 
 class GreaterThanOperator(AbstractOperator):
@@ -206,6 +859,22 @@ class GreaterThanOperator(AbstractOperator):
     ):
         return field.database_column > bindparam(self._add_param(context, field, value))
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value > value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("greater", column, value)
+
 
 class GreaterThanOrEqualOperator(AbstractOperator):
     def __init__(self, code: str = Operators.GREATERTHANOREQUAL.value):
@@ -222,6 +891,22 @@ class GreaterThanOrEqualOperator(AbstractOperator):
             self._add_param(context, field, value)
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value >= value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("greater_equal", column, value)
+
 
 class LessThanOperator(AbstractOperator):
     def __init__(self, code: str = Operators.LESSTHAN.value):
@@ -236,6 +921,22 @@ class LessThanOperator(AbstractOperator):
     ):
         return field.database_column < bindparam(self._add_param(context, field, value))
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value < value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("less", column, value)
+
 
 class LessThanOrEqualOperator(AbstractOperator):
     def __init__(self, code: str = Operators.LESSTHANOREQUAL.value):
@@ -252,6 +953,125 @@ class LessThanOrEqualOperator(AbstractOperator):
             self._add_param(context, field, value)
         )
 
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(field, getter, lambda field_value: field_value <= value)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("less_equal", column, value)
+
+
+class BetweenOperator(AbstractOperator):
+    def __init__(self, code: str = Operators.BETWEEN.value):
+        super().__init__(code)
+
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        low, high = bounds(value)
+        self._add_param(context, field, low)
+        self._add_param(context, field, high)
+
+    def apply(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ):
+        low, high = bounds(value)
+        return field.database_column.between(
+            bindparam(self._add_param(context, field, low)),
+            bindparam(self._add_param(context, field, high)),
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        lower, upper = bounds(value)
+
+        def test(field_value: Any) -> bool | None:
+            above = None if lower is None else field_value >= lower
+            below = None if upper is None else field_value <= upper
+            if above is False or below is False:
+                return False
+            return None if above is None or below is None else True
+
+        return _field_predicate(field, getter, test)
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().between(column, value)
+
+
+class SearchOperator(AbstractOperator):
+    """
+    Full-text search with a web search query, e.g. 'quick -slow "brown fox"' on PostgreSQL
+    or a FTS5 query on SQLite. Served by the text index of the field instead of a LIKE scan.
+    """
+
+    def __init__(self, code: str = Operators.SEARCH.value):
+        super().__init__(code)
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _search_query(self.code, value)
+
+    def apply(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ):
+        return _text_search(
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            phrase=False,
+        )
+
+
+class PhraseOperator(AbstractOperator):
+    """
+    Full-text search of the words of the value, next to each other and in the same order.
+    """
+
+    def __init__(self, code: str = Operators.PHRASE.value):
+        super().__init__(code)
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return _search_query(self.code, value)
+
+    def apply(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ):
+        return _text_search(
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            phrase=True,
+        )
+
 
 class IsNullOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ISNULL.value):
@@ -266,6 +1086,30 @@ class IsNullOperator(AbstractOperator):
     ):
         return field.database_column.is_(None)
 
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        return None
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        name = field.name
+        return lambda item: getter(item, name) is None
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().is_null(column)
+
 
 class IsNotNullOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ISNOTNULL.value):
@@ -280,6 +1124,30 @@ class IsNotNullOperator(AbstractOperator):
     ):
         return field.database_column.is_not(None)
 
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        return None
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        name = field.name
+        return lambda item: getter(item, name) is not None
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().is_not_null(column)
+
 
 class IsEmptyOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ISEMPTY.value):
@@ -294,6 +1162,34 @@ class IsEmptyOperator(AbstractOperator):
     ):
         return func.trim(field.database_column) == ""
 
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        return None
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: isinstance(field_value, str)
+            and field_value.strip(" ") == "",
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().is_empty(column)
+
 
 class IsNotEmptyOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ISNOTEMPTY.value):
@@ -308,11 +1204,50 @@ class IsNotEmptyOperator(AbstractOperator):
     ):
         return func.trim(field.database_column) != ""
 
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        return None
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: not isinstance(field_value, str)
+            or field_value.strip(" ") != "",
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().is_not_empty(column)
+
 
 class StartsWithOperator(AbstractOperator):
     def __init__(self, code: str = Operators.STARTSWITH.value):
         super().__init__(code)
 
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        if field.prefix_range and isinstance(value, str):
+            return _bind_prefix_range(context, field, value)
+        self._add_param(context, field, self._param_value(field, value))
+
     def apply(
         self,
         config: CompilationConfig,
@@ -320,15 +1255,55 @@ class StartsWithOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
+        if field.prefix_range and isinstance(value, str):
+            return _prefix_range(field.database_column, context, field, value)
         return field.database_column.like(
-            bindparam(self._add_param(context, field, f"{value}%"))
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
+        )
+
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return f"{_escape_like(value)}%"
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(
+            field, getter, lambda field_value: str.startswith(field_value, value)
         )
 
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("starts_with", column, value)
+
 
 class CaseInsensitiveStartsWithOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ISTARTSWITH.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        if field.normalized_column is not None:
+            value = field.normalize(value)
+        return f"{_escape_like(value)}%"
+
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
+        if _uses_case_insensitive_prefix_range(field, value):
+            return _bind_prefix_range(context, field, field.normalize(value))
+        self._add_param(context, field, self._param_value(field, value))
+
     def apply(
         self,
         config: CompilationConfig,
@@ -336,10 +1311,41 @@ class CaseInsensitiveStartsWithOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return field.database_column.ilike(
-            bindparam(self._add_param(context, field, f"{value}%"))
+        if _uses_case_insensitive_prefix_range(field, value):
+            column = (
+                field.database_column
+                if field.normalized_column is None
+                else field.normalized_column
+            )
+            return _prefix_range(column, context, field, field.normalize(value))
+        return _case_insensitive_like(
+            config,
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        value = field.normalize(value)
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: str.startswith(field.normalize(field_value), value),
         )
 
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("starts_with", column, value, ignore_case=True)
+
 
 class EndsWithOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ENDSWITH.value):
@@ -353,14 +1359,41 @@ class EndsWithOperator(AbstractOperator):
         value: Any,
     ):
         return field.database_column.like(
-            bindparam(self._add_param(context, field, f"%{value}"))
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
         )
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        return f"%{_escape_like(value)}"
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        return _field_predicate(
+            field, getter, lambda field_value: str.endswith(field_value, value)
+        )
+
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("ends_with", column, value)
+
 
 class CaseInsensitiveEndsWithOperator(AbstractOperator):
     def __init__(self, code: str = Operators.IENDSWITH.value):
         super().__init__(code)
 
+    def _param_value(self, field: FieldMap, value: Any) -> Any:
+        if field.normalized_column is not None:
+            value = field.normalize(value)
+        return f"%{_escape_like(value)}"
+
     def apply(
         self,
         config: CompilationConfig,
@@ -368,10 +1401,34 @@ class CaseInsensitiveEndsWithOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
-        return field.database_column.ilike(
-            bindparam(self._add_param(context, field, f"%{value}"))
+        return _case_insensitive_like(
+            config,
+            field,
+            bindparam(self._add_param(context, field, self._param_value(field, value))),
+            escape=_LIKE_ESCAPE,
+        )
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        if value is None:
+            return _unknown
+        value = field.normalize(value)
+        return _field_predicate(
+            field,
+            getter,
+            lambda field_value: str.endswith(field.normalize(field_value), value),
         )
 
+    def vectorized(
+        self, config: CompilationConfig, field: FieldMap, value: Any, column: Any
+    ) -> Any:
+        return _kernels().compare("ends_with", column, value, ignore_case=True)
+
 
 class AnyOperator(AbstractOperator):
     def __init__(self, code: str = Operators.ANY.value):
@@ -384,10 +1441,39 @@ class AnyOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
+        criterion = value.compile(config, context) if value is not None else None
+        keys = _relationship_keys(field)
+        if keys is not None:
+            return _related_keys_in(field, keys, criterion)
+        if criterion is not None:
+            return field.database_column.any(criterion)
+        return field.database_column.any()
+
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
         if value is not None:
-            return field.database_column.any(value.compile(config, context))
-        else:
-            return field.database_column.any(text("1 = 1"))
+            return value.bind(config, context)
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        name = field.name
+        item_predicate = (
+            value.predicate(config, getter) if value is not None else lambda item: True
+        )
+        # EXISTS is never NULL: the related items where the criterion is NULL don't match.
+        return lambda item: any(
+            item_predicate(related) is True for related in getter(item, name) or ()
+        )
 
 
 class AllOperator(AbstractOperator):
@@ -401,7 +1487,37 @@ class AllOperator(AbstractOperator):
         field: FieldMap,
         value: Any,
     ):
+        if value is None:
+            return true()
+        # The related rows where the criterion is NULL don't match NOT criterion: they don't count.
+        criterion = not_(value.compile(config, context))
+        keys = _relationship_keys(field)
+        if keys is not None:
+            return not_(_related_keys_in(field, keys, criterion))
+        return not_(field.database_column.any(criterion))
+
+    def bind(
+        self,
+        config: CompilationConfig,
+        context: CompilationContext,
+        field: FieldMap,
+        value: Any,
+    ) -> Hashable:
         if value is not None:
-            return not_(field.database_column.any(not_(value.compile(config, context))))
-        else:
-            return not_(field.database_column.any(not_(text("1 = 1"))))
+            return value.bind(config, context)
+
+    def predicate(
+        self,
+        config: CompilationConfig,
+        field: FieldMap,
+        value: Any,
+        getter: Callable[[Any, str], Any],
+    ) -> Callable[[Any], bool | None]:
+        name = field.name
+        if value is None:
+            return lambda item: True
+        item_predicate = value.predicate(config, getter)
+        # NOT EXISTS (NOT criterion): the related items where the criterion is NULL don't count.
+        return lambda item: not any(
+            item_predicate(related) is False for related in getter(item, name) or ()
+        )
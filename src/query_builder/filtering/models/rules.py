@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Callable, Hashable
 
 from query_builder.filtering.models import (
     AbstractFilterRule,
@@ -8,6 +8,8 @@ from query_builder.shared.models import CompilationContext
 
 
 class SimpleFilterRule(AbstractFilterRule):
+    __slots__ = ("field", "operator", "value")
+
     field: str
     operator: str
     value: Any
@@ -24,6 +26,22 @@ class SimpleFilterRule(AbstractFilterRule):
             config, context, field_map, field_map.transform(self.value)
         )
 
+    def bind(self, config: CompilationConfig, context: CompilationContext) -> Hashable:
+        context.included_fields.add(self.field)
+        field_map = config.get_field(self.field)
+        value_shape = config.get_operator(self.operator, field_map).bind(
+            config, context, field_map, field_map.transform(self.value)
+        )
+        return self.field, self.operator, value_shape
+
+    def predicate(
+        self, config: CompilationConfig, getter: Callable[[Any, str], Any]
+    ) -> Callable[[Any], bool | None]:
+        field_map = config.get_field(self.field)
+        return config.get_operator(self.operator, field_map).predicate(
+            config, field_map, field_map.transform(self.value), getter
+        )
+
     @staticmethod
     def try_parse_dict(dictionary: dict) -> "SimpleFilterRule":
         if "field" in dictionary and "operator" in dictionary and "value" in dictionary:
@@ -33,6 +51,8 @@ class SimpleFilterRule(AbstractFilterRule):
 
 
 class ComplexFilterRule(AbstractFilterRule):
+    __slots__ = ("condition", "rules")
+
     condition: str
     rules: list[AbstractFilterRule]
 
@@ -44,6 +64,17 @@ class ComplexFilterRule(AbstractFilterRule):
         compiled_rules = [rule.compile(config, context) for rule in self.rules if rule]
         return config.get_condition(self.condition).join(compiled_rules)
 
+    def bind(self, config: CompilationConfig, context: CompilationContext) -> Hashable:
+        return self.condition, tuple(
+            rule.bind(config, context) for rule in self.rules if rule
+        )
+
+    def predicate(
+        self, config: CompilationConfig, getter: Callable[[Any, str], Any]
+    ) -> Callable[[Any], bool | None]:
+        predicates = [rule.predicate(config, getter) for rule in self.rules if rule]
+        return config.get_condition(self.condition).join_predicates(predicates)
+
     @staticmethod
     def try_parse_dict(dictionary: dict) -> "ComplexFilterRule":
         if "condition" in dictionary and "rules" in dictionary:
@@ -0,0 +1,353 @@
+import datetime
+import decimal
+from typing import Any, Hashable
+
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.filtering.models import AbstractFilterRule, CompilationConfig
+from query_builder.filtering.models.conditions import Conditions
+from query_builder.filtering.models.operators import Operators
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+
+_LOWER_BOUNDS = {Operators.GREATERTHAN.value, Operators.GREATERTHANOREQUAL.value}
+_UPPER_BOUNDS = {Operators.LESSTHAN.value, Operators.LESSTHANOREQUAL.value}
+_EXCLUSIVE_BOUNDS = {Operators.GREATERTHAN.value, Operators.LESSTHAN.value}
+# Values whose ordering and equality in Python match the ones of the database.
+_ORDERED_TYPES = (int, float, decimal.Decimal, datetime.date, datetime.time)
+
+
+def optimize(
+    filters: AbstractFilterRule | None, config: CompilationConfig = None
+) -> AbstractFilterRule | None:
+    """
+    Rewrite the filters into an equivalent, smaller tree:
+
+    - nested rules with the same condition are flattened and 'not(not(x))' becomes 'x';
+    - identical rules are removed;
+    - 'equal' and 'in' rules on the same field joined by 'or' are folded into a single 'in';
+    - range bounds on the same field joined by 'and' are merged, into 'between' if both are inclusive;
+    - 'any' rules on the same relationship joined by 'or', and 'all' rules joined by 'and', are merged
+      into a single rule, so that a single subquery reads the related rows;
+    - contradictions, like 'x = 1 and x = 2', become the always false rule 'x in []'.
+
+    A contradiction is unknown, not false, on the rows where the field is NULL: under a 'not',
+    or in the criterion of 'all', where unknown and false differ, it is kept as it is.
+    The filters are expected to be used as a WHERE criterion, not to be negated afterwards.
+
+    Bounds and equalities are compared only for numbers, dates and times: the ordering
+    and the equality of strings depend on the collation of the database.
+
+    :param filters: the filters to optimize.
+    :param config: the configuration the filters will be compiled with. If provided, the values are
+        compared after the transformation of their field and the operators introduced by the
+        optimizations must be allowed for the field.
+    :return: the optimized filters.
+    """
+    if filters is None:
+        return None
+    return _Optimizer(config).optimize(filters)
+
+
+class _Optimizer:
+    config: CompilationConfig | None
+
+    def __init__(self, config: CompilationConfig | None):
+        self.config = config
+
+    def optimize(
+        self, rule: AbstractFilterRule, negated: bool = False
+    ) -> AbstractFilterRule | None:
+        if not isinstance(rule, ComplexFilterRule):
+            return rule
+        negated = negated or rule.condition == Conditions.NOT.value
+        rules = [self.optimize(child, negated) for child in rule.rules if child]
+        rules = [child for child in rules if child]
+
+        if rule.condition == Conditions.NOT.value:
+            child = rules[0] if len(rules) == 1 else None
+            if (
+                isinstance(child, ComplexFilterRule)
+                and child.condition == rule.condition
+            ):
+                if len(child.rules) == 1:
+                    return child.rules[0]
+            return ComplexFilterRule(rule.condition, rules)
+        if rule.condition not in (Conditions.AND.value, Conditions.OR.value):
+            return ComplexFilterRule(rule.condition, rules)
+
+        rules = self._deduplicate(self._flatten(rule.condition, rules))
+        if rule.condition == Conditions.OR.value:
+            rules = self._fold_equals(rules)
+            rules = self._merge_subqueries(
+                rules, Operators.ANY.value, rule.condition, negated
+            )
+            # The false rules are 'x in []' or nullity contradictions: false even for NULL.
+            rules = [child for child in rules if not _is_false(child)] or rules[:1]
+        else:
+            rules = self._merge_bounds(rules, negated)
+            rules = self._merge_subqueries(
+                rules, Operators.ALL.value, rule.condition, negated
+            )
+            false_rule = next((child for child in rules if _is_false(child)), None)
+            if false_rule is not None:
+                return false_rule
+        if len(rules) == 1:
+            return rules[0]
+        return ComplexFilterRule(rule.condition, rules)
+
+    @staticmethod
+    def _flatten(
+        condition: str, rules: list[AbstractFilterRule]
+    ) -> list[AbstractFilterRule]:
+        flattened = []
+        for rule in rules:
+            if isinstance(rule, ComplexFilterRule) and rule.condition == condition:
+                flattened.extend(rule.rules)
+            else:
+                flattened.append(rule)
+        return flattened
+
+    @staticmethod
+    def _deduplicate(rules: list[AbstractFilterRule]) -> list[AbstractFilterRule]:
+        keys = set()
+        deduplicated = []
+        for rule in rules:
+            key = rule_key(rule)
+            if key not in keys:
+                keys.add(key)
+                deduplicated.append(rule)
+        return deduplicated
+
+    def _fold_equals(self, rules: list[AbstractFilterRule]) -> list[AbstractFilterRule]:
+        groups: dict[str, list[SimpleFilterRule]] = {}
+        for rule in rules:
+            if (
+                isinstance(rule, SimpleFilterRule)
+                and rule.operator in (Operators.EQUAL.value, Operators.IN.value)
+                and (
+                    rule.operator == Operators.EQUAL.value
+                    or isinstance(rule.value, list)
+                )
+            ):
+                groups.setdefault(rule.field, []).append(rule)
+
+        folded = []
+        for rule in rules:
+            group = groups.get(getattr(rule, "field", None))
+            if not group or rule not in group:
+                folded.append(rule)
+            elif len(group) == 1 or not self._allows(rule.field, Operators.IN.value):
+                folded.append(rule)
+            elif rule is group[0]:
+                values = []
+                for grouped_rule in group:
+                    for value in (
+                        grouped_rule.value
+                        if grouped_rule.operator == Operators.IN.value
+                        else [grouped_rule.value]
+                    ):
+                        if not any(_freeze(value) == _freeze(v) for v in values):
+                            values.append(value)
+                folded.append(SimpleFilterRule(rule.field, Operators.IN.value, values))
+        return folded
+
+    def _merge_subqueries(
+        self,
+        rules: list[AbstractFilterRule],
+        operator: str,
+        condition: str,
+        negated: bool,
+    ) -> list[AbstractFilterRule]:
+        # any(a) or any(b) is any(a or b), all(a) and all(b) is all(a and b).
+        groups: dict[str, list[SimpleFilterRule]] = {}
+        for rule in rules:
+            # The criteria that aren't parsed yet, e.g. dictionaries parsed by the transform
+            # function of the field, are kept as they are.
+            if (
+                isinstance(rule, SimpleFilterRule)
+                and rule.operator == operator
+                and (rule.value is None or isinstance(rule.value, AbstractFilterRule))
+            ):
+                groups.setdefault(rule.field, []).append(rule)
+
+        merged = []
+        for rule in rules:
+            group = groups.get(getattr(rule, "field", None))
+            if not group or rule not in group or len(group) == 1:
+                merged.append(rule)
+            elif rule is group[0]:
+                values = [r.value for r in group if r.value is not None]
+                # any(None) matches any related row, all(None) matches every row.
+                if operator == Operators.ANY.value and len(values) < len(group):
+                    values = []
+                value = None
+                if len(values) == 1:
+                    value = values[0]
+                elif values:
+                    # 'all' selects the related rows where the criterion is not true.
+                    value = self.optimize(
+                        ComplexFilterRule(condition, values),
+                        negated or operator == Operators.ALL.value,
+                    )
+                merged.append(SimpleFilterRule(rule.field, operator, value))
+        return merged
+
+    def _merge_bounds(
+        self, rules: list[AbstractFilterRule], negated: bool
+    ) -> list[AbstractFilterRule]:
+        bounds: dict[str, list[SimpleFilterRule]] = {}
+        equals: dict[str, SimpleFilterRule] = {}
+        nullity: dict[str, SimpleFilterRule] = {}
+        for rule in rules:
+            if not isinstance(rule, SimpleFilterRule):
+                continue
+            if rule.operator in _LOWER_BOUNDS | _UPPER_BOUNDS:
+                if self._ordered_value(rule) is not None:
+                    bounds.setdefault(rule.field, []).append(rule)
+            elif rule.operator == Operators.EQUAL.value:
+                other = equals.setdefault(rule.field, rule)
+                if other is not rule and self._values_differ(rule, other):
+                    if not negated and self._false(rule.field):
+                        return [self._false(rule.field)]
+            elif rule.operator in (Operators.ISNULL.value, Operators.ISNOTNULL.value):
+                # 'x is null and x is not null' is false, not unknown, even for NULL.
+                other = nullity.setdefault(rule.field, rule)
+                if other.operator != rule.operator and self._false(rule.field):
+                    return [self._false(rule.field)]
+
+        merged = []
+        for rule in rules:
+            group = bounds.get(getattr(rule, "field", None))
+            if not group or rule not in group:
+                merged.append(rule)
+                continue
+            if rule is not group[0]:
+                continue
+            merged.extend(self._merge_field_bounds(rule.field, group, negated))
+        return merged
+
+    def _merge_field_bounds(
+        self, field: str, rules: list[SimpleFilterRule], negated: bool
+    ) -> list[SimpleFilterRule]:
+        try:
+            lower = self._tightest(
+                [r for r in rules if r.operator in _LOWER_BOUNDS], True
+            )
+            upper = self._tightest(
+                [r for r in rules if r.operator in _UPPER_BOUNDS], False
+            )
+        except TypeError:
+            return rules
+        if lower is None or upper is None:
+            return [lower or upper]
+
+        low, high = self._ordered_value(lower), self._ordered_value(upper)
+        try:
+            empty = low > high or (
+                low == high
+                and (
+                    lower.operator in _EXCLUSIVE_BOUNDS
+                    or upper.operator in _EXCLUSIVE_BOUNDS
+                )
+            )
+        except TypeError:
+            return [lower, upper]
+        if empty and not negated and self._false(field):
+            return [self._false(field)]
+        if (
+            lower.operator not in _EXCLUSIVE_BOUNDS
+            and upper.operator not in _EXCLUSIVE_BOUNDS
+            and self._allows(field, Operators.BETWEEN.value)
+        ):
+            return [
+                SimpleFilterRule(
+                    field, Operators.BETWEEN.value, [lower.value, upper.value]
+                )
+            ]
+        return [lower, upper]
+
+    def _tightest(
+        self, rules: list[SimpleFilterRule], lower: bool
+    ) -> SimpleFilterRule | None:
+        tightest = None
+        for rule in rules:
+            if tightest is None:
+                tightest = rule
+                continue
+            value, tightest_value = self._ordered_value(rule), self._ordered_value(
+                tightest
+            )
+            if (value > tightest_value if lower else value < tightest_value) or (
+                value == tightest_value and rule.operator in _EXCLUSIVE_BOUNDS
+            ):
+                tightest = rule
+        return tightest
+
+    def _ordered_value(self, rule: SimpleFilterRule) -> Any:
+        value = self._transform(rule.field, rule.value)
+        if isinstance(value, _ORDERED_TYPES) and not isinstance(value, bool):
+            return value
+        return None
+
+    def _values_differ(self, rule: SimpleFilterRule, other: SimpleFilterRule) -> bool:
+        value, other_value = self._ordered_value(rule), self._ordered_value(other)
+        if value is None or type(value) is not type(other_value):
+            return False
+        return value != other_value
+
+    def _transform(self, field: str, value: Any) -> Any:
+        if self.config is None:
+            return value
+        try:
+            return self.config.get_field(field).transform(value)
+        except QueryBuilderFiltersSyntaxError:
+            return None
+
+    def _allows(self, field: str, operator: str) -> bool:
+        if self.config is None:
+            return True
+        try:
+            self.config.get_operator(operator, self.config.get_field(field))
+        except QueryBuilderFiltersSyntaxError:
+            return False
+        return True
+
+    def _false(self, field: str) -> SimpleFilterRule | None:
+        if not self._allows(field, Operators.IN.value):
+            return None
+        return SimpleFilterRule(field, Operators.IN.value, [])
+
+
+def _is_false(rule: AbstractFilterRule) -> bool:
+    return (
+        isinstance(rule, SimpleFilterRule)
+        and rule.operator == Operators.IN.value
+        and rule.value == []
+    )
+
+
+def rule_key(rule: AbstractFilterRule) -> Hashable:
+    """
+    Return a hashable key that is equal for identical rules.
+
+    :param rule: the rule.
+    :return: the key of the rule.
+    """
+    if isinstance(rule, SimpleFilterRule):
+        return rule.field, rule.operator, _freeze(rule.value)
+    if isinstance(rule, ComplexFilterRule):
+        return rule.condition, tuple(rule_key(child) for child in rule.rules if child)
+    return id(rule)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return dict, tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return list, tuple(_freeze(v) for v in value)
+    if isinstance(value, AbstractFilterRule):
+        return AbstractFilterRule, rule_key(value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return type(value), value
@@ -0,0 +1,78 @@
+from typing import Any
+
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+
+
+class _ParseError(Exception):
+    message: str
+    path: list[str]
+
+    def __init__(self, message: str, *path: str):
+        super().__init__(message)
+        self.message = message
+        self.path = list(path)
+
+
+def parse_dict(filters: Any) -> AbstractFilterRule:
+    """
+    Parse the filters in a single traversal, validating every node.
+
+    :param filters: the filters to parse.
+    :return: the AbstractFilterRule object parsed from the input.
+    :raise QueryBuilderFiltersSyntaxError: if a node is not a valid rule. The message contains its path.
+    """
+    try:
+        return _parse_rule(filters)
+    except _ParseError as error:
+        path = "".join(reversed(error.path))
+        raise QueryBuilderFiltersSyntaxError(f"${path}: {error.message}") from None
+
+
+def _parse_rule(node: Any) -> AbstractFilterRule:
+    if not isinstance(node, dict):
+        raise _ParseError(f"expected an object, got {type(node).__name__}")
+
+    if "rules" in node:
+        condition = node.get("condition")
+        rules = node["rules"]
+        if not isinstance(condition, str):
+            raise _ParseError("expected a string", ".condition")
+        if not isinstance(rules, list):
+            raise _ParseError("expected a list", ".rules")
+        parsed_rules = []
+        append = parsed_rules.append
+        for index, rule in enumerate(rules):
+            # Fast path for the well-formed simple rules, which are the bulk of the tree.
+            if rule.__class__ is dict and "rules" not in rule:
+                try:
+                    field, operator, value = (
+                        rule["field"],
+                        rule["operator"],
+                        rule["value"],
+                    )
+                except KeyError:
+                    pass
+                else:
+                    if field.__class__ is str and operator.__class__ is str:
+                        append(SimpleFilterRule(field, operator, value))
+                        continue
+            try:
+                append(_parse_rule(rule))
+            except _ParseError as error:
+                error.path.append(f".rules[{index}]")
+                raise
+        return ComplexFilterRule(condition, parsed_rules)
+
+    try:
+        field, operator, value = node["field"], node["operator"], node["value"]
+    except KeyError as error:
+        if "condition" in node:
+            raise _ParseError("missing key 'rules'")
+        raise _ParseError(f"missing key '{error.args[0]}'")
+    if not isinstance(field, str):
+        raise _ParseError("expected a string", ".field")
+    if not isinstance(operator, str):
+        raise _ParseError("expected a string", ".operator")
+    return SimpleFilterRule(field, operator, value)
@@ -0,0 +1,227 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from time import perf_counter
+from typing import Any, Callable
+
+from sqlalchemy import event
+
+from query_builder.shared.models import CompilationContext
+
+
+class Phases(Enum):
+    PARSE = "parse"
+    COMPILE = "compile"
+    RENDER = "render"
+    EXECUTE = "execute"
+
+
+class PhaseEvent:
+    """
+    The measurements of a phase: its duration and the size of the rules or of the statement it processed.
+    The measurements that don't apply to the phase are None.
+    """
+
+    __slots__ = (
+        "phase",
+        "component",
+        "duration",
+        "rule_count",
+        "depth",
+        "param_count",
+        "included_fields",
+        "rules",
+    )
+
+    phase: str
+    component: str
+    duration: float
+    rule_count: int | None
+    depth: int | None
+    param_count: int | None
+    included_fields: frozenset[str] | None
+    # The rules processed by the phase: a rule tree or a list of sort rules.
+    rules: Any
+
+    def __init__(
+        self,
+        phase: str,
+        component: str,
+        duration: float,
+        rule_count: int = None,
+        depth: int = None,
+        param_count: int = None,
+        included_fields: frozenset[str] = None,
+        rules: Any = None,
+    ):
+        self.phase = phase
+        self.component = component
+        self.duration = duration
+        self.rule_count = rule_count
+        self.depth = depth
+        self.param_count = param_count
+        self.included_fields = included_fields
+        self.rules = rules
+
+    def attributes(self) -> dict[str, Any]:
+        """
+        Return the measurements other than the duration that apply to the phase.
+
+        :return: the attributes of the event.
+        """
+        attributes = {"phase": self.phase, "component": self.component}
+        for name in ("rule_count", "depth", "param_count"):
+            if getattr(self, name) is not None:
+                attributes[name] = getattr(self, name)
+        if self.included_fields is not None:
+            attributes["included_fields"] = sorted(self.included_fields)
+        return attributes
+
+    def __repr__(self) -> str:
+        return f"PhaseEvent({self.attributes()}, duration={self.duration})"
+
+
+class AbstractObserver(ABC):
+    @abstractmethod
+    def observe(self, phase_event: PhaseEvent):
+        pass
+
+
+class CallbackObserver(AbstractObserver):
+    callback: Callable[[PhaseEvent], Any]
+
+    def __init__(self, callback: Callable[[PhaseEvent], Any]):
+        self.callback = callback
+
+    def observe(self, phase_event: PhaseEvent):
+        self.callback(phase_event)
+
+
+# Replaced, never mutated: the hot paths read it without locking.
+_observers: tuple[AbstractObserver, ...] = ()
+
+
+def add_observer(observer: AbstractObserver | Callable[[PhaseEvent], Any]):
+    """
+    Register an observer of the phases. While no observer is registered the phases are not measured.
+
+    :param observer: the observer, or a callback receiving the PhaseEvent objects.
+    """
+    global _observers
+    if not isinstance(observer, AbstractObserver):
+        observer = CallbackObserver(observer)
+    _observers = (*_observers, observer)
+
+
+def remove_observer(observer: AbstractObserver | Callable[[PhaseEvent], Any]):
+    """
+    Unregister an observer of the phases.
+
+    :param observer: the observer, or the callback, to unregister.
+    """
+    global _observers
+    _observers = tuple(
+        o
+        for o in _observers
+        if o is not observer and getattr(o, "callback", None) is not observer
+    )
+
+
+def start() -> float | None:
+    """
+    Start measuring a phase.
+
+    :return: the start time, None if no observer is registered.
+    """
+    return perf_counter() if _observers else None
+
+
+def record(
+    phase: Phases,
+    component: str,
+    start_time: float,
+    rules: Any = None,
+    context: CompilationContext = None,
+    param_count: int = None,
+):
+    """
+    Notify the observers of the end of a phase started with `start`.
+
+    :param phase: the phase.
+    :param component: the component that ran the phase: 'filters', 'sort' or 'sql'.
+    :param start_time: the time returned by `start`.
+    :param rules: the rules processed by the phase: a rule tree or a list of rules.
+    :param context: the compilation context filled by the phase.
+    :param param_count: the number of parameters, if there is no context.
+    """
+    duration = perf_counter() - start_time
+    rule_count = depth = included_fields = None
+    if rules is not None:
+        rule_count, depth = _tree_size(rules)
+    if context is not None:
+        param_count = len(context.params)
+        included_fields = frozenset(context.included_fields)
+    phase_event = PhaseEvent(
+        phase.value,
+        component,
+        duration,
+        rule_count,
+        depth,
+        param_count,
+        included_fields,
+        rules,
+    )
+    for observer in _observers:
+        observer.observe(phase_event)
+
+
+def instrument_engine(engine: Any):
+    """
+    Measure the SQL rendering and the execution of the statements run on the engine.
+
+    :param engine: the SqlAlchemy Engine, or AsyncEngine, to instrument.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    event.listen(engine, "before_execute", _before_execute)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_execute(connection, clauseelement, multiparams, params, execution_options):
+    connection.info["query_builder_start"] = start()
+
+
+def _before_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+):
+    start_time = connection.info.pop("query_builder_start", None)
+    if start_time is not None:
+        record(Phases.RENDER, "sql", start_time)
+    connection.info["query_builder_cursor_start"] = start()
+
+
+def _after_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+):
+    start_time = connection.info.pop("query_builder_cursor_start", None)
+    if start_time is not None:
+        record(
+            Phases.EXECUTE,
+            "sql",
+            start_time,
+            param_count=len(parameters) if hasattr(parameters, "__len__") else None,
+        )
+
+
+def _tree_size(rules: Any) -> tuple[int, int]:
+    children = rules if isinstance(rules, list) else getattr(rules, "rules", None)
+    if not isinstance(children, list):
+        return 1, 1
+    count = depth = 0
+    for child in children:
+        if child is not None:
+            child_count, child_depth = _tree_size(child)
+            count += child_count
+            depth = max(depth, child_depth)
+    if isinstance(rules, list):
+        return count, depth
+    return count + 1, depth + 1
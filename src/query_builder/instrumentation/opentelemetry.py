@@ -0,0 +1,41 @@
+from time import time_ns
+from typing import Any
+
+from opentelemetry import metrics, trace
+
+from query_builder.instrumentation import AbstractObserver, PhaseEvent
+
+
+class OpenTelemetryObserver(AbstractObserver):
+    """
+    Report every phase as a span, child of the current span, and its duration in a histogram.
+    """
+
+    tracer: Any
+    duration: Any
+
+    def __init__(self, tracer: Any = None, meter: Any = None):
+        self.tracer = tracer or trace.get_tracer("query_builder")
+        meter = meter or metrics.get_meter("query_builder")
+        self.duration = meter.create_histogram(
+            "query_builder.phase.duration",
+            unit="s",
+            description="Duration of the parse, compile, render and execute phases",
+        )
+
+    def observe(self, phase_event: PhaseEvent):
+        end_time = time_ns()
+        attributes = {
+            f"query_builder.{name}": value
+            for name, value in phase_event.attributes().items()
+        }
+        span = self.tracer.start_span(
+            f"query_builder.{phase_event.component}.{phase_event.phase}",
+            start_time=end_time - int(phase_event.duration * 1e9),
+            attributes=attributes,
+        )
+        span.end(end_time=end_time)
+        self.duration.record(
+            phase_event.duration,
+            {"phase": phase_event.phase, "component": phase_event.component},
+        )
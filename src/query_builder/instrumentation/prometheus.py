@@ -0,0 +1,71 @@
+from typing import Any
+
+from prometheus_client import REGISTRY, Counter, Histogram
+
+from query_builder.instrumentation import AbstractObserver, PhaseEvent
+
+_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class PrometheusObserver(AbstractObserver):
+    """
+    Export the durations of the phases, the sizes of the rules and the usage of the fields
+    as Prometheus metrics.
+    """
+
+    duration: Histogram
+    rule_count: Histogram
+    depth: Histogram
+    param_count: Histogram
+    field_usage: Counter
+
+    def __init__(self, registry: Any = REGISTRY, namespace: str = "query_builder"):
+        self.duration = Histogram(
+            "phase_duration_seconds",
+            "Duration of the parse, compile, render and execute phases",
+            ["phase", "component"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.rule_count = Histogram(
+            "rules",
+            "Number of rules processed by a phase",
+            ["phase", "component"],
+            namespace=namespace,
+            registry=registry,
+            buckets=_SIZE_BUCKETS,
+        )
+        self.depth = Histogram(
+            "rules_depth",
+            "Depth of the rule trees processed by a phase",
+            ["phase", "component"],
+            namespace=namespace,
+            registry=registry,
+            buckets=_SIZE_BUCKETS,
+        )
+        self.param_count = Histogram(
+            "params",
+            "Number of bound parameters",
+            ["phase", "component"],
+            namespace=namespace,
+            registry=registry,
+            buckets=_SIZE_BUCKETS,
+        )
+        self.field_usage = Counter(
+            "field_usage",
+            "Number of compilations that included a field",
+            ["component", "field"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def observe(self, phase_event: PhaseEvent):
+        labels = (phase_event.phase, phase_event.component)
+        self.duration.labels(*labels).observe(phase_event.duration)
+        if phase_event.rule_count is not None:
+            self.rule_count.labels(*labels).observe(phase_event.rule_count)
+            self.depth.labels(*labels).observe(phase_event.depth)
+        if phase_event.param_count is not None:
+            self.param_count.labels(*labels).observe(phase_event.param_count)
+        for field in phase_event.included_fields or ():
+            self.field_usage.labels(phase_event.component, field).inc()
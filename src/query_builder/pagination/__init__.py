@@ -0,0 +1,239 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable
+
+from sqlalchemy import and_, bindparam, false, or_, tuple_
+
+from query_builder.pagination.errors import QueryBuilderPaginationError
+from query_builder.shared.encoding import json_default
+from query_builder.shared.joins import apply_joins, required_joins
+from query_builder.shared.models import FieldMap, CompilationContext
+from query_builder.sorting import build_sorting
+from query_builder.sorting.configurations import cached_sort_config
+from query_builder.sorting.models import AbstractDirection, CompilationConfig
+from query_builder.sorting.models.rules import SortRule
+
+
+def apply_keyset_pagination(
+    sorting_rules: list[SortRule] | None,
+    fields_map: list[FieldMap],
+    *queries,
+    tiebreaker: str,
+    cursor: str | list | None = None,
+    limit: int | None = None,
+    config: CompilationConfig = None,
+    row_values: bool = True,
+    nulls_largest: bool = False,
+    transform_cursor: bool = True,
+) -> tuple:
+    """
+    Sort the given SqlAlchemy queries and select the page that comes after the cursor,
+    using a seek predicate on the sort keys instead of an OFFSET.
+    The sort keys can be NULL: the seek predicate places NULL where the database sorts it,
+    given by `nulls_largest`.
+
+    :param sorting_rules: the sort rules to build.
+    :param fields_map: the mapping between the 'field' inside the rule and the SqlAlchemy Column.
+    :param queries: the SqlAlchemy queries to process.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :param cursor: the cursor of the last row of the previous page, or the values of its sort keys.
+        None for the first page.
+    :param limit: the size of the page.
+    :param config: the configuration to use to parse the rules.
+    :param row_values: whether to use a row-value comparison when all the keys have the same direction.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle,
+        instead of before, like in SQLite, MySQL and SQL Server.
+    :param transform_cursor: whether to transform the values of the cursor by their FieldMap.
+        False for values read from the database, e.g. from the last row of the previous page.
+    :return: the SqlAlchemy queries sorted and restricted to the page.
+    """
+    context = CompilationContext()
+    statements, seek = build_keyset(
+        sorting_rules,
+        fields_map,
+        tiebreaker,
+        cursor,
+        context,
+        config,
+        row_values,
+        nulls_largest,
+        transform_cursor,
+    )
+    joins = required_joins(fields_map, context.included_fields)
+    queries = [apply_joins(query, joins).order_by(*statements) for query in queries]
+    if seek is not None:
+        queries = [query.where(seek) for query in queries]
+    if limit is not None:
+        queries = [query.limit(limit) for query in queries]
+    return tuple(queries)
+
+
+def build_keyset(
+    sorting_rules: list[SortRule] | None,
+    fields_map: list[FieldMap],
+    tiebreaker: str,
+    cursor: str | list | None,
+    context: CompilationContext,
+    config: CompilationConfig = None,
+    row_values: bool = True,
+    nulls_largest: bool = False,
+    transform_cursor: bool = True,
+) -> tuple[list, Any]:
+    """
+    Build the order by statement and the seek predicate of a keyset pagination.
+    The values of the cursor are transformed by their FieldMap, like the values of the filters,
+    unless they were read from the database. The values of an encoded cursor are decoded from
+    JSON first: the values that JSON doesn't
+    represent, like Decimal and datetime, come back as strings unless the transform function
+    of the field converts them.
+
+    :param sorting_rules: the sort rules to build.
+    :param fields_map: the mapping between the 'field' inside the rule and the SqlAlchemy Column.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :param cursor: the cursor of the last row of the previous page, or the values of its sort keys.
+        None for the first page.
+    :param context: the compilation context to use. Contains parameters and internals of the compilation.
+    :param config: the configuration to use to parse the rules.
+    :param row_values: whether to use a row-value comparison when all the keys have the same direction.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle,
+        instead of before, like in SQLite, MySQL and SQL Server.
+    :param transform_cursor: whether to transform the values of the cursor by their FieldMap.
+        False for values read from the database, which already have the type of the column.
+    :return: the order by statement and the seek predicate, None if there is no cursor.
+    """
+    config = config or cached_sort_config(fields_map)
+    rules = keyset_rules(sorting_rules, tiebreaker)
+    statements, _ = build_sorting(rules, fields_map, context, config)
+    if cursor is None:
+        return statements, None
+
+    values = cursor if isinstance(cursor, list) else decode_cursor(cursor)
+    if len(values) != len(rules):
+        raise QueryBuilderPaginationError("Cursor does not match the sort rules")
+
+    fields = [config.get_field(rule.field) for rule in rules]
+    directions = [config.get_direction(rule.direction) for rule in rules]
+    columns = [field.database_column for field in fields]
+    if transform_cursor:
+        values = [field.transform(value) for field, value in zip(fields, values)]
+    params = [
+        None if value is None else bindparam(f"{field.name}_cursor", value)
+        for field, value in zip(fields, values)
+    ]
+    # A row-value comparison is unknown when a key is NULL: it only fits the keys that
+    # can't be NULL, or whose NULL comes before the values of the cursor.
+    if (
+        row_values
+        and len({direction.code for direction in directions}) == 1
+        and None not in values
+        and not any(
+            _nullable(column) and direction.nulls_last(nulls_largest)
+            for column, direction in zip(columns, directions)
+        )
+    ):
+        return statements, directions[0].seek(config, tuple_(*columns), tuple_(*params))
+    # (a, b) > (:a, :b) with mixed directions expands to a > :a OR (a = :a AND b < :b).
+    return statements, or_(
+        *[
+            and_(
+                *[
+                    _equal(column, param)
+                    for column, param in zip(columns[:i], params[:i])
+                ],
+                _after(config, directions[i], columns[i], params[i], nulls_largest),
+            )
+            for i in range(len(rules))
+        ]
+    )
+
+
+def _nullable(column: Any) -> bool:
+    return getattr(column, "nullable", True) is not False
+
+
+def _equal(column: Any, param: Any) -> Any:
+    return column.is_(None) if param is None else column == param
+
+
+def _after(
+    config: CompilationConfig,
+    direction: AbstractDirection,
+    column: Any,
+    param: Any,
+    nulls_largest: bool,
+) -> Any:
+    # The comparisons with NULL are unknown: the NULL keys are placed explicitly.
+    nulls_last = _nullable(column) and direction.nulls_last(nulls_largest)
+    if param is None:
+        return false() if nulls_last else column.is_not(None)
+    seek = direction.seek(config, column, param)
+    return or_(seek, column.is_(None)) if nulls_last else seek
+
+
+def keyset_rules(
+    sorting_rules: list[SortRule] | None, tiebreaker: str
+) -> list[SortRule]:
+    """
+    Return the sort rules of a keyset pagination: the given rules followed by the tiebreaker.
+
+    :param sorting_rules: the sort rules requested.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :return: the sort rules of the keyset.
+    """
+    rules = list(sorting_rules or [])
+    if not all(isinstance(rule, SortRule) for rule in rules):
+        raise QueryBuilderPaginationError(
+            "Keyset pagination requires SortRule sort rules"
+        )
+    if tiebreaker not in {rule.field for rule in rules}:
+        rules.append(SortRule(tiebreaker))
+    return rules
+
+
+def cursor_from_row(
+    row: Any,
+    sorting_rules: list[SortRule] | None,
+    tiebreaker: str,
+    getter: Callable[[Any, str], Any] = getattr,
+) -> str:
+    """
+    Build the cursor that points after the given row.
+    The values are encoded in JSON, see `build_keyset` for the values that JSON doesn't represent.
+
+    :param row: the last row of the page.
+    :param sorting_rules: the sort rules of the page.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :param getter: the function that reads the value of a field from the row.
+    :return: the opaque cursor.
+    """
+    return encode_cursor(
+        [getter(row, rule.field) for rule in keyset_rules(sorting_rules, tiebreaker)]
+    )
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode the values of the sort keys as an opaque, URL-safe cursor.
+
+    :param values: the values of the sort keys.
+    :return: the cursor.
+    """
+    data = json.dumps(values, default=json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor built by `encode_cursor`.
+
+    :param cursor: the cursor.
+    :return: the values of the sort keys.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise QueryBuilderPaginationError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list):
+        raise QueryBuilderPaginationError(f"Invalid cursor: {cursor}")
+    return values
@@ -0,0 +1,2 @@
+class QueryBuilderPaginationError(Exception):
+    pass
@@ -0,0 +1,89 @@
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+class CostModel:
+    """
+    Weights and limits used to reject, or downgrade, the requests that are too expensive to run.
+
+    The cost of a simple rule is the weight of its operator times the weight of its field,
+    times the number of values for the operators that take a list of values.
+    The cost of a tree is the sum of the costs of its simple rules.
+    """
+
+    __slots__ = (
+        "operator_weights",
+        "field_weights",
+        "max_cost",
+        "max_depth",
+        "max_rules",
+        "max_in_size",
+        "max_sort_keys",
+        "downgrades",
+    )
+
+    operator_weights: Mapping[str, float]
+    field_weights: Mapping[str, float]
+    max_cost: float | None
+    max_depth: int | None
+    max_rules: int | None
+    max_in_size: int | None
+    max_sort_keys: int | None
+    downgrades: Mapping[str, str]
+
+    def __init__(
+        self,
+        operator_weights: dict[str, float] = None,
+        field_weights: dict[str, float] = None,
+        max_cost: float = None,
+        max_depth: int = None,
+        max_rules: int = None,
+        max_in_size: int = None,
+        max_sort_keys: int = None,
+        downgrades: dict[str, str] = None,
+    ):
+        """
+        :param operator_weights: the weight of each operator code. Defaults to 1.
+        :param field_weights: the weight of each field name, e.g. higher for unindexed columns. Defaults to 1.
+        :param max_cost: the maximum cost of the filters.
+        :param max_depth: the maximum depth of the filters tree.
+        :param max_rules: the maximum number of rules of the filters tree.
+        :param max_in_size: the maximum number of values of an 'in' or 'not_in' rule.
+        :param max_sort_keys: the maximum number of sort rules.
+        :param downgrades: the cheaper operator to use in place of an operator when the filters exceed
+            the maximum cost, e.g. 'contains' to 'startswith'.
+        """
+        # Cost models are immutable: they are part of the frozen configurations.
+        object.__setattr__(
+            self, "operator_weights", MappingProxyType(dict(operator_weights or {}))
+        )
+        object.__setattr__(
+            self, "field_weights", MappingProxyType(dict(field_weights or {}))
+        )
+        object.__setattr__(self, "max_cost", max_cost)
+        object.__setattr__(self, "max_depth", max_depth)
+        object.__setattr__(self, "max_rules", max_rules)
+        object.__setattr__(self, "max_in_size", max_in_size)
+        object.__setattr__(self, "max_sort_keys", max_sort_keys)
+        object.__setattr__(self, "downgrades", MappingProxyType(dict(downgrades or {})))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def rule_cost(self, field: str, operator: str, value_count: int = 1) -> float:
+        """
+        Return the cost of a simple rule.
+
+        :param field: the name of the field of the rule.
+        :param operator: the code of the operator of the rule.
+        :param value_count: the number of values of the rule.
+        :return: the cost of the rule.
+        """
+        return (
+            self.operator_weights.get(operator, 1)
+            * self.field_weights.get(field, 1)
+            * max(value_count, 1)
+        )
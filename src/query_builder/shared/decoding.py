@@ -0,0 +1,24 @@
+try:
+    import msgspec
+
+    _loads = msgspec.json.decode
+except ImportError:
+    try:
+        import orjson
+
+        _loads = orjson.loads
+    except ImportError:
+        import json
+
+        _loads = json.loads
+
+
+def loads_json(data: bytes | str):
+    """
+    Decode a JSON document with the fastest decoder installed: msgspec, orjson or the standard library.
+
+    :param data: the JSON document.
+    :return: the decoded document.
+    :raise ValueError: if the document is not valid JSON.
+    """
+    return _loads(data)
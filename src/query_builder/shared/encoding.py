@@ -0,0 +1,26 @@
+import json
+from typing import Any
+
+
+def json_default(value: Any) -> Any:
+    """
+    Encode the values that JSON doesn't support: dates and times as ISO 8601 strings,
+    anything else, like decimals and UUIDs, as strings.
+
+    :param value: the value to encode.
+    :return: the encoded value.
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """
+    Encode a value as a compact JSON document, with the values that JSON doesn't support encoded
+    by `json_default`.
+
+    :param value: the value to encode.
+    :return: the UTF-8 JSON document.
+    """
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
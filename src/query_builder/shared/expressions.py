@@ -0,0 +1,74 @@
+from typing import Any
+
+from sqlalchemy import Boolean, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+
+class TextSearch(ColumnElement):
+    """
+    Full-text match of a column against a query, rendered in the form that the text index
+    of each dialect can serve:
+
+    - PostgreSQL: `vector @@ websearch_to_tsquery(query)`, or `phraseto_tsquery` for a phrase.
+      The vector is the precomputed tsvector column, or `to_tsvector(column)`.
+    - SQLite and the other dialects: `column MATCH query`, the column of a FTS5 table.
+      A phrase is quoted so that its words must appear next to each other.
+    """
+
+    __visit_name__ = "text_search"
+    inherit_cache = True
+    type = Boolean()
+    # A comparison: dialects without a native boolean must not render it as 'match = 1'.
+    _is_implicitly_boolean = True
+
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("query", InternalTraversal.dp_clauseelement),
+        ("is_vector", InternalTraversal.dp_boolean),
+        ("phrase", InternalTraversal.dp_boolean),
+        ("configuration", InternalTraversal.dp_string),
+    ]
+
+    def __init__(
+        self,
+        column: Any,
+        query: Any,
+        is_vector: bool = False,
+        phrase: bool = False,
+        configuration: str | None = None,
+    ):
+        """
+        :param column: the text column, or the precomputed tsvector column.
+        :param query: the bind parameter of the search query.
+        :param is_vector: whether the column is a precomputed tsvector column.
+        :param phrase: whether the query is a phrase instead of a web search query.
+        :param configuration: the PostgreSQL text search configuration, e.g. 'english'.
+        """
+        self.column = column
+        self.query = query
+        self.is_vector = is_vector
+        self.phrase = phrase
+        self.configuration = configuration
+
+
+@compiles(TextSearch)
+def _compile_match(element: TextSearch, compiler: Any, **kw: Any) -> str:
+    query = compiler.process(element.query, **kw)
+    if element.phrase:
+        query = f"""'"' || replace({query}, '"', '""') || '"'"""
+    return f"{compiler.process(element.column, **kw)} MATCH {query}"
+
+
+@compiles(TextSearch, "postgresql")
+def _compile_tsquery(element: TextSearch, compiler: Any, **kw: Any) -> str:
+    configuration = ""
+    if element.configuration is not None:
+        configuration = f"{compiler.render_literal_value(element.configuration, String())}::regconfig, "
+    column = compiler.process(element.column, **kw)
+    if not element.is_vector:
+        column = f"to_tsvector({configuration}{column})"
+    function = "phraseto_tsquery" if element.phrase else "websearch_to_tsquery"
+    query = compiler.process(element.query, **kw)
+    return f"{column} @@ {function}({configuration}{query})"
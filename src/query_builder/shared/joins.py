@@ -0,0 +1,50 @@
+from typing import Any
+
+from query_builder.shared.models import FieldMap
+
+# The execution option that records the join paths already added to a query.
+_JOINED_PATHS = "query_builder_joined_paths"
+
+
+def required_joins(
+    fields_map: list[FieldMap], included_fields: set[str]
+) -> list[tuple[str, Any]]:
+    """
+    Return the joins that the included fields need, parents before children. The paths that share
+    a prefix share its joins: 'author' and 'author.publisher' join the author once.
+
+    :param fields_map: the fields of the filters or of the sort rules.
+    :param included_fields: the names of the fields used, see CompilationContext.included_fields.
+    :return: the dotted path and the relationship attribute of each join.
+    """
+    joins = {}
+    for field in fields_map:
+        if field.join_path and field.name in included_fields:
+            path = ""
+            for relationship in field.join_path:
+                path = f"{path}.{relationship.key}" if path else relationship.key
+                joins.setdefault(path, relationship)
+    return sorted(joins.items(), key=lambda join: join[0].count("."))
+
+
+def apply_joins(query: Any, joins: list[tuple[str, Any]]) -> Any:
+    """
+    Add the joins to the query with LEFT OUTER JOINs, so that the rows without a related row
+    are kept, skipping the ones already added by a previous call.
+    The join of a to-many relationship repeats the row for each of its related rows.
+
+    :param query: the SqlAlchemy query.
+    :param joins: the joins, see `required_joins`.
+    :return: the query with the joins.
+    """
+    if not joins:
+        return query
+    joined = query.get_execution_options().get(_JOINED_PATHS, frozenset())
+    paths = []
+    for path, relationship in joins:
+        if path not in joined:
+            query = query.outerjoin(relationship)
+            paths.append(path)
+    if not paths:
+        return query
+    return query.execution_options(**{_JOINED_PATHS: joined | frozenset(paths)})
@@ -1,12 +1,59 @@
-from typing import Any, Callable
+from enum import Enum
+from typing import Any, Callable, Hashable, Sequence
+
+
+class IndexCapabilities(Enum):
+    # Functional index on lower(column).
+    LOWER = "lower"
+    # Case-insensitive column type, like PostgreSQL citext.
+    CITEXT = "citext"
+    # Trigram index supporting ILIKE, like PostgreSQL pg_trgm.
+    TRIGRAM = "trigram"
+
+
+class SubqueryStrategies(Enum):
+    # Correlated EXISTS subquery, one probe of the related rows per row.
+    EXISTS = "exists"
+    # Semi-join: the key IN the keys of the matching related rows.
+    IN = "in"
+    # Semi-join on the related rows grouped by key, with the criterion in HAVING.
+    HAVING = "having"
 
 
 class FieldMap:
+    __slots__ = (
+        "name",
+        "database_column",
+        "blocked_operators",
+        "index_capabilities",
+        "normalized_column",
+        "prefix_range",
+        "search_column",
+        "search_configuration",
+        "subquery_strategy",
+        "join_path",
+        "_transform_function",
+        "_normalize_function",
+        "_key",
+        "_key_hash",
+    )
+
     name: str
     database_column: Any
-    blocked_operators: set[str]
+    blocked_operators: frozenset[str]
+    index_capabilities: frozenset[str]
+    normalized_column: Any
+    prefix_range: bool
+    search_column: Any
+    search_configuration: str | None
+    subquery_strategy: str | None
+    join_path: tuple
 
     _transform_function: Callable
+    _normalize_function: Callable
+    # The attributes compared by FieldMapsKey, computed once: the FieldMap is immutable.
+    _key: tuple
+    _key_hash: int
 
     def __init__(
         self,
@@ -14,24 +61,169 @@ class FieldMap:
         database_column: Any,
         transform_function: Callable = None,
         blocked_operators: set[str] = None,
+        index_capabilities: set[str] = None,
+        normalized_column: Any = None,
+        normalize_function: Callable = None,
+        prefix_range: bool = False,
+        search_column: Any = None,
+        search_configuration: str = None,
+        subquery_strategy: str = None,
+        join_path: Sequence = None,
     ):
-        self.name = name
-        self.database_column = database_column
-        self._transform_function = transform_function or (lambda x: x)
-        self.blocked_operators = blocked_operators or set()
+        # FieldMaps are immutable: they are hashed to memoize the configurations built on them.
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "database_column", database_column)
+        object.__setattr__(
+            self, "_transform_function", transform_function or _unchanged
+        )
+        object.__setattr__(
+            self, "blocked_operators", frozenset(blocked_operators or ())
+        )
+        # Case-insensitive operators pick the form that the indexes of the column can serve.
+        object.__setattr__(
+            self, "index_capabilities", frozenset(index_capabilities or ())
+        )
+        object.__setattr__(self, "normalized_column", normalized_column)
+        object.__setattr__(
+            self, "_normalize_function", normalize_function or _lower_strings
+        )
+        # 'startswith' compiles to a range on the column, that a B-tree index serves, rechecked by
+        # the LIKE. It requires a binary collation, like the C collation of PostgreSQL: under a
+        # linguistic one, like en_US, the range can miss strings that start with the prefix.
+        object.__setattr__(self, "prefix_range", prefix_range)
+        # Full-text operators match the precomputed tsvector column, or the FTS5 column, if any.
+        object.__setattr__(self, "search_column", search_column)
+        object.__setattr__(self, "search_configuration", search_configuration)
+        # How 'any' and 'all' query the related rows of a relationship, see SubqueryStrategies.
+        object.__setattr__(self, "subquery_strategy", subquery_strategy)
+        # The relationships to join to reach the column, e.g. (Book.author, Author.publisher).
+        # They are joined only when a filter or a sort rule uses the field. A to-many relationship
+        # repeats the row for each related row: the 'any' and 'all' operators test those instead.
+        object.__setattr__(self, "join_path", tuple(join_path or ()))
+        # SqlAlchemy columns overload ==: the columns and the functions are compared by id.
+        # The FieldMap keeps them alive, so their ids can't be reused while it is compared.
+        key = (
+            name,
+            self.blocked_operators,
+            self.index_capabilities,
+            prefix_range,
+            search_configuration,
+            subquery_strategy,
+            id(database_column),
+            id(normalized_column),
+            id(search_column),
+            id(self._transform_function),
+            id(self._normalize_function),
+            tuple(map(id, self.join_path)),
+        )
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_key_hash", hash(key))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
     def transform(self, value: Any) -> Any:
         if isinstance(value, list):
             return [self._transform_function(v) for v in value]
         return self._transform_function(value)
 
+    def normalize(self, value: Any) -> Any:
+        return self._normalize_function(value)
+
+
+def _unchanged(value: Any) -> Any:
+    return value
+
+
+def _lower_strings(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+class FieldMapsKey:
+    """
+    Hashable key of a list of FieldMaps, to memoize what is built on them.
+    Two lists get equal keys when their FieldMaps have the same attributes, even if they are
+    different objects, e.g. FieldMaps built per request on the same columns.
+    The columns and the functions are compared by identity, the other attributes by value.
+    """
+
+    __slots__ = ("fields_mapping", "_hash")
+
+    fields_mapping: tuple[FieldMap, ...]
+
+    def __init__(self, fields_mapping: Sequence[FieldMap]):
+        self.fields_mapping = tuple(fields_mapping)
+        self._hash = hash(tuple(field._key_hash for field in self.fields_mapping))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, FieldMapsKey)
+            and self._hash == other._hash
+            and len(self.fields_mapping) == len(other.fields_mapping)
+            and all(
+                a is b or a._key == b._key
+                for a, b in zip(self.fields_mapping, other.fields_mapping)
+            )
+        )
+
 
 class CompilationContext:
+    __slots__ = (
+        "params",
+        "param_counters",
+        "param_names",
+        "param_references",
+        "included_fields",
+    )
+
     params: dict[str, Any]
     param_counters: dict[str, int]
+    # The name of the parameter already bound to each (field, value) pair.
+    param_names: dict[Hashable, str]
+    # The name returned by each call of add_param, in order: shared parameters appear once per use.
+    param_references: list[str]
     included_fields: set[str]
 
     def __init__(self):
         self.params = {}
         self.param_counters = {}
+        self.param_names = {}
+        self.param_references = []
         self.included_fields = set()
+
+    def add_param(self, field_name: str, value: Any) -> str:
+        """
+        Register a parameter of the field and return its name. A value already bound to the field
+        reuses the parameter of its first occurrence.
+
+        :param field_name: the name of the field compared with the parameter.
+        :param value: the value of the parameter.
+        :return: the name of the parameter.
+        """
+        # The type is part of the key: 1, 1.0 and True are equal but bind differently.
+        # Sequences are never shared: they bind expanding parameters.
+        key = None
+        if not isinstance(value, (list, tuple, set, frozenset, dict)):
+            key = field_name, value.__class__, value
+            try:
+                param_name = self.param_names.get(key)
+            except TypeError:
+                key = param_name = None
+            if param_name is not None:
+                self.param_references.append(param_name)
+                return param_name
+
+        param_counter = self.param_counters.get(field_name, 0)
+        param_name = f"{field_name}_{param_counter}"
+        self.params[param_name] = value
+        self.param_counters[field_name] = param_counter + 1
+        if key is not None:
+            self.param_names[key] = param_name
+        self.param_references.append(param_name)
+        return param_name
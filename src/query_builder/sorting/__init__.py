@@ -1,5 +1,10 @@
+from query_builder import instrumentation
+from query_builder.instrumentation import Phases
+from query_builder.shared.decoding import loads_json
+from query_builder.shared.joins import apply_joins, required_joins
 from query_builder.shared.models import FieldMap, CompilationContext
 from query_builder.sorting.configurations import (
+    cached_sort_config,
     default_sort_config,
 )
 from query_builder.sorting.errors import QueryBuilderSortSyntaxError
@@ -33,7 +38,15 @@ def apply_sorting(
     context = CompilationContext()
     if statements is None:
         statements, _ = build_sorting(sorting_rules, fields_map, context, config)
-    return tuple([query.order_by(*statements) for query in queries])
+        joins = required_joins(fields_map, context.included_fields)
+    elif any(field.join_path for field in fields_map):
+        # The rules give the fields of the statements, and so their joins.
+        joins = required_joins(
+            fields_map, {getattr(rule, "field", None) for rule in sorting_rules}
+        )
+    else:
+        joins = []
+    return tuple([apply_joins(query, joins).order_by(*statements) for query in queries])
 
 
 def build_sorting(
@@ -50,9 +63,20 @@ def build_sorting(
     :param context: the compilation context to use. Contains parameters and internals of the compilation.
     :param config: the configuration to use to parse the rules.
     :return: the order by statement.
+    :raise QueryBuilderSortSyntaxError: if the rules exceed the cost model of the configuration.
     """
-    config = config or default_sort_config(fields_map)
+    start_time = instrumentation.start()
+    config = config or cached_sort_config(fields_map)
+    max_sort_keys = config.cost_model and config.cost_model.max_sort_keys
+    if max_sort_keys is not None and len(sorting_rules) > max_sort_keys:
+        raise QueryBuilderSortSyntaxError(
+            f"Too many sort keys: {len(sorting_rules)}, maximum {max_sort_keys}"
+        )
     statements = [rule.compile(config, context) for rule in sorting_rules]
+    if start_time is not None:
+        instrumentation.record(
+            Phases.COMPILE, "sort", start_time, rules=sorting_rules, context=context
+        )
     return statements, context
 
 
@@ -66,6 +90,42 @@ def try_parse_dict(
     :param syntax_types: the syntax types to use to parse the sorting rules.
     :return: the list of parsed rules.
     """
+    start_time = instrumentation.start()
+    rules = _parse_rules(sorting_rules, syntax_types)
+    if start_time is not None:
+        instrumentation.record(Phases.PARSE, "sort", start_time, rules=rules)
+    return rules
+
+
+def parse_sort_json(
+    data: bytes | str, *, syntax_types: list[type[AbstractSortRule]] = None
+) -> list[AbstractSortRule]:
+    """
+    Decode and parse the sorting rules from a JSON document.
+
+    :param data: the JSON document of the sorting rules.
+    :param syntax_types: the syntax types to use to parse the sorting rules.
+    :return: the list of parsed rules.
+    :raise QueryBuilderSortSyntaxError: if the document is not valid JSON or not a list of rules.
+    """
+    start_time = instrumentation.start()
+    try:
+        sorting_rules = loads_json(data)
+    except ValueError as error:
+        raise QueryBuilderSortSyntaxError(f"Invalid JSON: {error}") from None
+    if not isinstance(sorting_rules, list) or not all(
+        isinstance(sorting_rule, dict) for sorting_rule in sorting_rules
+    ):
+        raise QueryBuilderSortSyntaxError("Sort rules must be a list of objects")
+    rules = _parse_rules(sorting_rules, syntax_types)
+    if start_time is not None:
+        instrumentation.record(Phases.PARSE, "sort", start_time, rules=rules)
+    return rules
+
+
+def _parse_rules(
+    sorting_rules: list[dict], syntax_types: list[type[AbstractSortRule]] | None
+) -> list[AbstractSortRule]:
     syntax_types = syntax_types or [SortRule]
     rules = []
     for sorting_rule in sorting_rules:
@@ -1,4 +1,7 @@
-from query_builder.shared.models import FieldMap
+from functools import lru_cache
+
+from query_builder.shared.cost import CostModel
+from query_builder.shared.models import FieldMap, FieldMapsKey
 from query_builder.sorting.models import CompilationConfig
 from query_builder.sorting.models.directions import AscDirection, DescDirection
 from query_builder.sorting.models.rules import SortRule
@@ -10,9 +13,33 @@ default_all_directions = [
 ]
 
 
-def default_sort_config(fields_mapping: list[FieldMap]) -> CompilationConfig:
+def default_sort_config(
+    fields_mapping: list[FieldMap], cost_model: CostModel = None
+) -> CompilationConfig:
     return CompilationConfig(
         fields_mapping=fields_mapping,
         directions=default_all_directions,
         syntax_types=[SortRule],
+        cost_model=cost_model,
     )
+
+
+def cached_sort_config(fields_mapping: list[FieldMap]) -> CompilationConfig:
+    """
+    Return the default configuration for the given fields.
+    The configuration is built once per set of FieldMaps and shared between calls.
+    FieldMaps built per request share the configuration of the equal FieldMaps, see FieldMapsKey.
+    At most 256 configurations are kept, the least recently used are dropped.
+    """
+    return _identical_sort_config(tuple(fields_mapping))
+
+
+@lru_cache(maxsize=256)
+def _identical_sort_config(fields_mapping: tuple[FieldMap, ...]) -> CompilationConfig:
+    # FieldMaps hash by identity: the same FieldMaps hit here without building their key.
+    return _cached_sort_config(FieldMapsKey(fields_mapping))
+
+
+@lru_cache(maxsize=256)
+def _cached_sort_config(fields_key: FieldMapsKey) -> CompilationConfig:
+    return default_sort_config(list(fields_key.fields_mapping))
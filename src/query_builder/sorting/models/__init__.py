@@ -1,25 +1,47 @@
 from abc import abstractmethod, ABC
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
+from query_builder.shared.cost import CostModel
 from query_builder.shared.models import FieldMap, CompilationContext
 from query_builder.sorting.errors import QueryBuilderSortSyntaxError
 
 
 class CompilationConfig:
-    syntax_types: list[type["AbstractSortRule"]]
+    __slots__ = ("syntax_types", "cost_model", "_fields_mapping", "_directions_map")
 
-    _fields_mapping: dict[str, FieldMap]
-    _directions_map: dict[str, "AbstractDirection"]
+    syntax_types: tuple[type["AbstractSortRule"], ...]
+    cost_model: CostModel | None
+
+    _fields_mapping: Mapping[str, FieldMap]
+    _directions_map: Mapping[str, "AbstractDirection"]
 
     def __init__(
         self,
         fields_mapping: list[FieldMap],
         directions: list["AbstractDirection"],
         syntax_types: list[type["AbstractSortRule"]],
+        cost_model: CostModel = None,
     ):
-        self._fields_mapping = {field.name: field for field in fields_mapping}
-        self._directions_map = {direction.code: direction for direction in directions}
-        self.syntax_types = syntax_types
+        # Configurations are frozen: they are memoized and shared between compilations.
+        object.__setattr__(
+            self,
+            "_fields_mapping",
+            MappingProxyType({field.name: field for field in fields_mapping}),
+        )
+        object.__setattr__(
+            self,
+            "_directions_map",
+            MappingProxyType({direction.code: direction for direction in directions}),
+        )
+        object.__setattr__(self, "syntax_types", tuple(syntax_types))
+        object.__setattr__(self, "cost_model", cost_model)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
     def get_direction(self, code: str) -> "AbstractDirection":
         try:
@@ -39,6 +61,22 @@ class AbstractSortRule(ABC):
     def compile(self, config: CompilationConfig, context: CompilationContext):
         raise NotImplementedError()
 
+    def sort_key(
+        self,
+        config: CompilationConfig,
+        getter: Callable[[Any, str], Any],
+        nulls_largest: bool = False,
+    ) -> Callable[[Any], Any]:
+        """
+        Build a function that returns the key of a Python object for `sorted`,
+        ordering the objects like the ORDER BY statement of the rule.
+
+        :param getter: the function that reads the value of a field from the object.
+        :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL.
+        :return: the key function.
+        """
+        raise NotImplementedError()
+
     @staticmethod
     @abstractmethod
     def try_parse_dict(dictionary: dict) -> "AbstractSortRule":
@@ -58,3 +96,24 @@ class AbstractDirection(ABC):
         field_map: FieldMap,
     ) -> Any:
         raise NotImplementedError()
+
+    def seek(self, config: CompilationConfig, column: Any, value: Any) -> Any:
+        """
+        Build the predicate that selects the rows that come after the given value
+        when sorting in this direction.
+        """
+        raise NotImplementedError()
+
+    def nulls_last(self, nulls_largest: bool) -> bool:
+        """
+        Tell whether NULL comes after any value when sorting in this direction.
+
+        :param nulls_largest: whether NULL sorts after any value in ascending order, like in PostgreSQL.
+        """
+        raise NotImplementedError()
+
+    def sort_key(self, config: CompilationConfig, key: Any) -> Any:
+        """
+        Return the key that orders the Python objects in this direction.
+        """
+        raise NotImplementedError()
@@ -3,6 +3,7 @@ from typing import Any
 
 from query_builder.shared.models import FieldMap
 from query_builder.sorting.models import AbstractDirection, CompilationConfig
+from query_builder.sorting.models.keys import DescendingKey
 
 
 class Directions(Enum):
@@ -17,6 +18,15 @@ class AscDirection(AbstractDirection):
     def apply(self, config: CompilationConfig, field_map: FieldMap) -> Any:
         return field_map.database_column
 
+    def seek(self, config: CompilationConfig, column: Any, value: Any) -> Any:
+        return column > value
+
+    def nulls_last(self, nulls_largest: bool) -> bool:
+        return nulls_largest
+
+    def sort_key(self, config: CompilationConfig, key: Any) -> Any:
+        return key
+
 
 class DescDirection(AbstractDirection):
     def __init__(self, code: str = Directions.DESC.value):
@@ -24,3 +34,12 @@ class DescDirection(AbstractDirection):
 
     def apply(self, config: CompilationConfig, field_map: FieldMap) -> Any:
         return field_map.database_column.desc()
+
+    def seek(self, config: CompilationConfig, column: Any, value: Any) -> Any:
+        return column < value
+
+    def nulls_last(self, nulls_largest: bool) -> bool:
+        return not nulls_largest
+
+    def sort_key(self, config: CompilationConfig, key: Any) -> Any:
+        return DescendingKey(key)
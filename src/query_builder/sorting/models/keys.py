@@ -0,0 +1,32 @@
+from functools import total_ordering
+from typing import Any
+
+
+def null_ordered_key(value: Any, nulls_largest: bool = False) -> tuple:
+    """
+    Return a key that orders the values like the ORDER BY of the database, where NULL is either
+    lower than any value (SQLite, MySQL, SQL Server) or greater (PostgreSQL, Oracle).
+    """
+    if value is None:
+        return (2 if nulls_largest else 0), None
+    return 1, value
+
+
+@total_ordering
+class DescendingKey:
+    """
+    A key that reverses the ordering of the wrapped key.
+    """
+
+    __slots__ = ("key",)
+
+    key: Any
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __eq__(self, other: "DescendingKey") -> bool:
+        return self.key == other.key
+
+    def __lt__(self, other: "DescendingKey") -> bool:
+        return other.key < self.key
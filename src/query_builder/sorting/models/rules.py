@@ -1,6 +1,9 @@
+from typing import Any, Callable
+
 from query_builder.shared.models import CompilationContext
 from query_builder.sorting.models import CompilationConfig, AbstractSortRule
 from query_builder.sorting.models.directions import Directions
+from query_builder.sorting.models.keys import null_ordered_key
 
 
 class SortRule(AbstractSortRule):
@@ -16,6 +19,22 @@ class SortRule(AbstractSortRule):
         field_map = config.get_field(self.field)
         return config.get_direction(self.direction).apply(config, field_map)
 
+    def sort_key(
+        self,
+        config: CompilationConfig,
+        getter: Callable[[Any, str], Any],
+        nulls_largest: bool = False,
+    ) -> Callable[[Any], Any]:
+        name = config.get_field(self.field).name
+        direction = config.get_direction(self.direction)
+        null_key = null_ordered_key(None, nulls_largest)
+
+        def sort_key(item: Any) -> Any:
+            value = getter(item, name)
+            return direction.sort_key(config, null_key if value is None else (1, value))
+
+        return sort_key
+
     @staticmethod
     def try_parse_dict(dictionary: dict) -> "SortRule":
         if "field" not in dictionary and "property" in dictionary:
@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from sqlalchemy import Select
+
+from query_builder.pagination import apply_keyset_pagination, keyset_rules
+from query_builder.shared.encoding import json_default
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.configurations import cached_sort_config
+from query_builder.sorting.models import CompilationConfig
+from query_builder.sorting.models.rules import SortRule
+
+
+def stream_batches(
+    connection: Any, query: Select, batch_size: int = 1000
+) -> Iterator[list]:
+    """
+    Execute the query with a server-side cursor and yield its rows in batches,
+    holding at most one batch in memory.
+
+    :param connection: the SqlAlchemy Connection or Session to use.
+    :param query: the query to execute, typically filtered and sorted by `apply_filters` and `apply_sorting`.
+    :param batch_size: the number of rows of each batch.
+    :return: the iterator of the batches of rows.
+    """
+    result = connection.execute(query.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+async def stream_batches_async(
+    connection: Any, query: Select, batch_size: int = 1000
+) -> AsyncIterator[list]:
+    """
+    Execute the query with a server-side cursor and yield its rows in batches,
+    holding at most one batch in memory.
+
+    :param connection: the SqlAlchemy AsyncConnection or AsyncSession to use.
+    :param query: the query to execute, typically filtered and sorted by `apply_filters` and `apply_sorting`.
+    :param batch_size: the number of rows of each batch.
+    :return: the asynchronous iterator of the batches of rows.
+    """
+    result = await connection.stream(query.execution_options(yield_per=batch_size))
+    try:
+        async for partition in result.partitions():
+            yield partition
+    finally:
+        await result.close()
+
+
+def stream_keyset_batches(
+    connection: Any,
+    query: Select,
+    sorting_rules: list[SortRule] | None,
+    fields_map: list[FieldMap],
+    tiebreaker: str,
+    batch_size: int = 1000,
+    config: CompilationConfig = None,
+    nulls_largest: bool = False,
+) -> Iterator[list]:
+    """
+    Yield the rows of the query in batches, each one fetched by its own short query that seeks
+    after the last row of the previous batch. Unlike a server-side cursor, no query or transaction
+    stays open between the batches, which suits long-running exports.
+
+    :param connection: the SqlAlchemy Connection or Session to use.
+    :param query: the query to execute, typically filtered by `apply_filters`. It must select the
+        columns of the sort keys and must not be sorted.
+    :param sorting_rules: the sort rules of the export.
+    :param fields_map: the mapping between the 'field' inside the rule and the SqlAlchemy Column.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :param batch_size: the number of rows of each batch.
+    :param config: the configuration to use to parse the rules.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle,
+        instead of before, like in SQLite, MySQL and SQL Server.
+    :return: the iterator of the batches of rows.
+    """
+    config = config or cached_sort_config(fields_map)
+    cursor = None
+    while True:
+        (page,) = apply_keyset_pagination(
+            sorting_rules,
+            fields_map,
+            query,
+            tiebreaker=tiebreaker,
+            cursor=cursor,
+            limit=batch_size,
+            config=config,
+            nulls_largest=nulls_largest,
+            transform_cursor=False,
+        )
+        rows = connection.execute(page).all()
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        cursor = _keyset_values(rows[-1], sorting_rules, tiebreaker, config)
+
+
+async def stream_keyset_batches_async(
+    connection: Any,
+    query: Select,
+    sorting_rules: list[SortRule] | None,
+    fields_map: list[FieldMap],
+    tiebreaker: str,
+    batch_size: int = 1000,
+    config: CompilationConfig = None,
+    nulls_largest: bool = False,
+) -> AsyncIterator[list]:
+    """
+    Asynchronous version of `stream_keyset_batches`.
+
+    :param connection: the SqlAlchemy AsyncConnection or AsyncSession to use.
+    :param query: the query to execute. It must select the columns of the sort keys and must not be sorted.
+    :param sorting_rules: the sort rules of the export.
+    :param fields_map: the mapping between the 'field' inside the rule and the SqlAlchemy Column.
+    :param tiebreaker: the field with unique values appended to the sort keys.
+    :param batch_size: the number of rows of each batch.
+    :param config: the configuration to use to parse the rules.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle.
+    :return: the asynchronous iterator of the batches of rows.
+    """
+    config = config or cached_sort_config(fields_map)
+    cursor = None
+    while True:
+        (page,) = apply_keyset_pagination(
+            sorting_rules,
+            fields_map,
+            query,
+            tiebreaker=tiebreaker,
+            cursor=cursor,
+            limit=batch_size,
+            config=config,
+            nulls_largest=nulls_largest,
+            transform_cursor=False,
+        )
+        rows = (await connection.execute(page)).all()
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        cursor = _keyset_values(rows[-1], sorting_rules, tiebreaker, config)
+
+
+def ndjson_chunk(rows: Iterable[Any]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON, one object per row.
+
+    :param rows: the SqlAlchemy rows to encode.
+    :return: the encoded rows.
+    """
+    return "".join(
+        [json.dumps(dict(row._mapping), default=json_default) + "\n" for row in rows]
+    ).encode()
+
+
+def csv_chunk(rows: Iterable[Any], header: bool = False) -> str:
+    """
+    Encode rows as CSV.
+
+    :param rows: the SqlAlchemy rows to encode.
+    :param header: whether to start with a header line with the names of the columns.
+    :return: the encoded rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        if header:
+            writer.writerow(row._fields)
+            header = False
+        writer.writerow(row)
+    return buffer.getvalue()
+
+
+def ndjson_chunks(batches: Iterable[list]) -> Iterator[bytes]:
+    """
+    Encode each batch of rows as a chunk of newline-delimited JSON.
+
+    :param batches: the batches of rows, e.g. from `stream_batches`.
+    :return: the iterator of the chunks.
+    """
+    for batch in batches:
+        yield ndjson_chunk(batch)
+
+
+def csv_chunks(batches: Iterable[list], header: bool = True) -> Iterator[str]:
+    """
+    Encode each batch of rows as a chunk of CSV.
+
+    :param batches: the batches of rows, e.g. from `stream_batches`.
+    :param header: whether the first chunk starts with a header line with the names of the columns.
+    :return: the iterator of the chunks.
+    """
+    for batch in batches:
+        yield csv_chunk(batch, header)
+        header = False
+
+
+def _keyset_values(
+    row: Any,
+    sorting_rules: list[SortRule] | None,
+    tiebreaker: str,
+    config: CompilationConfig,
+) -> list:
+    # The row is read by column: the values keep the types of the columns, without a JSON round
+    # trip, and must not go through the transform function of their field again.
+    return [
+        row._mapping[config.get_field(rule.field).database_column]
+        for rule in keyset_rules(sorting_rules, tiebreaker)
+    ]
@@ -0,0 +1,237 @@
+from typing import Any, Callable, Mapping
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from query_builder.filtering.configurations import cached_filters_config
+from query_builder.filtering.cost import enforce_cost
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models import CompilationConfig as FiltersConfig
+from query_builder.filtering.models.conditions import Conditions
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.configurations import cached_sort_config
+from query_builder.sorting.errors import QueryBuilderSortSyntaxError
+from query_builder.sorting.models import AbstractSortRule
+from query_builder.sorting.models import CompilationConfig as SortConfig
+from query_builder.sorting.models.directions import AscDirection, DescDirection
+from query_builder.sorting.models.rules import SortRule
+
+
+def filter_mask(
+    filters: AbstractFilterRule | None,
+    fields_map: list[FieldMap],
+    data: Any,
+    config: FiltersConfig = None,
+) -> pa.BooleanArray:
+    """
+    Evaluate the filters on columnar data as a boolean mask, with the same semantics as the WHERE
+    statement built by `build_filters`: the rows where the statement is NULL don't match.
+
+    :param filters: the filters to evaluate.
+    :param fields_map: the fields of the filters. The columns are read using the name of the fields.
+    :param data: a pyarrow Table or RecordBatch, a pandas DataFrame or a mapping of arrays.
+    :param config: configuration to use to parse the filters.
+    :return: the mask of the matching rows.
+    """
+    table = _to_table(data)
+    if not filters:
+        return pa.array([True] * table.num_rows, pa.bool_())
+    config = config or cached_filters_config(fields_map)
+    mask = pc.fill_null(_mask(enforce_cost(filters, config), config, table), False)
+    if isinstance(mask, pa.ChunkedArray):
+        return mask.combine_chunks()
+    return mask
+
+
+def filter_table(
+    filters: AbstractFilterRule | None,
+    fields_map: list[FieldMap],
+    data: Any,
+    config: FiltersConfig = None,
+) -> Any:
+    """
+    Return the rows of the columnar data that match the filters.
+
+    :param filters: the filters to evaluate.
+    :param fields_map: the fields of the filters. The columns are read using the name of the fields.
+    :param data: a pyarrow Table or RecordBatch, a pandas DataFrame or a mapping of arrays.
+    :param config: configuration to use to parse the filters.
+    :return: the matching rows, in the same type as the data.
+    """
+    mask = filter_mask(filters, fields_map, data, config)
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.filter(mask)
+    numpy_mask = mask.to_numpy(zero_copy_only=False)
+    if isinstance(data, Mapping):
+        return {name: _to_numpy(column)[numpy_mask] for name, column in data.items()}
+    return data[numpy_mask]
+
+
+def sort_indices(
+    sorting_rules: list[AbstractSortRule] | None,
+    fields_map: list[FieldMap],
+    data: Any,
+    config: SortConfig = None,
+    nulls_largest: bool = False,
+) -> pa.UInt64Array:
+    """
+    Compute the multi-key argsort that orders the columnar data like the ORDER BY statement built
+    by `build_sorting`. The sort is stable.
+
+    :param sorting_rules: the sort rules to evaluate.
+    :param fields_map: the fields of the rules. The columns are read using the name of the fields.
+    :param data: a pyarrow Table or RecordBatch, a pandas DataFrame or a mapping of arrays.
+    :param config: the configuration to use to parse the rules.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle,
+        instead of before, like in SQLite, MySQL and SQL Server.
+    :return: the indices of the rows in sorted order.
+    """
+    if sorting_rules and not isinstance(sorting_rules, list):
+        raise QueryBuilderSortSyntaxError("Sort rules must be a list")
+    table = _to_table(data)
+    config = config or cached_sort_config(fields_map)
+    columns = {}
+    sort_keys = []
+    for index, rule in enumerate(sorting_rules or []):
+        if not isinstance(rule, SortRule):
+            raise QueryBuilderSortSyntaxError(
+                f"Sort rule {type(rule).__name__} is not supported by the vectorized backend"
+            )
+        column = _column(
+            table, config.get_field(rule.field).name, QueryBuilderSortSyntaxError
+        )
+        direction = config.get_direction(rule.direction)
+        if isinstance(direction, DescDirection):
+            order = "descending"
+        elif isinstance(direction, AscDirection):
+            order = "ascending"
+        else:
+            raise QueryBuilderSortSyntaxError(
+                f"Direction {direction.code} is not supported by the vectorized backend"
+            )
+        # Arrow places the nulls of all the keys on the same side: a leading flag per key
+        # places them like the database, whatever the direction.
+        nulls_last = nulls_largest == (order == "ascending")
+        columns[f"nulls_{index}"] = (
+            pc.is_null(column) if nulls_last else pc.is_valid(column)
+        )
+        columns[f"values_{index}"] = column
+        sort_keys += [(f"nulls_{index}", "ascending"), (f"values_{index}", order)]
+    if not sort_keys:
+        return pa.array(range(table.num_rows), pa.uint64())
+    return pc.sort_indices(pa.table(columns), sort_keys=sort_keys)
+
+
+def sort_table(
+    sorting_rules: list[AbstractSortRule] | None,
+    fields_map: list[FieldMap],
+    data: Any,
+    config: SortConfig = None,
+    nulls_largest: bool = False,
+) -> Any:
+    """
+    Return the columnar data sorted by the sort rules.
+
+    :param sorting_rules: the sort rules to evaluate.
+    :param fields_map: the fields of the rules. The columns are read using the name of the fields.
+    :param data: a pyarrow Table or RecordBatch, a pandas DataFrame or a mapping of arrays.
+    :param config: the configuration to use to parse the rules.
+    :param nulls_largest: whether NULL sorts after any value, like in PostgreSQL and Oracle.
+    :return: the sorted rows, in the same type as the data.
+    """
+    indices = sort_indices(sorting_rules, fields_map, data, config, nulls_largest)
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.take(indices)
+    numpy_indices = indices.to_numpy()
+    if isinstance(data, Mapping):
+        return {name: _to_numpy(column)[numpy_indices] for name, column in data.items()}
+    return data.iloc[numpy_indices]
+
+
+def _to_table(data: Any) -> pa.Table:
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    if isinstance(data, Mapping):
+        return pa.table(dict(data))
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def _to_numpy(column: Any) -> Any:
+    if isinstance(column, (pa.Array, pa.ChunkedArray)):
+        return column.to_numpy(zero_copy_only=False)
+    return column
+
+
+def _column(table: pa.Table, name: str, error_type: type[Exception]) -> pa.ChunkedArray:
+    try:
+        return table.column(name)
+    except KeyError:
+        raise error_type(f"Missing column: {name}")
+
+
+def _mask(rule: AbstractFilterRule, config: FiltersConfig, table: pa.Table) -> Any:
+    if isinstance(rule, ComplexFilterRule):
+        config.get_condition(rule.condition)
+        masks = [_mask(child, config, table) for child in rule.rules if child]
+        join = _CONDITIONS.get(rule.condition)
+        if join is None:
+            raise QueryBuilderFiltersSyntaxError(
+                f"Condition {rule.condition} is not supported by the vectorized backend"
+            )
+        return join(masks)
+    if isinstance(rule, SimpleFilterRule):
+        field = config.get_field(rule.field)
+        operator = config.get_operator(rule.operator, field)
+        column = _column(table, field.name, QueryBuilderFiltersSyntaxError)
+        try:
+            return operator.vectorized(
+                config, field, field.transform(rule.value), column
+            )
+        except NotImplementedError:
+            raise QueryBuilderFiltersSyntaxError(
+                f"Operator {rule.operator} is not supported by the vectorized backend"
+            )
+    raise QueryBuilderFiltersSyntaxError(
+        f"Rule {type(rule).__name__} is not supported by the vectorized backend"
+    )
+
+
+def _join_and(masks: list) -> Any:
+    if not masks:
+        raise QueryBuilderFiltersSyntaxError(
+            "'and' condition requires at least one rule"
+        )
+    mask = masks[0]
+    for other in masks[1:]:
+        mask = pc.and_kleene(mask, other)
+    return mask
+
+
+def _join_or(masks: list) -> Any:
+    if not masks:
+        raise QueryBuilderFiltersSyntaxError(
+            "'or' condition requires at least one rule"
+        )
+    mask = masks[0]
+    for other in masks[1:]:
+        mask = pc.or_kleene(mask, other)
+    return mask
+
+
+def _join_not(masks: list) -> Any:
+    if len(masks) != 1:
+        raise QueryBuilderFiltersSyntaxError(
+            "'not' condition must have exactly one rule"
+        )
+    return pc.invert(masks[0])
+
+
+_CONDITIONS: dict[str, Callable[[list], Any]] = {
+    Conditions.AND.value: _join_and,
+    Conditions.OR.value: _join_or,
+    Conditions.NOT.value: _join_not,
+}
@@ -0,0 +1,84 @@
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from query_builder.filtering.models.operators import bounds
+
+
+def constant(column: Any, value: bool | None) -> pa.BooleanArray:
+    """
+    Return a mask with the same value on every row of the column.
+    """
+    return (
+        pa.nulls(len(column), pa.bool_())
+        if value is None
+        else pa.array([value] * len(column), pa.bool_())
+    )
+
+
+def compare(function: str, column: Any, value: Any, **options: Any) -> Any:
+    """
+    Compare the column with the value using the Arrow compute function: the comparisons with NULL
+    are NULL, like in SQL.
+    """
+    if value is None:
+        return constant(column, None)
+    return getattr(pc, function)(column, value, **options)
+
+
+def compare_lower(function: str, column: Any, value: Any) -> Any:
+    """
+    Compare the lowercase column with the value, which must be normalized already.
+    """
+    # The column is folded with utf8_lower: custom normalize functions aren't applied to it.
+    return compare(function, pc.utf8_lower(column), value)
+
+
+def like(column: Any, pattern: Any, ignore_case: bool) -> Any:
+    if pattern is None:
+        return constant(column, None)
+    # The LIKE operators have no ESCAPE clause: a backslash is a literal character.
+    return pc.match_like(column, pattern.replace("\\", "\\\\"), ignore_case=ignore_case)
+
+
+def is_in(column: Any, value: Any) -> Any:
+    values = list(value)
+    if not values:
+        return constant(column, False)
+    members = pa.array([v for v in values if v is not None], type=column.type)
+    mask = pc.is_in(column, value_set=members, skip_nulls=True)
+    mask = pc.if_else(pc.is_valid(column), mask, pa.scalar(None, pa.bool_()))
+    if any(v is None for v in values):
+        # 'x IN (1, NULL)' is NULL when x is not 1.
+        mask = pc.if_else(mask, mask, pa.scalar(None, pa.bool_()))
+    return mask
+
+
+def not_in(column: Any, value: Any) -> Any:
+    if not list(value):
+        return constant(column, True)
+    return pc.invert(is_in(column, value))
+
+
+def between(column: Any, value: Any) -> Any:
+    lower, upper = bounds(value)
+    return pc.and_kleene(
+        compare("greater_equal", column, lower), compare("less_equal", column, upper)
+    )
+
+
+def is_null(column: Any) -> Any:
+    return pc.is_null(column)
+
+
+def is_not_null(column: Any) -> Any:
+    return pc.is_valid(column)
+
+
+def is_empty(column: Any) -> Any:
+    return pc.equal(pc.utf8_trim(column, " "), "")
+
+
+def is_not_empty(column: Any) -> Any:
+    return pc.not_equal(pc.utf8_trim(column, " "), "")
@@ -0,0 +1,387 @@
+import random
+import re
+from collections import Counter
+from enum import Enum
+from threading import Lock
+from typing import Any, Callable
+
+from query_builder.filtering.configurations import cached_filters_config
+from query_builder.filtering.models import AbstractFilterRule, CompilationConfig
+from query_builder.filtering.models.conditions import Conditions
+from query_builder.filtering.models.operators import (
+    CaseInsensitiveStrategies,
+    Operators,
+    case_insensitive_collation,
+    case_insensitive_strategy,
+)
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.instrumentation import AbstractObserver, PhaseEvent, Phases
+from query_builder.shared.models import FieldMap
+from query_builder.sorting.models.directions import Directions
+
+# The operators that a B-tree index serves, by the position of their column in a composite index:
+# the equalities first, then one range.
+_EQUALITY_OPERATORS = {Operators.EQUAL.value, Operators.IN.value}
+_RANGE_OPERATORS = {
+    Operators.GREATERTHAN.value,
+    Operators.GREATERTHANOREQUAL.value,
+    Operators.LESSTHAN.value,
+    Operators.LESSTHANOREQUAL.value,
+    Operators.BETWEEN.value,
+    Operators.STARTSWITH.value,
+}
+_NULLITY_PREDICATES = {
+    Operators.ISNULL.value: "IS NULL",
+    Operators.ISNOTNULL.value: "IS NOT NULL",
+}
+_MAX_NAME_LENGTH = 63
+_SQLITE = "sqlite"
+
+
+class IndexKinds(Enum):
+    # Index of a single column.
+    COLUMN = "column"
+    # Index of several columns, the equalities before the range.
+    COMPOSITE = "composite"
+    # Index of an expression, like lower(column).
+    FUNCTIONAL = "functional"
+    # Index of the rows matching a predicate, like 'column IS NULL'.
+    PARTIAL = "partial"
+
+
+class IndexSuggestion:
+    """
+    An index that would serve the observed workload, and the weight of the requests it serves.
+    """
+
+    __slots__ = ("table", "columns", "where", "score")
+
+    table: str
+    columns: tuple[str, ...]
+    where: str | None
+    score: float
+
+    def __init__(
+        self, table: str, columns: tuple[str, ...], where: str | None, score: float
+    ):
+        self.table = table
+        self.columns = columns
+        self.where = where
+        self.score = score
+
+    @property
+    def kind(self) -> str:
+        if self.where is not None:
+            return IndexKinds.PARTIAL.value
+        if any("(" in column for column in self.columns):
+            return IndexKinds.FUNCTIONAL.value
+        if len(self.columns) > 1:
+            return IndexKinds.COMPOSITE.value
+        return IndexKinds.COLUMN.value
+
+    @property
+    def name(self) -> str:
+        parts = [self.table, *self.columns]
+        name = "_".join(re.sub(r"\W+", "_", part).strip("_") for part in parts)
+        return f"ix_{name}".lower()[:_MAX_NAME_LENGTH]
+
+    @property
+    def sql(self) -> str:
+        sql = f"CREATE INDEX {self.name} ON {self.table} ({', '.join(self.columns)})"
+        if self.where is not None:
+            sql += f" WHERE {self.where}"
+        return sql
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "table": self.table,
+            "columns": list(self.columns),
+            "where": self.where,
+            "score": self.score,
+            "sql": self.sql,
+        }
+
+    def __repr__(self) -> str:
+        return f"IndexSuggestion({self.sql!r}, score={self.score:g})"
+
+
+class WorkloadRecorder(AbstractObserver):
+    """
+    Observer of the compilation of the filters and of the sort rules that counts the fields and
+    the operators the requests use, and the fields they use together, to suggest indexes.
+    Register it with `instrumentation.add_observer`: like any observer, it costs nothing while
+    it is not registered.
+    """
+
+    fields: dict[str, FieldMap]
+    sample_rate: float
+    # The number of sampled compilations of filters and of sort rules.
+    sampled: Counter
+    # The uses of each (field, operator) pair and of each (field, direction) pair.
+    operators: Counter
+    directions: Counter
+    # The uses of each set of (field, operator) pairs that apply together, and of each sort key sequence.
+    filter_patterns: Counter
+    sort_patterns: Counter
+
+    def __init__(
+        self,
+        fields_map: list[FieldMap],
+        sample_rate: float = 1.0,
+        random_function: Callable[[], float] = random.random,
+        dialect: Any = None,
+    ):
+        """
+        :param fields_map: the fields to record. The rules on other fields are ignored.
+        :param sample_rate: the fraction of the compilations to record, between 0 and 1.
+        :param random_function: the source of the random numbers used to sample.
+        :param dialect: the SqlAlchemy Dialect, or the name of the dialect, the filters are built for:
+            the indexes suggested for the case-insensitive operators depend on it.
+        """
+        self.fields = {field.name: field for field in fields_map}
+        self._config = cached_filters_config(fields_map, dialect)
+        self.sample_rate = sample_rate
+        self._random = random_function
+        self._lock = Lock()
+        self.sampled = Counter()
+        self.operators = Counter()
+        self.directions = Counter()
+        self.filter_patterns = Counter()
+        self.sort_patterns = Counter()
+
+    def observe(self, phase_event: PhaseEvent):
+        if phase_event.phase != Phases.COMPILE.value or not phase_event.rules:
+            return
+        if self.sample_rate < 1 and self._random() >= self.sample_rate:
+            return
+        if isinstance(phase_event.rules, AbstractFilterRule):
+            conjunctions: list[list[tuple[str, str]]] = []
+            _add_conjunction(phase_event.rules, conjunctions)
+            pairs = [pair for conjunction in conjunctions for pair in conjunction]
+            patterns = [tuple(sorted(set(conjunction))) for conjunction in conjunctions]
+            with self._lock:
+                self.sampled["filters"] += 1
+                self.operators.update(pair for pair in pairs if pair[0] in self.fields)
+                self.filter_patterns.update(pattern for pattern in patterns if pattern)
+        elif isinstance(phase_event.rules, list):
+            keys = tuple(
+                (rule.field, rule.direction)
+                for rule in phase_event.rules
+                if hasattr(rule, "field") and hasattr(rule, "direction")
+            )
+            with self._lock:
+                self.sampled["sort"] += 1
+                self.directions.update(key for key in keys if key[0] in self.fields)
+                if keys:
+                    self.sort_patterns[keys] += 1
+
+    def reset(self):
+        """
+        Forget the recorded workload.
+        """
+        with self._lock:
+            for histogram in (
+                self.sampled,
+                self.operators,
+                self.directions,
+                self.filter_patterns,
+                self.sort_patterns,
+            ):
+                histogram.clear()
+
+    def suggest_indexes(self, limit: int = None) -> list[IndexSuggestion]:
+        """
+        Suggest the indexes that serve the recorded workload, the most used first.
+        The score of an index is the estimated number of compilations it serves, sampling included.
+        An index whose columns start with the columns of another one serves its requests too:
+        the shorter one is merged into it.
+
+        :param limit: the maximum number of suggestions.
+        :return: the suggestions, by descending score.
+        """
+        with self._lock:
+            filter_patterns = list(self.filter_patterns.items())
+            sort_patterns = list(self.sort_patterns.items())
+            field_uses = Counter()
+            for (field, _), count in self.operators.items():
+                field_uses[field] += count
+
+        scores: Counter = Counter()
+        for pattern, count in filter_patterns:
+            for key in self._filter_indexes(pattern, field_uses):
+                scores[key] += count
+        for pattern, count in sort_patterns:
+            key = self._sort_index(pattern)
+            if key is not None:
+                scores[key] += count
+
+        # The shortest indexes are merged first, so that they end up in the longest one covering them.
+        keys = sorted(scores, key=lambda key: len(key[1]))
+        for position, key in enumerate(keys):
+            covering = [
+                other
+                for other in keys[position + 1 :]
+                if other[0] == key[0]
+                and other[2] == key[2]
+                and len(other[1]) > len(key[1])
+                and other[1][: len(key[1])] == key[1]
+            ]
+            if covering:
+                best = max(covering, key=lambda other: scores[other])
+                scores[best] += scores.pop(key)
+
+        scale = 1 / self.sample_rate if self.sample_rate > 0 else 0
+        suggestions = [
+            IndexSuggestion(table, columns, where, score * scale)
+            for (table, columns, where), score in scores.items()
+        ]
+        suggestions.sort(key=lambda suggestion: (-suggestion.score, suggestion.sql))
+        return suggestions[:limit] if limit is not None else suggestions
+
+    def _filter_indexes(
+        self, pattern: tuple[tuple[str, str], ...], field_uses: Counter
+    ) -> list[tuple[str, tuple[str, ...], str | None]]:
+        tables: dict[str, tuple[list, list, list]] = {}
+        for field_name, operator in pattern:
+            field = self.fields.get(field_name)
+            table, column = _table_column(field)
+            if column is None:
+                continue
+            equalities, ranges, predicates = tables.setdefault(table, ([], [], []))
+            if operator in _EQUALITY_OPERATORS:
+                equalities.append((field_name, column))
+            elif operator in _RANGE_OPERATORS:
+                ranges.append((field_name, column))
+            elif operator in _NULLITY_PREDICATES:
+                predicates.append(f"{column} {_NULLITY_PREDICATES[operator]}")
+            elif operator == Operators.IEQUAL.value:
+                expression = _case_insensitive_expression(
+                    self._config, field, column, False
+                )
+                if expression is not None:
+                    equalities.append((field_name, expression))
+            elif operator == Operators.ISTARTSWITH.value:
+                expression = _case_insensitive_expression(
+                    self._config, field, column, True
+                )
+                if expression is not None:
+                    ranges.append((field_name, expression))
+
+        # The most used fields first: the index serves the requests that use a prefix of its columns.
+        def order(pair: tuple[str, str]) -> tuple[int, str]:
+            return -field_uses[pair[0]], pair[1]
+
+        indexes = []
+        for table, (equalities, ranges, predicates) in tables.items():
+            columns = list(
+                dict.fromkeys(column for _, column in sorted(equalities, key=order))
+            )
+            if ranges:
+                range_column = min(ranges, key=order)[1]
+                if range_column not in columns:
+                    columns.append(range_column)
+            if not columns:
+                # Only nullity rules: the index of their columns serves them.
+                columns = [predicate.split(" ", 1)[0] for predicate in predicates]
+                predicates = []
+            if columns:
+                where = " AND ".join(sorted(set(predicates))) or None
+                indexes.append((table, tuple(columns), where))
+        return indexes
+
+    def _sort_index(
+        self, pattern: tuple[tuple[str, str], ...]
+    ) -> tuple[str, tuple[str, ...], None] | None:
+        table = None
+        keys = []
+        for field_name, direction in pattern:
+            key_table, column = _table_column(self.fields.get(field_name))
+            # An index provides the order of the leading keys of its own table only.
+            if column is None or (table is not None and key_table != table):
+                break
+            table = key_table
+            keys.append((column, direction == Directions.DESC.value))
+        if not keys:
+            return None
+        # An index read backwards provides the reverse order: the first key is ascending.
+        reverse = keys[0][1]
+        columns = tuple(
+            f"{column} DESC" if descending != reverse else column
+            for column, descending in keys
+        )
+        return table, columns, None
+
+
+def _add_conjunction(
+    rule: AbstractFilterRule, conjunctions: list[list[tuple[str, str]]]
+):
+    conjunction: list[tuple[str, str]] = []
+    conjunctions.append(conjunction)
+    _walk(rule, conjunction, conjunctions)
+
+
+def _walk(
+    rule: AbstractFilterRule,
+    conjunction: list[tuple[str, str]],
+    conjunctions: list[list[tuple[str, str]]],
+):
+    if isinstance(rule, ComplexFilterRule):
+        if rule.condition == Conditions.AND.value:
+            for child in rule.rules:
+                if child:
+                    _walk(child, conjunction, conjunctions)
+        elif rule.condition == Conditions.OR.value:
+            # Each alternative is served by its own index.
+            for child in rule.rules:
+                if child:
+                    _add_conjunction(child, conjunctions)
+        # The negated rules select most of the rows: no index serves them.
+    elif isinstance(rule, SimpleFilterRule):
+        conjunction.append((rule.field, rule.operator))
+        if isinstance(rule.value, AbstractFilterRule):
+            # The criterion of 'any' and 'all' applies to the related rows.
+            _add_conjunction(rule.value, conjunctions)
+
+
+def _table_column(field: FieldMap | None) -> tuple[str | None, str | None]:
+    if field is None:
+        return None, None
+    return _column_names(field.database_column)
+
+
+def _column_names(column: Any) -> tuple[str | None, str | None]:
+    column = getattr(column, "expression", column)
+    table = getattr(getattr(column, "table", None), "name", None)
+    name = getattr(column, "name", None)
+    if table is None or name is None:
+        return None, None
+    return table, name
+
+
+def _case_insensitive_expression(
+    config: CompilationConfig, field: FieldMap, column: str, prefix: bool
+) -> str | None:
+    # The expression the case-insensitive operators compare, with the strategy `build_filters` uses.
+    strategy = case_insensitive_strategy(config, field, like=prefix)
+    if strategy == CaseInsensitiveStrategies.NORMALIZED:
+        table, normalized = _column_names(field.normalized_column)
+        return normalized if table == _table_column(field)[0] else None
+    if strategy == CaseInsensitiveStrategies.CITEXT:
+        return column
+    if strategy == CaseInsensitiveStrategies.LOWER:
+        return f"lower({column})"
+    # The comparison takes the collation of the parameter: SQLite uses the index of the column
+    # with the same collation, MySQL only the collation of the column itself. No suggested index
+    # serves ILIKE: a trigram index serves it already, if the field has one.
+    if strategy == CaseInsensitiveStrategies.COLLATION and config.dialect == _SQLITE:
+        return f"{column} COLLATE {case_insensitive_collation(config)}"
+    return None
+    collation = case_insensitive_collation(config)
+    if collation is None:
+        return f"lower({column})"
+    # The comparison takes the collation of the parameter: SQLite uses the index of the column
+    # with the same collation, MySQL only the collation of the column itself.
+    if config.dialect == _SQLITE:
+        return f"{column} COLLATE {collation}"
+    return None
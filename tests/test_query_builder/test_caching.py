@@ -0,0 +1,147 @@
+import asyncio
+import datetime
+import pickle
+
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table
+
+from query_builder.caching import InMemoryResultCache, fingerprint, table_tags
+from query_builder.caching.redis import RedisResultCache
+from query_builder.filtering import parse_dict
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import try_parse_dict
+
+metadata = MetaData()
+author = Table(
+    "author", metadata, Column("id", Integer, primary_key=True), Column("name", String)
+)
+book = Table(
+    "book",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+    Column("author_id", ForeignKey("author.id")),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=book.c.id),
+    FieldMap(name="title", database_column=book.c.title),
+    FieldMap(name="author", database_column=author.c.name),
+]
+
+
+class FakeRedis:
+    """
+    The subset of the Redis commands used by RedisResultCache, without expiration.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def _filters(*rules: dict, condition: str = "and"):
+    return parse_dict({"condition": condition, "rules": list(rules)})
+
+
+def test_fingerprint_is_canonical():
+    title = {"field": "title", "operator": "equal", "value": "a"}
+    ids = {"field": "id", "operator": "in", "value": [3, 1, 2]}
+    sort = try_parse_dict([{"field": "title"}, {"field": "id", "direction": "desc"}])
+    key = fingerprint(_filters(title, ids), sort, "books", 1)
+
+    reordered_ids = dict(ids, value=[2, 1, 3, 1])
+    assert fingerprint(_filters(reordered_ids, title, title), sort, "books", 1) == key
+    assert fingerprint(_filters(title, ids, condition="or"), sort, "books", 1) != key
+    assert fingerprint(_filters(title, ids), sort[::-1], "books", 1) != key
+    assert fingerprint(_filters(title, ids), sort, "books", 2) != key
+    assert fingerprint(
+        _filters(dict(title, operator="between", value=[1, 2]))
+    ) != fingerprint(_filters(dict(title, operator="between", value=[2, 1])))
+    date = {"field": "title", "operator": "equal", "value": datetime.date(2024, 1, 2)}
+    assert fingerprint(_filters(date)) != fingerprint(
+        _filters(dict(date, value="2024-01-02"))
+    )
+
+
+def test_table_tags():
+    filters = parse_dict({"field": "author", "operator": "equal", "value": "Ann"})
+    sort = try_parse_dict([{"field": "title"}])
+    assert table_tags(FIELDS_MAP, filters, sort) == ["author", "book"]
+    assert table_tags(FIELDS_MAP, None, sort) == ["book"]
+    assert table_tags(FIELDS_MAP) == []
+
+
+def test_in_memory_result_cache():
+    now = [0.0]
+    cache = InMemoryResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    calls = []
+
+    def compute(value):
+        def compute():
+            calls.append(value)
+            return value
+
+        return compute
+
+    assert cache.get_or_compute("a", ["book"], compute(1)) == 1
+    assert cache.get_or_compute("a", ["book"], compute(2)) == 1
+    assert cache.get_or_compute("b", ["author"], compute(3)) == 3
+    # The least recently used result is evicted.
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 4, ["author"])
+    assert cache.get("b") == (False, None)
+
+    cache.invalidate("author")
+    assert (cache.get("c"), len(cache)) == ((False, None), 1)
+    now[0] = 10
+    assert cache.get("a") == (False, None)
+    assert (calls, cache.hits, cache.misses, len(cache)) == ([1, 3], 2, 5, 0)
+
+
+def test_redis_result_cache():
+    client = FakeRedis()
+    cache = RedisResultCache(client)
+
+    async def fetch():
+        return [{"id": 1}]
+
+    key = fingerprint(parse_dict({"field": "id", "operator": "equal", "value": 1}))
+    for _ in range(2):
+        assert asyncio.run(
+            cache.get_or_compute_async(key, ["book", "author"], fetch)
+        ) == [{"id": 1}]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate("book")
+    assert cache.get(key) == (False, None)
+    assert client.data == {"query_builder:tag:author": {f"query_builder:result:{key}"}}
+
+
+def test_redis_result_cache_serializers():
+    client = FakeRedis()
+    cache = RedisResultCache(client)
+    cache.set("a", [(1, datetime.date(2024, 1, 2))])
+    # The results are stored as JSON, which doesn't run code when it's loaded.
+    assert client.data["query_builder:result:a"] == b'[[1,"2024-01-02"]]'
+    assert cache.get("a") == (True, [[1, "2024-01-02"]])
+
+    cache = RedisResultCache(client, dumps=pickle.dumps, loads=pickle.loads)
+    cache.set("a", [(1, datetime.date(2024, 1, 2))])
+    assert cache.get("a") == (True, [(1, datetime.date(2024, 1, 2))])
@@ -0,0 +1,126 @@
+import json
+
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+
+from query_builder.diagnostics import explain
+from query_builder.filtering import apply_filters, parse_dict
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict
+
+metadata = MetaData()
+book = Table(
+    "book",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+    Column("score", Integer),
+    Index("ix_book_title", "title"),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=book.c.id),
+    FieldMap(name="title", database_column=book.c.title),
+    FieldMap(name="score", database_column=book.c.score),
+]
+
+
+def _query(filters: dict, sorting_rules: list[dict]):
+    filters = parse_dict(filters)
+    sorting_rules = try_parse_dict(sorting_rules)
+    (query,) = apply_filters(filters, FIELDS_MAP, select(book.c.id))
+    (query,) = apply_sorting(sorting_rules, FIELDS_MAP, query)
+    return query, filters, sorting_rules
+
+
+def test_explain_sqlite():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    score = {"field": "score", "operator": "greaterthan", "value": 3}
+    title = {"field": "title", "operator": "in", "value": ["a", "b"]}
+    with engine.connect() as connection:
+        query, filters, sorting_rules = _query(score, [{"field": "score"}])
+        report = explain(connection, query, FIELDS_MAP, filters, sorting_rules)
+        assert [issue.as_dict() for issue in report.issues] == [
+            {
+                "kind": "sequential_scan",
+                "table": "book",
+                "detail": "SCAN book",
+                "rules": [score],
+                "fields": ["score"],
+            },
+            {
+                "kind": "sort",
+                "table": None,
+                "detail": "USE TEMP B-TREE FOR ORDER BY",
+                "rules": [{"field": "score", "direction": "asc"}],
+                "fields": ["score"],
+            },
+        ]
+        json.dumps(report.as_dict())
+
+        query, filters, sorting_rules = _query(title, [{"field": "title"}])
+        report = explain(connection, query, FIELDS_MAP, filters, sorting_rules)
+        assert report.issues == []
+        assert report.plan == [
+            "SEARCH book USING COVERING INDEX ix_book_title (title=?)"
+        ]
+
+
+class _PostgresConnection:
+    dialect = postgresql.dialect()
+
+    def __init__(self, plan: dict):
+        self.plan = plan
+        self.statements = []
+
+    def exec_driver_sql(self, statement: str, params: dict):
+        self.statements.append((statement, params))
+        return self
+
+    def scalar_one(self):
+        return json.dumps([{"Plan": self.plan}])
+
+
+def test_explain_postgresql():
+    plan = {
+        "Node Type": "Sort",
+        "Sort Key": ["book.score DESC"],
+        "Plans": [
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "book",
+                "Alias": "book",
+                "Filter": "((score > 3) AND ((title)::text ~~ 'a%'::text))",
+            }
+        ],
+    }
+    connection = _PostgresConnection(plan)
+    query, filters, sorting_rules = _query(
+        {
+            "condition": "and",
+            "rules": [
+                {"field": "score", "operator": "greaterthan", "value": 3},
+                {"field": "title", "operator": "startswith", "value": "a"},
+                {"field": "id", "operator": "in", "value": [1, 2]},
+            ],
+        },
+        [{"field": "title"}, {"field": "score", "direction": "desc"}],
+    )
+    report = explain(connection, query, FIELDS_MAP, filters, sorting_rules)
+
+    statement, params = connection.statements[0]
+    assert statement.startswith("EXPLAIN (FORMAT JSON) SELECT book.id")
+    assert params == {"score_0": 3, "title_0": "a%", "id_0_1": 1, "id_0_2": 2}
+    assert [
+        (issue.kind, issue.table, [field.name for field in issue.fields])
+        for issue in report.issues
+    ] == [("sort", None, ["score"]), ("sequential_scan", "book", ["score", "title"])]
@@ -0,0 +1,197 @@
+import pytest
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    event,
+    select,
+)
+
+from query_builder.evaluation import filter_items, sort_items
+from query_builder.filtering import apply_filters, parse_dict
+from query_builder.filtering.models.rules import SimpleFilterRule
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict
+
+metadata = MetaData()
+entity = Table(
+    "entity",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String),
+    Column("score", Integer),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=entity.c.id),
+    FieldMap(name="username", database_column=entity.c.username),
+    FieldMap(name="score", database_column=entity.c.score),
+]
+ROWS = [
+    {"id": 1, "username": "Alice", "score": 10},
+    {"id": 2, "username": "alice_2", "score": None},
+    {"id": 3, "username": "Bob", "score": 30},
+    {"id": 4, "username": None, "score": 20},
+    {"id": 5, "username": "  ", "score": 10},
+    {"id": 6, "username": "50%_off", "score": -5},
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _case_sensitive_like(connection, _):
+        connection.execute("PRAGMA case_sensitive_like = ON")
+
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(entity.insert(), ROWS)
+    return engine
+
+
+def _rule(field: str, operator: str, value=None) -> dict:
+    return {"field": field, "operator": operator, "value": value}
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        _rule("score", "equal", 10),
+        _rule("score", "equal", None),
+        _rule("score", "notequal", 10),
+        _rule("username", "iequal", "ALICE"),
+        _rule("username", "inotequal", "alice"),
+        _rule("username", "like", "A%"),
+        _rule("username", "ilike", "a_i%"),
+        _rule("username", "contains", "li"),
+        _rule("username", "contains", "%_"),
+        _rule("username", "icontains", "LI"),
+        _rule("username", "startswith", "al"),
+        _rule("username", "istartswith", "AL"),
+        _rule("username", "endswith", "ce"),
+        _rule("username", "iendswith", "OFF"),
+        _rule("score", "in", [10, 30]),
+        _rule("score", "in", [10, None]),
+        _rule("score", "in", []),
+        _rule("score", "notin", [10]),
+        _rule("score", "notin", [10, None]),
+        _rule("score", "notin", []),
+        _rule("score", "greaterthan", 10),
+        _rule("score", "greaterthanorequal", 10),
+        _rule("score", "lessthan", 20),
+        _rule("score", "lessthanorequal", 20),
+        _rule("score", "between", [0, 20]),
+        _rule("score", "between", [0, None]),
+        _rule("score", "isnull"),
+        _rule("score", "isnotnull"),
+        _rule("username", "isempty"),
+        _rule("username", "isnotempty"),
+        # trim() reads the numbers as text: they are never empty.
+        _rule("score", "isempty"),
+        _rule("score", "isnotempty"),
+        {
+            "condition": "or",
+            "rules": [_rule("score", "greaterthan", 15), _rule("username", "isnull")],
+        },
+        {
+            "condition": "and",
+            "rules": [_rule("score", "lessthan", 15), _rule("username", "isnotnull")],
+        },
+        {"condition": "not", "rules": [_rule("score", "greaterthan", 15)]},
+        {
+            "condition": "not",
+            "rules": [
+                {
+                    "condition": "or",
+                    "rules": [
+                        _rule("score", "equal", 10),
+                        _rule("username", "startswith", "B"),
+                    ],
+                }
+            ],
+        },
+    ],
+)
+def test_filters_match_sql(engine, filters: dict):
+    (query,) = apply_filters(parse_dict(filters), FIELDS_MAP, select(entity.c.id))
+    with engine.connect() as connection:
+        expected = sorted(connection.execute(query).scalars())
+    assert [
+        row["id"] for row in filter_items(parse_dict(filters), FIELDS_MAP, ROWS)
+    ] == expected
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        _rule("score", "greaterthan", "5"),
+        _rule("score", "between", ["0", 20]),
+        _rule("score", "startswith", "1"),
+        _rule("score", "icontains", "1"),
+        _rule("username", "lessthan", 3),
+    ],
+)
+def test_mismatched_types_are_unknown(filters: dict):
+    # Python doesn't compare a string with a number: the items are unknown, they don't raise.
+    assert filter_items(parse_dict(filters), FIELDS_MAP, ROWS) == []
+    negated = {"condition": "not", "rules": [filters]}
+    assert filter_items(parse_dict(negated), FIELDS_MAP, ROWS) == []
+
+
+@pytest.mark.parametrize(
+    "sorting_rules",
+    [
+        [{"field": "score"}],
+        [{"field": "score", "direction": "desc"}],
+        [{"field": "username", "direction": "desc"}, {"field": "id"}],
+        [{"field": "score", "direction": "desc"}, {"field": "id", "direction": "desc"}],
+    ],
+)
+def test_sort_matches_sql(engine, sorting_rules: list[dict]):
+    rules = try_parse_dict([dict(rule) for rule in sorting_rules])
+    (query,) = apply_sorting(rules, FIELDS_MAP, select(entity.c.id))
+    with engine.connect() as connection:
+        expected = list(connection.execute(query).scalars())
+    # SQLite sorts NULL first: the in-memory sort must agree where the rules fully order the rows.
+    actual = [row["id"] for row in sort_items(rules, FIELDS_MAP, ROWS)]
+    if len(rules) > 1:
+        assert actual == expected
+    else:
+        assert [ROWS[i - 1]["score"] for i in actual] == [
+            ROWS[i - 1]["score"] for i in expected
+        ]
+
+
+def test_nulls_largest():
+    rules = try_parse_dict([{"field": "score"}, {"field": "id"}])
+    actual = [
+        row["id"] for row in sort_items(rules, FIELDS_MAP, ROWS, nulls_largest=True)
+    ]
+    assert actual == [6, 1, 5, 4, 3, 2]
+
+
+def test_any_all_operators():
+    fields_map = [
+        FieldMap(name="tags", database_column=entity.c.username),
+        FieldMap(name="name", database_column=entity.c.username),
+    ]
+    items = [
+        {"id": 1, "tags": [{"name": "a"}, {"name": "b"}]},
+        {"id": 2, "tags": [{"name": "a"}, {"name": None}]},
+        {"id": 3, "tags": []},
+    ]
+    name_is_a = SimpleFilterRule("name", "equal", "a")
+
+    def ids(operator, value):
+        filters = SimpleFilterRule("tags", operator, value)
+        return [item["id"] for item in filter_items(filters, fields_map, items)]
+
+    assert ids("any", name_is_a) == [1, 2]
+    assert ids("any", None) == [1, 2]
+    # The related rows where the criterion is NULL don't make 'all' fail.
+    assert ids("all", name_is_a) == [2, 3]
+    assert ids("all", None) == [1, 2, 3]
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select
+from sqlalchemy.dialects import postgresql
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from query_builder.execution import fetch_page, fetch_page_fused, planner_estimate
+from query_builder.filtering import apply_filters, parse_dict
+from query_builder.shared.models import FieldMap
+
+metadata = MetaData()
+entity = Table(
+    "entity",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=entity.c.id),
+    FieldMap(name="username", database_column=entity.c.username),
+]
+
+
+def _run(tmp_path, test):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+            await connection.execute(
+                entity.insert(),
+                [{"id": i, "username": f"user{i}"} for i in range(1, 21)],
+            )
+        try:
+            return await test(async_sessionmaker(engine))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _queries():
+    return apply_filters(
+        parse_dict({"field": "id", "operator": "greaterthan", "value": 5}),
+        FIELDS_MAP,
+        select(entity).order_by(entity.c.id).limit(10),
+        select(func.count()).select_from(entity),
+    )
+
+
+def test_fetch_page(tmp_path):
+    data_query, count_query = _queries()
+
+    async def test(sessions):
+        concurrent = await fetch_page(sessions, data_query, count_query)
+        async with sessions() as session:
+            sequential = await fetch_page(session, data_query, count_query)
+        return concurrent, sequential
+
+    for page in _run(tmp_path, test):
+        assert [row.id for row in page.rows] == list(range(6, 16))
+        assert (page.total, page.exact) == (15, True)
+
+
+def test_fetch_page_count_threshold(tmp_path):
+    data_query, _ = _queries()
+
+    async def test(sessions):
+        return (
+            await fetch_page(sessions, data_query, count_threshold=20),
+            await fetch_page(sessions, data_query, count_threshold=10),
+        )
+
+    below, above = _run(tmp_path, test)
+    assert (below.total, below.exact) == (15, True)
+    # SQLite has no planner estimate: the threshold is a lower bound of the total.
+    assert (above.total, above.exact) == (10, False)
+    assert len(above.rows) == 10
+
+
+def test_fetch_page_fused(tmp_path):
+    data_query, _ = _queries()
+
+    async def test(sessions):
+        async with sessions() as session:
+            return (
+                await fetch_page_fused(session, data_query),
+                await fetch_page_fused(session, data_query.offset(50)),
+            )
+
+    page, empty_page = _run(tmp_path, test)
+    assert [tuple(row) for row in page.rows][:2] == [(6, "user6"), (7, "user7")]
+    # The same rows as `fetch_page`, without the count column.
+    assert page.rows[0]._fields == ("id", "username")
+    assert page.rows[0].username == "user6"
+    assert page.total == 15
+    assert (empty_page.rows, empty_page.total) == ([], 15)
+
+
+class FakePostgresqlSession:
+    def __init__(self):
+        self.dialect = postgresql.psycopg2.dialect()
+        self.statements = []
+
+    async def connection(self):
+        return self
+
+    async def exec_driver_sql(self, statement: str, params: dict):
+        self.statements.append((statement, params))
+        return self
+
+    def scalar_one(self):
+        return json.dumps([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}])
+
+
+def test_planner_estimate():
+    (query,) = apply_filters(
+        parse_dict({"field": "id", "operator": "in", "value": [1, 2]}),
+        FIELDS_MAP,
+        select(entity).order_by(entity.c.id).limit(10),
+    )
+    session = FakePostgresqlSession()
+
+    assert asyncio.run(planner_estimate(session, query)) == 42
+    # The 'in' parameter is expanded into one parameter per value, without the page.
+    ((statement, params),) = session.statements
+    assert statement == (
+        "EXPLAIN (FORMAT JSON) SELECT entity.id, entity.username \nFROM entity \n"
+        "WHERE entity.id IN (%(id_0_1)s, %(id_0_2)s)"
+    )
+    assert params == {"id_0_1": 1, "id_0_2": 2}
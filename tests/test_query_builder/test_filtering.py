@@ -1,13 +1,52 @@
 from typing import Any
 
 import pytest
-from sqlalchemy import text
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    column,
+    create_engine,
+    literal_column,
+    or_,
+    table,
+    text,
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.dialects.mysql import mariadb
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+)
 from sqlalchemy.future import select
 
-from query_builder.filtering import apply_filters, try_parse_dict
+from query_builder.filtering import (
+    apply_filters,
+    build_filters_many,
+    parse_dict,
+    parse_filters_json,
+    try_parse_dict,
+)
+from query_builder.filtering.cache import CompiledFiltersCache
+from query_builder.filtering.configurations import (
+    cached_filters_config,
+    default_all_conditions,
+    default_filters_config,
+)
+from query_builder.filtering.cost import default_downgrades, default_operator_weights
+from query_builder.filtering.models import CompilationConfig
 from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
-from query_builder.filtering.models.operators import EqualsOperator
-from query_builder.shared.models import FieldMap
+from query_builder.filtering.models.operators import EqualsOperator, InOperator
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.filtering.optimizer import optimize, rule_key
+from query_builder.shared.cost import CostModel
+from query_builder.shared.models import CompilationContext, FieldMap, IndexCapabilities
 
 
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
@@ -90,3 +129,951 @@ def test_blocked_operator():
         select(text("* from TestEntity")),
     )
     assert str(query) == "SELECT * from TestEntity \nWHERE :id_0 <= TestEntity.id"
+
+
+RULE = {"field": "username", "operator": "equal", "value": "a"}
+FIELDS_MAP = [
+    FieldMap(
+        name="id",
+        database_column=literal_column("TestEntity.id"),
+    ),
+    FieldMap(
+        name="username",
+        database_column=literal_column("TestEntity.username"),
+    ),
+]
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_compiled_filters_cache():
+    cache = CompiledFiltersCache(maxsize=2)
+    queries = [
+        apply_filters(
+            try_parse_dict(
+                {
+                    "condition": "or",
+                    "rules": [
+                        {"field": "id", "operator": "equal", "value": value},
+                        {"field": "username", "operator": "startswith", "value": "a"},
+                    ],
+                }
+            ),
+            FIELDS_MAP,
+            select(text("* from TestEntity")),
+            cache=cache,
+        )[0]
+        for value in (1, 2)
+    ]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert str(queries[0]) == str(queries[1])
+    assert queries[1].compile().params == {"id_0": 2, "username_0": "a%"}
+
+    for operator in ("lessthan", "greaterthan"):
+        apply_filters(
+            try_parse_dict({"field": "id", "operator": operator, "value": 1}),
+            FIELDS_MAP,
+            select(text("* from TestEntity")),
+            cache=cache,
+        )
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_repeated_values_share_parameters():
+    cache = CompiledFiltersCache()
+    queries = [
+        apply_filters(
+            try_parse_dict(
+                {
+                    "condition": "or",
+                    "rules": [
+                        {"field": "id", "operator": "greaterthan", "value": value},
+                        {"field": "id", "operator": "lessthan", "value": 1},
+                        {"field": "id", "operator": "equal", "value": True},
+                        {"field": "id", "operator": "in", "value": [1, 2]},
+                        {"field": "id", "operator": "notequal", "value": 1},
+                    ],
+                }
+            ),
+            FIELDS_MAP,
+            select(text("* from TestEntity")),
+            cache=cache,
+        )[0]
+        for value in (1, 1, 0)
+    ]
+    assert str(queries[0]) == (
+        "SELECT * from TestEntity \nWHERE TestEntity.id > :id_0 OR TestEntity.id < :id_0 "
+        "OR TestEntity.id = :id_1 OR TestEntity.id IN (__[POSTCOMPILE_id_2]) OR TestEntity.id != :id_0"
+    )
+    assert queries[1].compile().params == {"id_0": 1, "id_1": True, "id_2": [1, 2]}
+    assert queries[2].compile().params == {
+        "id_0": 0,
+        "id_1": 1,
+        "id_2": True,
+        "id_3": [1, 2],
+    }
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_cache_key_includes_shared_parameters():
+    cache = CompiledFiltersCache()
+    queries = [
+        apply_filters(
+            try_parse_dict(
+                {
+                    "condition": "and",
+                    "rules": [
+                        {"field": "id", "operator": "greaterthanorequal", "value": 1},
+                        {"field": "id", "operator": "lessthanorequal", "value": 2},
+                        {"field": "id", "operator": "equal", "value": value},
+                    ],
+                }
+            ),
+            FIELDS_MAP,
+            select(text("* from TestEntity")),
+            cache=cache,
+        )[0]
+        for value in (1, 2)
+    ]
+    assert str(queries[1]) == (
+        "SELECT * from TestEntity \nWHERE TestEntity.id >= :id_0 "
+        "AND TestEntity.id <= :id_1 AND TestEntity.id = :id_1"
+    )
+    assert queries[1].compile().params == {"id_0": 1, "id_1": 2}
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_build_filters_many():
+    shared = {
+        "condition": "or",
+        "rules": [
+            {"field": "id", "operator": "equal", "value": 1},
+            {"field": "username", "operator": "equal", "value": "admin"},
+        ],
+    }
+    filters = [
+        try_parse_dict(
+            {
+                "condition": "and",
+                "rules": [
+                    shared,
+                    {"field": "id", "operator": "greaterthan", "value": i},
+                ],
+            }
+        )
+        for i in (10, 20)
+    ] + [try_parse_dict(shared), None]
+    context = CompilationContext()
+    statements, _ = build_filters_many(filters, FIELDS_MAP, context)
+
+    assert statements[3] is None
+    assert all(
+        statement.clauses[0].element is statements[2] for statement in statements[:2]
+    )
+    assert context.params == {"id_0": 1, "username_0": "admin", "id_1": 10, "id_2": 20}
+    assert context.included_fields == {"id", "username"}
+    assert (
+        str(select(text("* from TestEntity")).where(or_(*statements[:2])))
+        == "SELECT * from TestEntity \nWHERE (TestEntity.id = :id_0 OR TestEntity.username = :username_0) "
+        "AND TestEntity.id > :id_1 OR (TestEntity.id = :id_0 OR TestEntity.username = :username_0) "
+        "AND TestEntity.id > :id_2"
+    )
+
+
+@pytest.mark.parametrize("operator", ["in", "notin"])
+def test_in_operators_cache_key(operator: str):
+    queries = [
+        apply_filters(
+            try_parse_dict({"field": "id", "operator": operator, "value": value}),
+            FIELDS_MAP,
+            select(literal_column("TestEntity.id")),
+        )[0]
+        for value in ([1, 2, 3], [4, 5], [6])
+    ]
+    cache_keys = [query._generate_cache_key() for query in queries]
+    assert all(cache_key == cache_keys[0] for cache_key in cache_keys)
+    assert len({str(query) for query in queries}) == 1
+
+
+def test_in_operator_pad_to_power_of_two():
+    config = CompilationConfig(
+        fields_mapping=FIELDS_MAP,
+        conditions=default_all_conditions,
+        operators=[InOperator(pad_to_power_of_two=True)],
+        syntax_types=[ComplexFilterRule, SimpleFilterRule],
+    )
+    (query,) = apply_filters(
+        try_parse_dict({"field": "id", "operator": "in", "value": [1, 2, 3, 4, 5]}),
+        FIELDS_MAP,
+        select(literal_column("TestEntity.id")),
+        config=config,
+    )
+    assert query.compile().params == {"id_0": [1, 2, 3, 4, 5, 5, 5, 5]}
+
+
+def test_cached_filters_config():
+    config = cached_filters_config(FIELDS_MAP)
+    assert cached_filters_config(list(FIELDS_MAP)) is config
+    assert cached_filters_config(FIELDS_MAP[:1]) is not config
+    with pytest.raises(AttributeError):
+        config.syntax_types = []
+    with pytest.raises(AttributeError):
+        FIELDS_MAP[0].name = "other"
+
+
+def test_cached_filters_config_per_request_fields():
+    column = FIELDS_MAP[0].database_column
+    config = cached_filters_config([FieldMap(name="id", database_column=column)])
+    assert (
+        cached_filters_config([FieldMap(name="id", database_column=column)]) is config
+    )
+    assert (
+        cached_filters_config(
+            [FieldMap(name="id", database_column=column, prefix_range=True)]
+        )
+        is not config
+    )
+    assert (
+        cached_filters_config(
+            [FieldMap(name="id", database_column=literal_column("x"))]
+        )
+        is not config
+    )
+
+
+@pytest.mark.parametrize(
+    "filters,expected_error",
+    [
+        ([], "$: expected an object, got list"),
+        ({"field": "id", "operator": "equal"}, "$: missing key 'value'"),
+        ({"condition": "and"}, "$: missing key 'rules'"),
+        ({"condition": "and", "rules": {}}, "$.rules: expected a list"),
+        (
+            {
+                "condition": "and",
+                "rules": [
+                    {"field": "id", "operator": "equal", "value": 1},
+                    {
+                        "condition": "or",
+                        "rules": [{"field": 1, "operator": "equal", "value": 1}],
+                    },
+                ],
+            },
+            "$.rules[1].rules[0].field: expected a string",
+        ),
+    ],
+)
+def test_parse_dict_errors(filters: Any, expected_error: str):
+    with pytest.raises(QueryBuilderFiltersSyntaxError) as error:
+        parse_dict(filters)
+    assert str(error.value) == expected_error
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_parse_dict():
+    filters = {
+        "condition": "or",
+        "rules": [
+            {"field": "id", "operator": "equal", "value": 1},
+            {
+                "condition": "and",
+                "rules": [{"field": "username", "operator": "notequal", "value": "a"}],
+            },
+        ],
+    }
+    queries = [
+        apply_filters(parse(filters), FIELDS_MAP, select(text("* from TestEntity")))[0]
+        for parse in (parse_dict, try_parse_dict)
+    ]
+    assert str(queries[0]) == str(queries[1])
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def test_parse_filters_json():
+    (query,) = apply_filters(
+        parse_filters_json(
+            b'{"condition": "and", "rules": [{"field": "id", "operator": "equal", "value": 1}]}'
+        ),
+        FIELDS_MAP,
+        select(text("* from TestEntity")),
+    )
+    assert str(query) == "SELECT * from TestEntity \nWHERE TestEntity.id = :id_0"
+    with pytest.raises(QueryBuilderFiltersSyntaxError):
+        parse_filters_json(b'{"condition": "and", "rules": [}')
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+@pytest.mark.parametrize(
+    "filters,expected_where",
+    [
+        (
+            {
+                "condition": "and",
+                "rules": [
+                    {
+                        "condition": "and",
+                        "rules": [
+                            {
+                                "field": "id",
+                                "operator": "greaterthanorequal",
+                                "value": 2,
+                            },
+                            {"field": "username", "operator": "equal", "value": "a"},
+                        ],
+                    },
+                    {"field": "username", "operator": "equal", "value": "a"},
+                    {"field": "id", "operator": "lessthanorequal", "value": 9},
+                    {"field": "id", "operator": "greaterthanorequal", "value": 1},
+                ],
+            },
+            "TestEntity.id BETWEEN :id_0 AND :id_1 AND TestEntity.username = :username_0",
+        ),
+        (
+            {
+                "condition": "or",
+                "rules": [
+                    {"field": "id", "operator": "equal", "value": 1},
+                    {"field": "username", "operator": "equal", "value": "a"},
+                    {"field": "id", "operator": "in", "value": [2, 1]},
+                ],
+            },
+            "TestEntity.id IN (__[POSTCOMPILE_id_0]) OR TestEntity.username = :username_0",
+        ),
+        (
+            {
+                "condition": "or",
+                "rules": [
+                    {
+                        "condition": "and",
+                        "rules": [
+                            {"field": "id", "operator": "greaterthan", "value": 5},
+                            {"field": "id", "operator": "lessthan", "value": 3},
+                        ],
+                    },
+                    {
+                        "condition": "not",
+                        "rules": [
+                            {
+                                "condition": "not",
+                                "rules": [
+                                    {
+                                        "field": "username",
+                                        "operator": "isnull",
+                                        "value": None,
+                                    }
+                                ],
+                            }
+                        ],
+                    },
+                ],
+            },
+            "TestEntity.username IS NULL",
+        ),
+    ],
+)
+def test_optimize(filters: dict[str, Any], expected_where: str):
+    (query,) = apply_filters(
+        optimize(parse_dict(filters), cached_filters_config(FIELDS_MAP)),
+        FIELDS_MAP,
+        select(text("* from TestEntity")),
+    )
+    assert str(query) == f"SELECT * from TestEntity \nWHERE {expected_where}"
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        [
+            {"field": "x", "operator": "greaterthan", "value": 5},
+            {"field": "x", "operator": "lessthan", "value": 3},
+        ],
+        [
+            {"field": "x", "operator": "equal", "value": 1},
+            {"field": "x", "operator": "equal", "value": 2},
+        ],
+    ],
+)
+def test_optimize_keeps_contradictions_under_not(rules: list[dict]):
+    # The contradiction is unknown for NULL: its negation doesn't match the NULL row.
+    metadata = MetaData()
+    entity = Table(
+        "entity",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("x", Integer),
+    )
+    fields_map = [FieldMap(name="x", database_column=entity.c.x)]
+    filters = parse_dict(
+        {"condition": "not", "rules": [{"condition": "and", "rules": rules}]}
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as connection:
+        connection.execute(
+            entity.insert(),
+            [{"id": 1, "x": None}, {"id": 2, "x": 1}, {"id": 3, "x": 7}],
+        )
+        for rule in (filters, optimize(filters, cached_filters_config(fields_map))):
+            (query,) = apply_filters(rule, fields_map, select(entity.c.id))
+            assert connection.execute(query.order_by(entity.c.id)).scalars().all() == [
+                2,
+                3,
+            ]
+
+
+def test_optimize_respects_blocked_operators():
+    fields_map = [
+        FieldMap(
+            name="id",
+            database_column=literal_column("TestEntity.id"),
+            blocked_operators={"in", "between"},
+        )
+    ]
+    filters = parse_dict(
+        {
+            "condition": "and",
+            "rules": [
+                {"field": "id", "operator": "greaterthanorequal", "value": 1},
+                {"field": "id", "operator": "lessthanorequal", "value": 2},
+            ],
+        }
+    )
+    (query,) = apply_filters(
+        optimize(filters, cached_filters_config(fields_map)),
+        fields_map,
+        select(text("* from TestEntity")),
+    )
+    assert str(query).endswith(
+        "WHERE TestEntity.id >= :id_0 AND TestEntity.id <= :id_1"
+    )
+
+
+@pytest.mark.parametrize(
+    "field_options,expected_iequal,expected_istartswith",
+    [
+        (
+            {},
+            ("lower(entity.username) = lower(%(username_0)s)", "A_b"),
+            ("entity.username ILIKE %(username_0)s ESCAPE '\\'", "A\\_b%"),
+        ),
+        (
+            {"index_capabilities": {IndexCapabilities.LOWER.value}},
+            ("lower(entity.username) = lower(%(username_0)s)", "A_b"),
+            (
+                "lower(entity.username) LIKE lower(%(username_0)s) ESCAPE '\\'",
+                "A\\_b%",
+            ),
+        ),
+        (
+            {"index_capabilities": {IndexCapabilities.CITEXT.value}},
+            ("entity.username = %(username_0)s", "A_b"),
+            ("entity.username LIKE %(username_0)s ESCAPE '\\'", "A\\_b%"),
+        ),
+        (
+            {"index_capabilities": {IndexCapabilities.TRIGRAM.value}},
+            ("entity.username ILIKE %(username_0)s ESCAPE '\\'", "A\\_b"),
+            ("entity.username ILIKE %(username_0)s ESCAPE '\\'", "A\\_b%"),
+        ),
+        (
+            {"normalized_column": column("username_normalized")},
+            ("username_normalized = %(username_0)s", "a_b"),
+            ("username_normalized LIKE %(username_0)s ESCAPE '\\'", "a\\_b%"),
+        ),
+    ],
+)
+def test_case_insensitive_index_capabilities(
+    field_options: dict,
+    expected_iequal: tuple[str, str],
+    expected_istartswith: tuple[str, str],
+):
+    entity = table("entity", column("username"))
+    fields_map = [
+        FieldMap(name="username", database_column=entity.c.username, **field_options)
+    ]
+    # The value is bound as a LIKE pattern, with the wildcards escaped, only where LIKE compares it.
+    for operator, (expected_where, expected_param) in (
+        ("iequal", expected_iequal),
+        ("istartswith", expected_istartswith),
+    ):
+        (query,) = apply_filters(
+            parse_dict({"field": "username", "operator": operator, "value": "A_b"}),
+            fields_map,
+            select(entity),
+        )
+        compiled = query.compile(dialect=postgresql.dialect())
+        assert str(compiled).endswith(f"WHERE {expected_where}")
+        assert compiled.params == {"username_0": expected_param}
+
+
+@pytest.mark.parametrize(
+    "value,expected_where,expected_params",
+    [
+        (
+            "a_",
+            "WHERE entity.username >= :username_0 AND entity.username < :username_1 "
+            "AND entity.username LIKE :username_2 ESCAPE '\\'",
+            {"username_0": "a_", "username_1": "a`", "username_2": "a\\_%"},
+        ),
+        (
+            "a\U0010ffff",
+            "WHERE entity.username >= :username_0 AND entity.username < :username_1 "
+            "AND entity.username LIKE :username_2 ESCAPE '\\'",
+            {
+                "username_0": "a\U0010ffff",
+                "username_1": "b",
+                "username_2": "a\U0010ffff%",
+            },
+        ),
+        (
+            "\U0010ffff",
+            "WHERE entity.username >= :username_0 "
+            "AND entity.username LIKE :username_1 ESCAPE '\\'",
+            {"username_0": "\U0010ffff", "username_1": "\U0010ffff%"},
+        ),
+    ],
+)
+def test_startswith_prefix_range(
+    value: str, expected_where: str, expected_params: dict
+):
+    entity = table("entity", column("username"))
+    fields_map = [
+        FieldMap(name="username", database_column=entity.c.username, prefix_range=True)
+    ]
+    (query,) = apply_filters(
+        parse_dict({"field": "username", "operator": "startswith", "value": value}),
+        fields_map,
+        select(entity),
+    )
+    compiled = query.compile()
+    assert str(compiled).endswith(expected_where)
+    assert compiled.params == expected_params
+
+
+def test_like_operators_escape_wildcards():
+    entity = table("entity", column("username"))
+    fields_map = [FieldMap(name="username", database_column=entity.c.username)]
+    (query,) = apply_filters(
+        parse_dict({"field": "username", "operator": "contains", "value": "50%_"}),
+        fields_map,
+        select(entity),
+    )
+    compiled = query.compile()
+    assert str(compiled).endswith("WHERE entity.username LIKE :username_0 ESCAPE '\\'")
+    assert compiled.params["username_0"] == "%50\\%\\_%"
+
+
+@pytest.mark.parametrize(
+    "cost_model,filters,expected_error",
+    [
+        (
+            CostModel(max_depth=2),
+            {"condition": "and", "rules": [{"condition": "or", "rules": [RULE]}]},
+            "Filters are too deep: depth 3, maximum 2",
+        ),
+        (
+            CostModel(max_rules=2),
+            {"condition": "and", "rules": [RULE, RULE]},
+            "Too many filter rules: 3, maximum 2",
+        ),
+        (
+            CostModel(max_in_size=2),
+            {"field": "id", "operator": "in", "value": [1, 2, 3]},
+            "Too many values for operator in on field id: 3, maximum 2",
+        ),
+        (
+            CostModel(field_weights={"username": 4}, max_cost=5),
+            {"condition": "or", "rules": [RULE, RULE]},
+            "Filters are too expensive: cost 8, maximum 5",
+        ),
+    ],
+)
+def test_cost_model_limits(cost_model: CostModel, filters: dict, expected_error: str):
+    config = default_filters_config(FIELDS_MAP, cost_model)
+    with pytest.raises(QueryBuilderFiltersSyntaxError, match=expected_error):
+        apply_filters(
+            parse_dict(filters),
+            FIELDS_MAP,
+            select(text("* from TestEntity")),
+            config=config,
+        )
+
+
+def test_cost_model_downgrades():
+    cost_model = CostModel(
+        operator_weights=default_operator_weights,
+        downgrades=default_downgrades,
+        max_cost=12,
+    )
+    filters = parse_dict(
+        {
+            "condition": "and",
+            "rules": [
+                {"field": "username", "operator": "contains", "value": "a"},
+                {"field": "username", "operator": "contains", "value": "b"},
+            ],
+        }
+    )
+    (query,) = apply_filters(
+        filters,
+        FIELDS_MAP,
+        select(text("* from TestEntity")),
+        config=default_filters_config(FIELDS_MAP, cost_model),
+    )
+    assert str(query).endswith(
+        "WHERE TestEntity.username LIKE :username_0 ESCAPE '\\' "
+        "AND TestEntity.username LIKE :username_1 ESCAPE '\\'"
+    )
+    assert query.compile().params == {"username_0": "a%", "username_1": "%b%"}
+    # The input filters are not modified.
+    assert filters.rules[0].operator == "contains"
+
+
+@pytest.mark.parametrize(
+    "field_options,operator,expected",
+    [
+        (
+            {},
+            "search",
+            "to_tsvector(entity.body) @@ websearch_to_tsquery(%(body_0)s)",
+        ),
+        (
+            {"search_configuration": "english"},
+            "phrase",
+            "to_tsvector('english'::regconfig, entity.body) "
+            "@@ phraseto_tsquery('english'::regconfig, %(body_0)s)",
+        ),
+        (
+            {"search_column": column("body_vector")},
+            "search",
+            "body_vector @@ websearch_to_tsquery(%(body_0)s)",
+        ),
+    ],
+)
+def test_text_search_postgresql(field_options: dict, operator: str, expected: str):
+    entity = table("entity", column("body"))
+    fields_map = [FieldMap(name="body", database_column=entity.c.body, **field_options)]
+    (query,) = apply_filters(
+        parse_dict({"field": "body", "operator": operator, "value": "quick fox"}),
+        fields_map,
+        select(entity),
+    )
+    compiled = query.compile(dialect=postgresql.dialect())
+    assert str(compiled).endswith(f"WHERE {expected}")
+    assert compiled.params == {"body_0": "quick fox"}
+
+
+def test_text_search_sqlite():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE VIRTUAL TABLE entity USING fts5(body)")
+        connection.exec_driver_sql(
+            "INSERT INTO entity (rowid, body) VALUES "
+            "(1, 'the quick brown fox'), (2, 'the fox is quick'), (3, 'a slow dog')"
+        )
+    entity = table("entity", column("rowid"), column("body"))
+    fields_map = [FieldMap(name="body", database_column=entity.c.body)]
+    with engine.connect() as connection:
+        for operator, value, expected_ids in (
+            ("search", "quick fox", [1, 2]),
+            ("search", "fox NOT brown", [2]),
+            ("phrase", "quick brown", [1]),
+            ("phrase", "quick fox", []),
+            # The quotes of the value are escaped: they only separate words.
+            ("phrase", 'fox "is', [2]),
+        ):
+            (query,) = apply_filters(
+                parse_dict({"field": "body", "operator": operator, "value": value}),
+                fields_map,
+                select(entity.c.rowid).order_by(entity.c.rowid),
+            )
+            assert connection.execute(query).scalars().all() == expected_ids
+
+    with pytest.raises(QueryBuilderFiltersSyntaxError):
+        apply_filters(
+            parse_dict({"field": "body", "operator": "search", "value": 1}),
+            fields_map,
+            select(entity),
+        )
+
+
+@pytest.mark.parametrize(
+    "dialect,operator,value,expected",
+    [
+        (postgresql.dialect(), "in", [1, 2], "entity.id = ANY (%(id_0)s::INTEGER[])"),
+        (
+            postgresql.dialect(),
+            "notin",
+            [1, 2],
+            "entity.id != ALL (%(id_0)s::INTEGER[])",
+        ),
+        (
+            mysql.dialect(),
+            "iequal",
+            "A",
+            "entity.username = (%s COLLATE utf8mb4_0900_as_ci)",
+        ),
+        (
+            mysql.dialect(),
+            "icontains",
+            "A",
+            "entity.username LIKE (%s COLLATE utf8mb4_0900_as_ci) ESCAPE '\\\\'",
+        ),
+        (
+            mariadb.loader("mysqldb")(),
+            "iequal",
+            "A",
+            "entity.username = (%s COLLATE utf8mb4_unicode_ci)",
+        ),
+        (sqlite.dialect(), "iequal", "A", 'entity.username = (? COLLATE "NOCASE")'),
+        (
+            sqlite.dialect(),
+            "icontains",
+            "A",
+            "lower(entity.username) LIKE lower(?) ESCAPE '\\'",
+        ),
+    ],
+)
+def test_dialect_specialization(dialect: Any, operator: str, value: Any, expected: str):
+    entity = Table(
+        "entity",
+        MetaData(),
+        Column("id", Integer),
+        Column("username", String),
+    )
+    fields_map = [
+        FieldMap(name="id", database_column=entity.c.id),
+        FieldMap(name="username", database_column=entity.c.username),
+    ]
+    field = "id" if isinstance(value, list) else "username"
+    (query,) = apply_filters(
+        parse_dict({"field": field, "operator": operator, "value": value}),
+        fields_map,
+        select(entity.c.id),
+        config=cached_filters_config(fields_map, dialect),
+    )
+    assert str(query.compile(dialect=dialect)).endswith(f"WHERE {expected}")
+
+
+@pytest.mark.parametrize("dialect", [sqlite.dialect(), mysql.dialect()])
+@pytest.mark.parametrize("operator", ["iequal", "inotequal", "istartswith"])
+def test_lower_capability_precedes_collation(dialect: Any, operator: str):
+    entity = table("entity", column("username"))
+    fields_map = [
+        FieldMap(
+            name="username",
+            database_column=entity.c.username,
+            index_capabilities={IndexCapabilities.LOWER.value},
+        )
+    ]
+    (query,) = apply_filters(
+        parse_dict({"field": "username", "operator": operator, "value": "A"}),
+        fields_map,
+        select(entity),
+        config=cached_filters_config(fields_map, dialect),
+    )
+    sql = str(query.compile(dialect=dialect))
+    assert "lower(entity.username)" in sql
+    assert "COLLATE" not in sql
+
+
+def test_sqlite_case_insensitive_collation():
+    engine = create_engine("sqlite://")
+    entity = Table("entity", MetaData(), Column("username", String))
+    fields_map = [FieldMap(name="username", database_column=entity.c.username)]
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE entity (username TEXT COLLATE NOCASE)")
+        connection.exec_driver_sql("CREATE INDEX ix_username ON entity (username)")
+        connection.execute(
+            entity.insert(), [{"username": "Alice"}, {"username": "bob"}]
+        )
+        (query,) = apply_filters(
+            parse_dict({"field": "username", "operator": "iequal", "value": "ALICE"}),
+            fields_map,
+            select(entity.c.username),
+            config=cached_filters_config(fields_map, engine.dialect),
+        )
+        assert connection.execute(query).scalars().all() == ["Alice"]
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {query.compile(engine)}", ("ALICE",)
+        ).all()
+        assert "USING COVERING INDEX ix_username" in plan[0][-1]
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Parent(Base):
+    __tablename__ = "parent"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    children: Mapped[list["Child"]] = relationship()
+
+
+class Child(Base):
+    __tablename__ = "child"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    parent_id: Mapped[int | None] = mapped_column(ForeignKey("parent.id"))
+    name: Mapped[str | None]
+
+
+@pytest.fixture(scope="module")
+def relationship_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Parent(id=1, children=[Child(name="a"), Child(name="b")]),
+                Parent(id=2, children=[Child(name="a"), Child(name=None)]),
+                Parent(id=3),
+                Child(name="b"),
+            ]
+        )
+        session.commit()
+    return engine
+
+
+def _children(operator: str, name_operator: str = None, name: str = None):
+    value = name_operator and SimpleFilterRule("name", name_operator, name)
+    return SimpleFilterRule("children", operator, value)
+
+
+@pytest.mark.parametrize("strategy", [None, "exists", "in", "having"])
+def test_subquery_strategies(relationship_engine, strategy: str | None):
+    fields_map = [
+        FieldMap(
+            name="children", database_column=Parent.children, subquery_strategy=strategy
+        ),
+        FieldMap(name="name", database_column=Child.name),
+    ]
+
+    def ids(filters: SimpleFilterRule) -> list[int]:
+        (query,) = apply_filters(
+            filters, fields_map, select(Parent.id).order_by(Parent.id)
+        )
+        # all(None) is always true: it doesn't query the children.
+        if strategy in ("in", "having") and filters.value is not None:
+            assert "IN (SELECT child.parent_id" in str(query)
+        with relationship_engine.connect() as connection:
+            return connection.execute(query).scalars().all()
+
+    assert ids(_children("any", "equal", "a")) == [1, 2]
+    assert ids(_children("any", "equal", "b")) == [1]
+    assert ids(_children("any")) == [1, 2]
+    # The children where the criterion is NULL don't make 'all' fail.
+    assert ids(_children("all", "equal", "a")) == [2, 3]
+    assert ids(_children("all", "notequal", "b")) == [2, 3]
+    assert ids(_children("all")) == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "cost_model,expected_error",
+    [
+        (CostModel(max_rules=3), "Too many filter rules: 52, maximum 3"),
+        (CostModel(max_depth=2), "Filters are too deep: depth 3, maximum 2"),
+        (CostModel(max_in_size=2), "Too many values for operator in on field name"),
+    ],
+)
+def test_cost_model_limits_parsed_criterion(
+    relationship_engine, cost_model: CostModel, expected_error: str
+):
+    # The criterion stays a dictionary until the transform function of the field parses it.
+    fields_map = [
+        FieldMap(
+            name="children",
+            database_column=Parent.children,
+            transform_function=parse_dict,
+        ),
+        FieldMap(name="name", database_column=Child.name),
+    ]
+    name_rules = [
+        {"field": "name", "operator": "equal", "value": str(i)} for i in range(49)
+    ]
+    name_rules.append({"field": "name", "operator": "in", "value": ["a", "b", "c"]})
+    filters = parse_dict(
+        {
+            "field": "children",
+            "operator": "any",
+            "value": {"condition": "or", "rules": name_rules},
+        }
+    )
+    config = default_filters_config(fields_map, cost_model)
+    with pytest.raises(QueryBuilderFiltersSyntaxError, match=expected_error):
+        apply_filters(filters, fields_map, select(Parent.id), config=config)
+
+    (query,) = apply_filters(filters, fields_map, select(Parent.id).order_by(Parent.id))
+    with relationship_engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [1, 2]
+
+
+def test_optimize_merges_subqueries():
+    def merged(condition: str, *rules: SimpleFilterRule):
+        return rule_key(optimize(ComplexFilterRule(condition, list(rules))))
+
+    assert merged(
+        "or", _children("any", "equal", "a"), _children("any", "equal", "b")
+    ) == rule_key(
+        SimpleFilterRule("children", "any", SimpleFilterRule("name", "in", ["a", "b"]))
+    )
+    assert merged("or", _children("any", "equal", "a"), _children("any")) == rule_key(
+        _children("any")
+    )
+    assert merged(
+        "and",
+        _children("all", "equal", "a"),
+        _children("all"),
+        _children("all", "greaterthan", "b"),
+    ) == rule_key(
+        SimpleFilterRule(
+            "children",
+            "all",
+            ComplexFilterRule(
+                "and",
+                [
+                    SimpleFilterRule("name", "equal", "a"),
+                    SimpleFilterRule("name", "greaterthan", "b"),
+                ],
+            ),
+        )
+    )
+    # any(a) and any(b) can match different children.
+    filters = ComplexFilterRule(
+        "and", [_children("any", "equal", "a"), _children("any", "equal", "b")]
+    )
+    assert rule_key(optimize(filters)) == rule_key(filters)
+
+
+def test_optimize_keeps_parsed_criteria(relationship_engine):
+    # The criteria stay dictionaries until the transform function of the field parses them.
+    fields_map = [
+        FieldMap(
+            name="children",
+            database_column=Parent.children,
+            transform_function=parse_dict,
+        ),
+        FieldMap(name="name", database_column=Child.name),
+    ]
+    filters = optimize(
+        parse_dict(
+            {
+                "condition": "or",
+                "rules": [
+                    {
+                        "field": "children",
+                        "operator": "any",
+                        "value": {"field": "name", "operator": "equal", "value": "b"},
+                    },
+                    {
+                        "field": "children",
+                        "operator": "any",
+                        "value": {"field": "name", "operator": "isnull", "value": None},
+                    },
+                ],
+            }
+        )
+    )
+    (query,) = apply_filters(filters, fields_map, select(Parent.id).order_by(Parent.id))
+    with relationship_engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [1, 2]
@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+
+from query_builder import instrumentation
+from query_builder.filtering import apply_filters, parse_dict
+from query_builder.instrumentation import PhaseEvent
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict
+
+metadata = MetaData()
+entity = Table(
+    "entity",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=entity.c.id),
+    FieldMap(name="username", database_column=entity.c.username),
+]
+FILTERS = {
+    "condition": "and",
+    "rules": [
+        {"field": "id", "operator": "greaterthan", "value": 1},
+        {
+            "condition": "or",
+            "rules": [
+                {"field": "username", "operator": "equal", "value": "a"},
+                {"field": "username", "operator": "equal", "value": "b"},
+            ],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def events():
+    events = []
+    instrumentation.add_observer(events.append)
+    yield events
+    instrumentation.remove_observer(events.append)
+
+
+def test_no_observer():
+    assert instrumentation.start() is None
+
+
+def test_phases(events: list[PhaseEvent]):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    instrumentation.instrument_engine(engine)
+
+    filters = parse_dict(FILTERS)
+    sorting_rules = try_parse_dict([{"field": "username", "direction": "desc"}])
+    (query,) = apply_filters(filters, FIELDS_MAP, select(entity))
+    (query,) = apply_sorting(sorting_rules, FIELDS_MAP, query)
+    with engine.connect() as connection:
+        connection.execute(query).all()
+
+    assert [(e.phase, e.component) for e in events] == [
+        ("parse", "filters"),
+        ("parse", "sort"),
+        ("compile", "filters"),
+        ("compile", "sort"),
+        ("render", "sql"),
+        ("execute", "sql"),
+    ]
+    parse_filters, _, compile_filters, compile_sort, render, execute = events
+    assert (parse_filters.rule_count, parse_filters.depth) == (5, 3)
+    assert compile_filters.param_count == 3
+    assert compile_filters.included_fields == {"id", "username"}
+    assert (compile_sort.rule_count, compile_sort.included_fields) == (1, {"username"})
+    assert render.rule_count is None
+    assert execute.param_count == 3
+    assert all(e.duration >= 0 for e in events)
+
+
+def test_prometheus_observer():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    from query_builder.instrumentation.prometheus import PrometheusObserver
+
+    registry = prometheus_client.CollectorRegistry()
+    observer = PrometheusObserver(registry)
+    instrumentation.add_observer(observer)
+    try:
+        apply_filters(parse_dict(FILTERS), FIELDS_MAP, select(entity))
+    finally:
+        instrumentation.remove_observer(observer)
+
+    labels = {"phase": "compile", "component": "filters"}
+    assert registry.get_sample_value("query_builder_rules_sum", labels) == 5
+    assert registry.get_sample_value("query_builder_params_sum", labels) == 3
+    assert (
+        registry.get_sample_value(
+            "query_builder_field_usage_total",
+            {"component": "filters", "field": "username"},
+        )
+        == 1
+    )
+
+
+def test_opentelemetry_observer():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    from query_builder.instrumentation.opentelemetry import OpenTelemetryObserver
+
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    observer = OpenTelemetryObserver(
+        tracer_provider.get_tracer("test"), MeterProvider().get_meter("test")
+    )
+    instrumentation.add_observer(observer)
+    try:
+        parse_dict(FILTERS)
+    finally:
+        instrumentation.remove_observer(observer)
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "query_builder.filters.parse"
+    assert span.attributes["query_builder.rule_count"] == 5
+    assert span.end_time >= span.start_time
@@ -0,0 +1,169 @@
+import pytest
+from sqlalchemy import ForeignKey, create_engine, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
+
+from query_builder.filtering import apply_filters, build_filters, parse_dict
+from query_builder.filtering.models import AbstractFilterRule
+from query_builder.filtering.models.rules import ComplexFilterRule
+from query_builder.pagination import apply_keyset_pagination
+from query_builder.shared.joins import required_joins
+from query_builder.shared.models import CompilationContext, FieldMap
+from query_builder.sorting import apply_sorting, build_sorting, try_parse_dict
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Publisher(Base):
+    __tablename__ = "publisher"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class Author(Base):
+    __tablename__ = "author"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    publisher_id: Mapped[int | None] = mapped_column(ForeignKey("publisher.id"))
+    publisher: Mapped[Publisher | None] = relationship()
+
+
+class Book(Base):
+    __tablename__ = "book"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str]
+    author_id: Mapped[int | None] = mapped_column(ForeignKey("author.id"))
+    author: Mapped[Author | None] = relationship()
+
+
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=Book.id),
+    FieldMap(name="title", database_column=Book.title),
+    FieldMap(name="author.name", database_column=Author.name, join_path=[Book.author]),
+    FieldMap(
+        name="author.publisher.name",
+        database_column=Publisher.name,
+        join_path=[Book.author, Author.publisher],
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        penguin = Publisher(name="Penguin")
+        session.add_all(
+            [
+                Book(id=1, title="b", author=Author(name="Ann", publisher=penguin)),
+                Book(id=2, title="a", author=Author(name="Bob")),
+                Book(id=3, title="c"),
+            ]
+        )
+        session.commit()
+    return engine
+
+
+def test_required_joins():
+    assert required_joins(FIELDS_MAP, {"title"}) == []
+    assert required_joins(FIELDS_MAP, {"author.publisher.name", "author.name"}) == [
+        ("author", Book.author),
+        ("author.publisher", Author.publisher),
+    ]
+
+
+def test_joins_only_used_fields(engine):
+    (query,) = apply_filters(
+        parse_dict({"field": "title", "operator": "equal", "value": "a"}),
+        FIELDS_MAP,
+        select(Book.id),
+    )
+    assert "JOIN" not in str(query)
+
+    (query,) = apply_filters(
+        parse_dict({"field": "author.name", "operator": "isnull", "value": None}),
+        FIELDS_MAP,
+        select(Book.id),
+    )
+    with engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [3]
+
+
+def test_filter_and_sort_share_joins(engine):
+    query, count_query = apply_filters(
+        parse_dict(
+            {"field": "author.publisher.name", "operator": "isnull", "value": None}
+        ),
+        FIELDS_MAP,
+        select(Book.id),
+        select(func.count()).select_from(Book),
+    )
+    (query,) = apply_sorting(
+        try_parse_dict([{"field": "author.name", "direction": "desc"}]),
+        FIELDS_MAP,
+        query,
+    )
+    sql = str(query)
+    assert sql.count("JOIN author") == 1
+    assert sql.count("JOIN publisher") == 1
+    with engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [2, 3]
+        assert connection.execute(count_query).scalar() == 2
+
+
+def test_keyset_pagination_joins(engine):
+    (query,) = apply_keyset_pagination(
+        try_parse_dict([{"field": "author.name"}]),
+        FIELDS_MAP,
+        select(Book.id),
+        tiebreaker="id",
+        cursor=["Ann", 1],
+    )
+    with engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [2]
+
+
+def test_prebuilt_statements_joins(engine):
+    filters = parse_dict({"field": "author.name", "operator": "equal", "value": "Ann"})
+    statement, context = build_filters(filters, FIELDS_MAP, CompilationContext())
+    (query,) = apply_filters(filters, FIELDS_MAP, select(Book.id), statement=statement)
+    sorting_rules = try_parse_dict([{"field": "author.publisher.name"}])
+    statements, _ = build_sorting(sorting_rules, FIELDS_MAP, CompilationContext())
+    (query,) = apply_sorting(sorting_rules, FIELDS_MAP, query, statements=statements)
+    assert str(query).count("JOIN author") == 1
+    with engine.connect() as connection:
+        assert connection.execute(query, context.params).scalars().all() == [1]
+
+
+class _TitleRule(AbstractFilterRule):
+    # A custom rule that only compiles: it has no bind.
+    def compile(self, config, context):
+        return Book.title == "a"
+
+    @staticmethod
+    def try_parse_dict(dictionary: dict) -> "_TitleRule":
+        return _TitleRule()
+
+
+def test_prebuilt_statement_of_custom_rules(engine):
+    filters = ComplexFilterRule(
+        "and",
+        [
+            _TitleRule(),
+            parse_dict(
+                {"field": "author.name", "operator": "isnotnull", "value": None}
+            ),
+        ],
+    )
+    statement = (Book.title == "a") & Author.name.is_not(None)
+    (query,) = apply_filters(filters, FIELDS_MAP, select(Book.id), statement=statement)
+    assert str(query).count("JOIN author") == 1
+    with engine.connect() as connection:
+        assert connection.execute(query).scalars().all() == [2]
+    # Without any join path, the rules are not looked at.
+    (query,) = apply_filters(
+        _TitleRule(), FIELDS_MAP[:2], select(Book.id), statement=Book.title == "a"
+    )
+    assert "JOIN" not in str(query)
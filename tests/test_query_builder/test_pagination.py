@@ -0,0 +1,167 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+
+from query_builder.pagination import (
+    apply_keyset_pagination,
+    cursor_from_row,
+    encode_cursor,
+)
+from query_builder.pagination.errors import QueryBuilderPaginationError
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import try_parse_dict
+
+entity = Table(
+    "entity",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("username", String),
+    Column("score", Integer),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=entity.c.id),
+    FieldMap(name="username", database_column=entity.c.username),
+    FieldMap(name="score", database_column=entity.c.score),
+]
+
+
+@pytest.mark.parametrize(
+    "sorting_rules,nulls_largest,expected_where",
+    [
+        (
+            [{"field": "username"}],
+            False,
+            "WHERE (entity.username, entity.id) > (:username_cursor, :id_cursor)",
+        ),
+        (
+            [
+                {"field": "score", "direction": "desc"},
+                {"field": "id", "direction": "desc"},
+            ],
+            True,
+            "WHERE (entity.score, entity.id) < (:score_cursor, :id_cursor)",
+        ),
+        (
+            [
+                {"field": "score", "direction": "desc"},
+                {"field": "id", "direction": "desc"},
+            ],
+            False,
+            "WHERE entity.score < :score_cursor OR entity.score IS NULL "
+            "OR entity.score = :score_cursor AND entity.id < :id_cursor",
+        ),
+        (
+            [{"field": "score", "direction": "desc"}, {"field": "username"}],
+            False,
+            "WHERE entity.score < :score_cursor OR entity.score IS NULL "
+            "OR entity.score = :score_cursor AND entity.username > :username_cursor "
+            "OR entity.score = :score_cursor AND entity.username = :username_cursor "
+            "AND entity.id > :id_cursor",
+        ),
+    ],
+)
+def test_seek_predicate(
+    sorting_rules: list[dict], nulls_largest: bool, expected_where: str
+):
+    rules = try_parse_dict(sorting_rules)
+    (query,) = apply_keyset_pagination(
+        rules,
+        FIELDS_MAP,
+        select(entity.c.id),
+        tiebreaker="id",
+        cursor=encode_cursor([1] * len({rule.field for rule in rules} | {"id"})),
+        nulls_largest=nulls_largest,
+    )
+    assert expected_where in str(query)
+
+
+def test_seek_predicate_null_cursor():
+    (query,) = apply_keyset_pagination(
+        try_parse_dict([{"field": "score"}]),
+        FIELDS_MAP,
+        select(entity.c.id),
+        tiebreaker="id",
+        cursor=encode_cursor([None, 1]),
+    )
+    assert (
+        "WHERE entity.score IS NOT NULL OR entity.score IS NULL AND entity.id > :id_cursor"
+        in str(query)
+    )
+
+
+@pytest.mark.parametrize("row_values", [True, False])
+@pytest.mark.parametrize(
+    "sorting_rules",
+    [
+        [{"field": "score", "direction": "desc"}, {"field": "username"}],
+        [{"field": "score"}, {"field": "username", "direction": "desc"}],
+    ],
+)
+def test_keyset_pages(row_values: bool, sorting_rules: list[dict]):
+    engine = create_engine("sqlite://")
+    entity.metadata.create_all(engine)
+    with engine.connect() as connection:
+        # NULL keys, SQLite sorts them before the values.
+        connection.execute(
+            entity.insert(),
+            [
+                {
+                    "id": i,
+                    "username": f"user{i % 4}" if i % 5 else None,
+                    "score": i % 3 if i % 7 else None,
+                }
+                for i in range(1, 21)
+            ],
+        )
+        rules = try_parse_dict(sorting_rules)
+        cursor, ids = None, []
+        while True:
+            (query,) = apply_keyset_pagination(
+                rules,
+                FIELDS_MAP,
+                select(entity),
+                tiebreaker="id",
+                cursor=cursor,
+                limit=6,
+                row_values=row_values,
+            )
+            page = connection.execute(query).all()
+            if not page:
+                break
+            ids += [row.id for row in page]
+            cursor = cursor_from_row(page[-1], rules, "id")
+
+        (expected,) = apply_keyset_pagination(
+            rules, FIELDS_MAP, select(entity.c.id), tiebreaker="id"
+        )
+        expected = connection.execute(expected).scalars()
+        assert ids == list(expected)
+
+
+@pytest.mark.parametrize("cursor", [["7", 3], encode_cursor(["7", 3])])
+def test_cursor_values_are_transformed(cursor):
+    fields_map = FIELDS_MAP[:2] + [
+        FieldMap(name="score", database_column=entity.c.score, transform_function=int)
+    ]
+    (query,) = apply_keyset_pagination(
+        try_parse_dict([{"field": "score"}]),
+        fields_map,
+        select(entity.c.id),
+        tiebreaker="id",
+        cursor=cursor,
+    )
+    assert query.compile().params == {"score_cursor": 7, "id_cursor": 3}
+
+
+def test_invalid_cursor():
+    with pytest.raises(QueryBuilderPaginationError):
+        apply_keyset_pagination(
+            [], FIELDS_MAP, select(entity.c.id), tiebreaker="id", cursor="not a cursor"
+        )
+    with pytest.raises(QueryBuilderPaginationError):
+        apply_keyset_pagination(
+            [],
+            FIELDS_MAP,
+            select(entity.c.id),
+            tiebreaker="id",
+            cursor=encode_cursor([1, 2]),
+        )
@@ -2,8 +2,11 @@ import pytest
 from sqlalchemy import text
 from sqlalchemy.future import select
 
+from query_builder.shared.cost import CostModel
 from query_builder.shared.models import FieldMap
-from query_builder.sorting import apply_sorting, try_parse_dict
+from query_builder.sorting import apply_sorting, parse_sort_json, try_parse_dict
+from query_builder.sorting.configurations import default_sort_config
+from query_builder.sorting.errors import QueryBuilderSortSyntaxError
 
 
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
@@ -45,3 +48,33 @@ def test_apply_sorting(sorting_rules: list[dict], expected_result: str):
         query,
     )
     assert str(query) == expected_result
+
+
+def test_parse_sort_json():
+    rules = parse_sort_json(
+        b'[{"property": "username", "direction": "DESC"}, {"field": "id"}]'
+    )
+    assert [(rule.field, rule.direction) for rule in rules] == [
+        ("username", "desc"),
+        ("id", "asc"),
+    ]
+    for data in (b"[{]", b'{"field": "id"}', b'["id"]'):
+        with pytest.raises(QueryBuilderSortSyntaxError):
+            parse_sort_json(data)
+
+
+def test_cost_model_max_sort_keys():
+    fields_map = [
+        FieldMap(name="id", database_column=text("TestEntity.id")),
+        FieldMap(name="username", database_column=text("TestEntity.username")),
+    ]
+    config = default_sort_config(fields_map, CostModel(max_sort_keys=1))
+    with pytest.raises(
+        QueryBuilderSortSyntaxError, match="Too many sort keys: 2, maximum 1"
+    ):
+        apply_sorting(
+            try_parse_dict([{"field": "username"}, {"field": "id"}]),
+            fields_map,
+            select(text("* from TestEntity")),
+            config=config,
+        )
@@ -0,0 +1,201 @@
+import asyncio
+import datetime
+import json
+
+import pytest
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    select,
+)
+
+from query_builder.filtering import apply_filters, parse_dict
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict
+from query_builder.streaming import (
+    csv_chunks,
+    ndjson_chunks,
+    stream_batches,
+    stream_batches_async,
+    stream_keyset_batches,
+)
+
+metadata = MetaData()
+entity = Table(
+    "entity",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String),
+    Column("score", Integer),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=entity.c.id),
+    FieldMap(name="username", database_column=entity.c.username),
+    FieldMap(name="score", database_column=entity.c.score),
+]
+ROWS = [{"id": i, "username": f"user{i}", "score": i % 4} for i in range(1, 26)]
+FILTERS = {"field": "id", "operator": "greaterthan", "value": 2}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(entity.insert(), ROWS)
+    return engine
+
+
+def _expected(sorting_rules: list[dict]) -> list[int]:
+    rows = [row for row in ROWS if row["id"] > 2]
+    for rule in reversed(sorting_rules):
+        rows.sort(
+            key=lambda row: row[rule["field"]],
+            reverse=rule.get("direction") == "desc",
+        )
+    return [row["id"] for row in rows]
+
+
+def test_stream_batches(engine):
+    sorting_rules = [{"field": "score", "direction": "desc"}, {"field": "id"}]
+    (query,) = apply_filters(parse_dict(FILTERS), FIELDS_MAP, select(entity))
+    (query,) = apply_sorting(
+        try_parse_dict([dict(rule) for rule in sorting_rules]), FIELDS_MAP, query
+    )
+    with engine.connect() as connection:
+        batches = list(stream_batches(connection, query, batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 3]
+    assert [row.id for batch in batches for row in batch] == _expected(sorting_rules)
+
+
+def test_stream_keyset_batches(engine):
+    sorting_rules = [{"field": "score", "direction": "desc"}]
+    (query,) = apply_filters(parse_dict(FILTERS), FIELDS_MAP, select(entity))
+    with engine.connect() as connection:
+        batches = list(
+            stream_keyset_batches(
+                connection,
+                query,
+                try_parse_dict([dict(rule) for rule in sorting_rules]),
+                FIELDS_MAP,
+                "id",
+                batch_size=10,
+            )
+        )
+    assert [len(batch) for batch in batches] == [10, 10, 3]
+    assert [row.id for batch in batches for row in batch] == _expected(
+        sorting_rules + [{"field": "id"}]
+    )
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_stream_keyset_batches_null_keys(direction: str):
+    rows = [
+        {"id": i, "username": f"user{i}", "score": None if i % 3 else i % 4}
+        for i in range(1, 21)
+    ]
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(entity.insert(), rows)
+        batches = list(
+            stream_keyset_batches(
+                connection,
+                select(entity),
+                try_parse_dict([{"field": "score", "direction": direction}]),
+                FIELDS_MAP,
+                "id",
+                batch_size=3,
+            )
+        )
+    # SQLite sorts NULL before any value.
+    rows.sort(key=lambda row: row["id"])
+    rows.sort(
+        key=lambda row: (row["score"] is not None, row["score"] or 0),
+        reverse=direction == "desc",
+    )
+    assert [row.id for batch in batches for row in batch] == [row["id"] for row in rows]
+
+
+def test_stream_keyset_batches_keeps_database_values():
+    event = Table(
+        "event",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("created_at", DateTime),
+    )
+    # The transform parses the values of the requests: the values of the rows are datetimes already.
+    fields_map = [
+        FieldMap(name="id", database_column=event.c.id),
+        FieldMap(
+            name="created_at",
+            database_column=event.c.created_at,
+            transform_function=datetime.datetime.fromisoformat,
+        ),
+    ]
+    start = datetime.datetime(2024, 1, 1)
+    engine = create_engine("sqlite://")
+    event.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            event.insert(),
+            [
+                {"id": i, "created_at": start + datetime.timedelta(days=i % 4)}
+                for i in range(1, 11)
+            ],
+        )
+        batches = list(
+            stream_keyset_batches(
+                connection,
+                select(event),
+                try_parse_dict([{"field": "created_at"}]),
+                fields_map,
+                "id",
+                batch_size=3,
+            )
+        )
+    ids = [row.id for batch in batches for row in batch]
+    assert ids == [4, 8, 1, 5, 9, 2, 6, 10, 3, 7]
+
+
+def test_chunks(engine):
+    query = select(entity.c.id, entity.c.username).where(entity.c.id <= 3)
+    with engine.connect() as connection:
+        ndjson = b"".join(ndjson_chunks(stream_batches(connection, query, 2)))
+        csv = "".join(csv_chunks(stream_batches(connection, query, 2)))
+    assert [json.loads(line) for line in ndjson.splitlines()] == [
+        {"id": i, "username": f"user{i}"} for i in (1, 2, 3)
+    ]
+    assert csv.splitlines() == ["id,username", "1,user1", "2,user2", "3,user3"]
+
+
+def test_stream_batches_async(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+            await connection.execute(entity.insert(), ROWS)
+        try:
+            async with engine.connect() as connection:
+                return [
+                    [row.id for row in batch]
+                    async for batch in stream_batches_async(
+                        connection, select(entity).order_by(entity.c.id), 10
+                    )
+                ]
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(main()) == [
+        list(range(1, 11)),
+        list(range(11, 21)),
+        list(range(21, 26)),
+    ]
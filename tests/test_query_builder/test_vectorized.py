@@ -0,0 +1,166 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from sqlalchemy import column
+
+from query_builder.evaluation import filter_items, sort_items
+from query_builder.filtering import parse_dict
+from query_builder.filtering.configurations import (
+    default_all_conditions,
+    default_all_operators,
+)
+from query_builder.filtering.errors import QueryBuilderFiltersSyntaxError
+from query_builder.filtering.models import CompilationConfig
+from query_builder.filtering.models.operators import GreaterThanOperator
+from query_builder.filtering.models.rules import ComplexFilterRule, SimpleFilterRule
+from query_builder.shared.models import FieldMap
+from query_builder.sorting import try_parse_dict
+from query_builder.vectorized import filter_table, sort_indices, sort_table
+
+FIELDS_MAP = [
+    FieldMap(name=name, database_column=column(name))
+    for name in ("id", "username", "score")
+]
+ROWS = [
+    {"id": 1, "username": "Alice", "score": 10},
+    {"id": 2, "username": "alice_2", "score": None},
+    {"id": 3, "username": "Bob", "score": 30},
+    {"id": 4, "username": None, "score": 20},
+    {"id": 5, "username": "  ", "score": 10},
+    {"id": 6, "username": "50%_off", "score": -5},
+]
+TABLE = pa.Table.from_pylist(ROWS)
+
+
+def _rule(field: str, operator: str, value=None) -> dict:
+    return {"field": field, "operator": operator, "value": value}
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        _rule("score", "equal", 10),
+        _rule("score", "equal", None),
+        _rule("score", "notequal", 10),
+        _rule("username", "iequal", "ALICE"),
+        _rule("username", "inotequal", "alice"),
+        _rule("username", "like", "A%"),
+        _rule("username", "ilike", "a_i%"),
+        _rule("username", "contains", "%_"),
+        _rule("username", "icontains", "LI"),
+        _rule("username", "startswith", "al"),
+        _rule("username", "istartswith", "AL"),
+        _rule("username", "endswith", "ce"),
+        _rule("username", "iendswith", "OFF"),
+        _rule("score", "in", [10, 30]),
+        _rule("score", "in", [10, None]),
+        _rule("score", "in", []),
+        _rule("score", "notin", [10]),
+        _rule("score", "notin", [10, None]),
+        _rule("score", "notin", []),
+        _rule("score", "greaterthan", 10),
+        _rule("score", "lessthanorequal", 20),
+        _rule("score", "between", [0, 20]),
+        _rule("score", "between", [0, None]),
+        _rule("score", "isnull"),
+        _rule("username", "isempty"),
+        _rule("username", "isnotempty"),
+        {
+            "condition": "or",
+            "rules": [_rule("score", "greaterthan", 15), _rule("username", "isnull")],
+        },
+        {"condition": "not", "rules": [_rule("score", "greaterthan", 15)]},
+    ],
+)
+def test_filters_match_row_by_row(filters: dict):
+    expected = [
+        row["id"] for row in filter_items(parse_dict(filters), FIELDS_MAP, ROWS)
+    ]
+    assert (
+        filter_table(parse_dict(filters), FIELDS_MAP, TABLE).column("id").to_pylist()
+        == expected
+    )
+
+
+@pytest.mark.parametrize("nulls_largest", [False, True])
+@pytest.mark.parametrize(
+    "sorting_rules",
+    [
+        [{"field": "score"}, {"field": "id"}],
+        [{"field": "score", "direction": "desc"}, {"field": "id"}],
+        [
+            {"field": "username", "direction": "desc"},
+            {"field": "id", "direction": "desc"},
+        ],
+    ],
+)
+def test_sort_matches_row_by_row(sorting_rules: list[dict], nulls_largest: bool):
+    rules = try_parse_dict([dict(rule) for rule in sorting_rules])
+    expected = [
+        row["id"]
+        for row in sort_items(rules, FIELDS_MAP, ROWS, nulls_largest=nulls_largest)
+    ]
+    indices = sort_indices(rules, FIELDS_MAP, TABLE, nulls_largest=nulls_largest)
+    assert [ROWS[i]["id"] for i in indices.to_pylist()] == expected
+
+
+def test_pandas_and_numpy_inputs():
+    pd = pytest.importorskip("pandas")
+    np = pytest.importorskip("numpy")
+    filters = parse_dict(_rule("score", "greaterthan", 5))
+    rules = try_parse_dict([{"field": "score", "direction": "desc"}])
+
+    data_frame = pd.DataFrame({"id": [1, 2, 3], "score": [10.0, None, 3.0]})
+    assert filter_table(filters, FIELDS_MAP, data_frame)["id"].tolist() == [1]
+    assert sort_table(rules, FIELDS_MAP, data_frame)["id"].tolist() == [1, 3, 2]
+
+    arrays = {"id": np.array([1, 2, 3]), "score": np.array([10, 1, 7])}
+    assert filter_table(filters, FIELDS_MAP, arrays)["id"].tolist() == [1, 3]
+    assert sort_table(rules, FIELDS_MAP, arrays)["id"].tolist() == [1, 3, 2]
+
+
+def test_unsupported_operator():
+    fields_map = [FieldMap(name="tags", database_column=column("tags"))]
+    with pytest.raises(QueryBuilderFiltersSyntaxError, match="not supported"):
+        filter_table(
+            parse_dict(_rule("tags", "any", None)),
+            fields_map,
+            pa.table({"tags": [[1]]}),
+        )
+
+
+class _PositiveOperator(GreaterThanOperator):
+    def __init__(self):
+        super().__init__("positive")
+
+    def apply(self, config, context, field, value):
+        return super().apply(config, context, field, 0)
+
+    def vectorized(self, config, field, value, column):
+        return super().vectorized(config, field, 0, column)
+
+
+class _SqlOnlyOperator(GreaterThanOperator):
+    def __init__(self):
+        super().__init__("sqlonly")
+
+    def vectorized(self, config, field, value, column):
+        raise NotImplementedError()
+
+
+def test_config_operators():
+    config = CompilationConfig(
+        fields_mapping=FIELDS_MAP,
+        conditions=default_all_conditions,
+        operators=default_all_operators + [_PositiveOperator(), _SqlOnlyOperator()],
+        syntax_types=[ComplexFilterRule, SimpleFilterRule],
+    )
+    filters = parse_dict(_rule("score", "positive"))
+    assert filter_table(filters, FIELDS_MAP, TABLE, config).column(
+        "id"
+    ).to_pylist() == [1, 3, 4, 5]
+    with pytest.raises(QueryBuilderFiltersSyntaxError, match="not supported"):
+        filter_table(
+            parse_dict(_rule("score", "sqlonly", 1)), FIELDS_MAP, TABLE, config
+        )
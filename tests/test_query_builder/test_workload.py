@@ -0,0 +1,260 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from query_builder import instrumentation
+from query_builder.diagnostics import explain
+from query_builder.filtering import apply_filters, build_filters_many, parse_dict
+from query_builder.filtering.configurations import cached_filters_config
+from query_builder.shared.models import CompilationContext, FieldMap
+from query_builder.sorting import apply_sorting, try_parse_dict
+from query_builder.workload import WorkloadRecorder
+
+metadata = MetaData()
+book = Table(
+    "book",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("author", String),
+    Column("title", String),
+    Column("score", Integer),
+    Column("deleted_at", String),
+)
+FIELDS_MAP = [
+    FieldMap(name="id", database_column=book.c.id),
+    FieldMap(name="author", database_column=book.c.author),
+    FieldMap(name="title", database_column=book.c.title),
+    FieldMap(name="score", database_column=book.c.score),
+    FieldMap(name="deleted_at", database_column=book.c.deleted_at),
+]
+
+DIALECTS = {"sqlite": sqlite.dialect(), "postgresql": postgresql.dialect()}
+
+
+@pytest.fixture
+def recorder():
+    recorder = WorkloadRecorder(FIELDS_MAP)
+    instrumentation.add_observer(recorder)
+    yield recorder
+    instrumentation.remove_observer(recorder)
+
+
+def _run(filters: dict | None, sorting_rules: list[dict] | None = None):
+    query = select(book.c.id)
+    if filters:
+        (query,) = apply_filters(parse_dict(filters), FIELDS_MAP, query)
+    if sorting_rules:
+        (query,) = apply_sorting(try_parse_dict(sorting_rules), FIELDS_MAP, query)
+    return query
+
+
+def test_histograms(recorder: WorkloadRecorder):
+    _run(
+        {
+            "condition": "and",
+            "rules": [
+                {"field": "author", "operator": "equal", "value": "a"},
+                {"field": "score", "operator": "greaterthan", "value": 3},
+            ],
+        },
+        [{"field": "score", "direction": "desc"}],
+    )
+
+    assert recorder.sampled == {"filters": 1, "sort": 1}
+    assert recorder.operators == {("author", "equal"): 1, ("score", "greaterthan"): 1}
+    assert recorder.directions == {("score", "desc"): 1}
+    assert recorder.filter_patterns == {
+        (("author", "equal"), ("score", "greaterthan")): 1
+    }
+
+    recorder.reset()
+    assert not recorder.operators and not recorder.filter_patterns
+
+
+def test_suggest_indexes(recorder: WorkloadRecorder):
+    author = {"field": "author", "operator": "equal", "value": "a"}
+    score = {"field": "score", "operator": "greaterthan", "value": 3}
+    alive = {"field": "deleted_at", "operator": "isnull", "value": None}
+    title = {"field": "title", "operator": "iequal", "value": "T"}
+    for _ in range(3):
+        _run({"condition": "and", "rules": [author, score, alive]})
+    # Served by the composite index of the previous filters.
+    _run({"condition": "and", "rules": [author, alive]})
+    for _ in range(2):
+        _run(title, [{"field": "score", "direction": "desc"}, {"field": "id"}])
+    # Each alternative has its own index, negated rules have none.
+    _run({"condition": "or", "rules": [author, {"condition": "not", "rules": [score]}]})
+
+    assert [(s.sql, s.kind, s.score) for s in recorder.suggest_indexes()] == [
+        (
+            "CREATE INDEX ix_book_author_score ON book (author, score) "
+            "WHERE deleted_at IS NULL",
+            "partial",
+            4,
+        ),
+        (
+            "CREATE INDEX ix_book_lower_title ON book (lower(title))",
+            "functional",
+            2,
+        ),
+        (
+            "CREATE INDEX ix_book_score_id_desc ON book (score, id DESC)",
+            "composite",
+            2,
+        ),
+        ("CREATE INDEX ix_book_author ON book (author)", "column", 1),
+    ]
+    assert len(recorder.suggest_indexes(limit=1)) == 1
+
+
+def test_suggested_indexes_are_used(recorder: WorkloadRecorder):
+    filters = {
+        "condition": "and",
+        "rules": [
+            {"field": "author", "operator": "in", "value": ["a", "b"]},
+            {"field": "score", "operator": "lessthan", "value": 3},
+        ],
+    }
+    query = _run(filters, [{"field": "score"}])
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as connection:
+        report = explain(
+            connection,
+            query,
+            FIELDS_MAP,
+            parse_dict(filters),
+            try_parse_dict([{"field": "score"}]),
+        )
+        assert report.issues
+        for suggestion in recorder.suggest_indexes():
+            connection.exec_driver_sql(suggestion.sql)
+        report = explain(connection, query, FIELDS_MAP, parse_dict(filters))
+        assert not [issue for issue in report.issues if issue.kind == "sequential_scan"]
+
+
+@pytest.mark.parametrize(
+    "dialect,expected",
+    [
+        (
+            "sqlite",
+            [
+                "CREATE INDEX ix_book_title_collate_nocase ON book (title COLLATE NOCASE)"
+            ],
+        ),
+        # The comparison uses the collation of the column: no index serves another one.
+        ("mysql", []),
+    ],
+)
+def test_suggest_case_insensitive_indexes(dialect: str, expected: list[str]):
+    recorder = WorkloadRecorder(FIELDS_MAP, dialect=dialect)
+    filters = {"field": "title", "operator": "iequal", "value": "T"}
+    instrumentation.add_observer(recorder)
+    try:
+        (query,) = apply_filters(
+            parse_dict(filters),
+            FIELDS_MAP,
+            select(book.c.id),
+            config=cached_filters_config(FIELDS_MAP, dialect),
+        )
+    finally:
+        instrumentation.remove_observer(recorder)
+    suggestions = [suggestion.sql for suggestion in recorder.suggest_indexes()]
+    assert suggestions == expected
+
+    if dialect == "sqlite":
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+        with engine.connect() as connection:
+            connection.exec_driver_sql(suggestions[0])
+            report = explain(connection, query, FIELDS_MAP, parse_dict(filters))
+            assert not report.issues
+
+
+@pytest.mark.parametrize(
+    "dialect,capabilities,operator,expected,compiled",
+    [
+        ("sqlite", ["lower"], "iequal", ["lower(title)"], "lower(book.title) ="),
+        (
+            "sqlite",
+            ["lower"],
+            "istartswith",
+            ["lower(title)"],
+            "lower(book.title) LIKE",
+        ),
+        (
+            "sqlite",
+            [],
+            "iequal",
+            ["title COLLATE NOCASE"],
+            'book.title = (? COLLATE "NOCASE")',
+        ),
+        ("sqlite", [], "istartswith", [], "lower(book.title) LIKE lower("),
+        ("postgresql", [], "iequal", ["lower(title)"], "lower(book.title) ="),
+        ("postgresql", ["trigram"], "iequal", [], "book.title ILIKE"),
+    ],
+)
+def test_case_insensitive_suggestions_match_statement(
+    dialect: str,
+    capabilities: list[str],
+    operator: str,
+    expected: list[str],
+    compiled: str,
+):
+    fields_map = [
+        FieldMap(
+            name="title", database_column=book.c.title, index_capabilities=capabilities
+        )
+    ]
+    recorder = WorkloadRecorder(fields_map, dialect=dialect)
+    instrumentation.add_observer(recorder)
+    try:
+        (query,) = apply_filters(
+            parse_dict({"field": "title", "operator": operator, "value": "T"}),
+            fields_map,
+            select(book.c.id),
+            config=cached_filters_config(fields_map, dialect),
+        )
+    finally:
+        instrumentation.remove_observer(recorder)
+    # The recorder picks the strategy of the compiled comparison.
+    assert [
+        column
+        for suggestion in recorder.suggest_indexes()
+        for column in suggestion.columns
+    ] == expected
+    assert compiled in str(query.compile(dialect=DIALECTS[dialect]))
+
+
+def test_sampling():
+    draws = iter([0.1, 0.9, 0.3, 0.7])
+    recorder = WorkloadRecorder(
+        FIELDS_MAP, sample_rate=0.5, random_function=lambda: next(draws)
+    )
+    instrumentation.add_observer(recorder)
+    try:
+        for _ in range(4):
+            _run({"field": "author", "operator": "equal", "value": "a"})
+    finally:
+        instrumentation.remove_observer(recorder)
+
+    assert recorder.sampled == {"filters": 2}
+    (suggestion,) = recorder.suggest_indexes()
+    assert suggestion.score == 4
+
+
+def test_build_filters_many(recorder: WorkloadRecorder):
+    build_filters_many(
+        [
+            parse_dict({"field": "author", "operator": "equal", "value": "a"}),
+            parse_dict({"field": "score", "operator": "equal", "value": 1}),
+        ],
+        FIELDS_MAP,
+        CompilationContext(),
+    )
+
+    # The filters are alternatives: their fields don't share an index.
+    assert recorder.filter_patterns == {
+        (("author", "equal"),): 1,
+        (("score", "equal"),): 1,
+    }